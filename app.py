@@ -10,23 +10,59 @@ Contém as rotas para:
   - Perfil (/profile) – com upload de foto e planilha
   - Marcar Férias (/marcar_ferias) – página para agendamento
   - Buscar Funcionário (/buscar_funcionario) – consulta ao banco de funcionários
+  - Buscar Funcionários (/buscar_funcionarios) – autocomplete por nome ou parte da chapa
   - Verificar Agendamento (/verificar_agendamento) – consulta agendamento
+  - Contexto do Funcionário (/funcionario/<chapa>/contexto) – dados da página de marcar férias
+  - Janelas Livres (/janelas_livres) – sugere datas de início sem conflito
   - Agendar Férias (/agendar_ferias) – agendamento com verificação de conflitos
   - Cancelar Agendamento (/cancelar_agendamento) – cancela o agendamento
   - Alterar Agendamento (/alterar_agendamento) – altera o agendamento
   - Solicitar Aprovação (/solicitar_aprovacao) – insere pedido de aprovação
-  - Dashboard (/dashboard, /dashboard_data, /aprovar_pedido, /excluir_agendamentos)
+  - Dashboard (/dashboard, /dashboard_data – completo ou só o alterado com ?since=, /aprovar_pedido, /aprovar_pedidos, /excluir_agendamentos)
+  - Eventos (/eventos) – Server-Sent Events de pedidos e agendamentos para o dashboard
+  - Conflitos (/conflitos) – sobreposições de férias existentes por área
+  - Ocupação (/ocupacao) – ausentes por área em cada dia (mapa de calor)
   - Relatório (/relatorio, /gerar_pdf) – exibe e exporta relatório
+  - Tarefas em segundo plano (/jobs/<id>, /jobs/<id>/resultado) – importação e PDF
+  - Métricas (/metrics) – contadores e histogramas por rota no formato do Prometheus
 A aplicação utiliza os módulos:
   - modules/database_connection.py (para autenticação: app.db)
   - modules/auth_manager.py
   - modules/employee_db.py (para consultas ao banco setores_funcionarios.db)
   - modules/dashboard_manager.py
+  - modules/connection_pool.py (pool de conexões SQLite reutilizadas por requisição)
+  - modules/resumo_ferias.py (resumo mensal por área usado pelo dashboard)
+  - modules/agendamentos.py (escritas em ferias_agendadas e detecção de conflitos)
+  - modules/eventos.py (eventos do dashboard por tenant, enviados por SSE)
+  - modules/conflitos.py (relatório de sobreposições por varredura)
+  - modules/janelas_livres.py (datas livres por área, com vetores NumPy em cache)
+  - modules/ocupacao.py (ocupação diária por área, calculada com NumPy)
+  - modules/migrations.py (esquema versionado dos bancos de funcionários)
+  - modules/jobs.py (tarefas em segundo plano: importação de planilhas e PDF)
+  - modules/versao_dados.py (versão dos dados de cada banco, mantida por triggers)
+  - modules/relatorio_cache.py (cache em disco do relatório HTML/PDF renderizado)
+  - modules/report_service.py (consulta dos dados do relatório)
+  - modules/diretorio_funcionarios.py (chapa -> funcionário em memória, por banco)
+  - modules/busca_funcionarios.py (índice FTS5 de nome e chapa)
+  - modules/senhas.py (hashes de senha em executor limitado; 503 quando saturado)
+  - modules/consolidado.py (modo opcional: todos os gestores em um único banco)
+  - modules/processos.py (pool de processos para PDF e importação de planilhas)
+  - modules/asgi.py (modo ASGI: views em executor limitado; ver asgi.py)
+  - modules/metricas.py (latência, tamanho, tempo de banco e de PDF por rota; ver metricas.py)
+
+Inicialização: importar este módulo apenas registra rotas e lê a configuração
+do ambiente. O trabalho de inicialização (criar app.db, pastas de upload,
+retomar tarefas) é feito por create_app(), a fábrica usada para servir a
+aplicação (ex.: gunicorn "app:create_app()"). Bibliotecas pesadas (xhtml2pdf,
+pandas, numpy) só são importadas na primeira rota que as usa.
 """
 
 import os
 import sqlite3
 import io
+import threading
+import hmac
+import uuid
 from flask import (
     Flask,
     render_template,
@@ -36,21 +72,37 @@ from flask import (
     url_for,
     session,
     make_response,
+    send_file,
+    Response,
 )
 from werkzeug.utils import secure_filename
-from xhtml2pdf import pisa
 from modules.employee_db import EmployeeDB
 from modules.database_connection import init_db
+from modules.connection_pool import release_request_connections
 from modules.auth_manager import AuthManager
+from modules.senhas import SenhasOcupadas
 from modules.dashboard_manager import DashboardManager
+from modules.report_service import ReportService
+from modules import agendamentos
+from modules import conflitos
+from modules import eventos
+from modules import jobs
+from modules import relatorio_cache, versao_dados
+from modules import diretorio_funcionarios
+from modules import busca_funcionarios
+from modules import processos
+from modules import metricas
 from modules.employee_db import EmployeeDB
-from datetime import datetime
+from datetime import datetime, time, timedelta, timezone
 from jinja2 import Undefined
 import re
 
 
 # Definição da função para converter HTML em PDF (definida inline para evitar problemas de importação)
 def html_to_pdf(source_html):
+    # Importado aqui: xhtml2pdf (e reportlab) custam centenas de ms para importar
+    from xhtml2pdf import pisa
+
     result = io.BytesIO()
     # Usa StringIO para converter o HTML (string) em um stream para o pisa
     pdf = pisa.CreatePDF(io.StringIO(source_html), dest=result)
@@ -71,24 +123,95 @@ else:
 
 # Limite de tamanho de upload (exemplo: 2MB)
 app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB
+# Limite para o POST de /profile com planilha (configurável via PLANILHA_MAX_MB).
+# O Werkzeug grava os arquivos recebidos em disco (spool), não na memória.
+app.config['PLANILHA_MAX_CONTENT_LENGTH'] = int(os.environ.get("PLANILHA_MAX_MB", "100")) * 1024 * 1024
+# Planilhas acima deste tamanho (e todo CSV) são importadas em modo streaming
+app.config['PLANILHA_STREAMING_MIN_BYTES'] = int(os.environ.get("PLANILHA_STREAMING_MIN_MB", "2")) * 1024 * 1024
+
+
+def limite_corpo(path):
+    """
+    Maior corpo de requisição aceito em 'path' (bytes). Usado pelo adaptador
+    ASGI (modules/asgi.py) para recusar corpos grandes antes de recebê-los.
+    """
+    if path == "/profile":
+        return app.config['PLANILHA_MAX_CONTENT_LENGTH']
+    return app.config['MAX_CONTENT_LENGTH']
+
+# Devolve ao pool as conexões SQLite usadas durante a requisição
+app.teardown_appcontext(release_request_connections)
+
+# Contagem, latência, tamanho da resposta e tempo de banco por rota (/metrics)
+app.before_request(metricas.iniciar_requisicao)
+app.after_request(metricas.finalizar_requisicao)
+app.teardown_request(metricas.excecao_requisicao)
 
 # Extensões permitidas para upload de fotos e planilhas
 ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-ALLOWED_EXCEL_EXTENSIONS = {'xlsx', 'xls'}
+ALLOWED_EXCEL_EXTENSIONS = {'xlsx', 'xls', 'csv'}
 
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
 
-# Inicializa o banco de usuários (app.db)
-init_db()
-
-# Configuração da pasta para uploads (ex.: fotos de perfil)
+# Pasta para uploads (ex.: fotos de perfil); criada em inicializar()
 UPLOAD_FOLDER = os.path.join(os.getcwd(), "static", "uploads", "profile_pics")
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# Planilhas aguardando importação (fora de static/: não são servidas); criada em inicializar()
+app.config["PLANILHA_FOLDER"] = os.path.join(os.getcwd(), "uploads_planilhas")
+
+_inicializada = False
+_inicializacao_lock = threading.Lock()
+
+
+def inicializar():
+    """
+    Trabalho de inicialização da aplicação (executado uma única vez):
+    cria o banco de usuários (app.db), as pastas de upload e inicia o executor
+    das tarefas em segundo plano, retomando as pendentes.
+    """
+    global _inicializada
+    with _inicializacao_lock:
+        if _inicializada:
+            return
+        init_db()
+        os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+        os.makedirs(app.config["PLANILHA_FOLDER"], exist_ok=True)
+        jobs.iniciar(app, pasta_entrada=app.config["PLANILHA_FOLDER"])
+        _inicializada = True
+
+
+def create_app(config=None):
+    """
+    Fábrica da aplicação: aplica 'config' (dict) sobre a configuração lida do
+    ambiente, executa a inicialização e retorna a aplicação.
+    """
+    if config:
+        app.config.update(config)
+    inicializar()
+    return app
+
 
+@app.before_request
+def garantir_inicializacao():
+    """
+    Se a aplicação for servida sem create_app() (ex.: "app:app"), inicializa na primeira requisição.
+    """
+    if not _inicializada:
+        inicializar()
+
+
+@app.errorhandler(SenhasOcupadas)
+def senhas_ocupadas(e):
+    """
+    Login/registro/troca de senha durante uma rajada que saturou o executor de
+    hashes (modules/senhas.py): rejeita rápido para o cliente tentar de novo.
+    """
+    response = jsonify(success=False, message="Servidor ocupado. Tente novamente em instantes.")
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
 
 @app.template_filter("to_br_date")
 def to_br_date(date_str, format="%d/%m/%Y"):
@@ -139,12 +262,11 @@ def login():
         db_filename = f"gestor_{safe_user}_funcionarios.db"
         session["employee_db"] = db_filename
 
-        # Se o arquivo de banco não existir, cria as tabelas necessárias
-        from modules.employee_db import create_user_db
-        import os
+        # Cria o banco, se não existir, ou aplica as migrações pendentes
+        # (no modo consolidado, cadastra o gestor no banco único)
+        from modules.employee_db import garantir_banco
 
-        if not os.path.exists(db_filename):
-            create_user_db(db_filename)
+        garantir_banco(db_filename)
 
         return jsonify(success=True, message="Login bem-sucedido!")
     else:
@@ -232,6 +354,9 @@ def profile():
     if "usuario" not in session:
         return jsonify(success=False, message="Usuário não logado."), 401
 
+    # Aceita uploads maiores que MAX_CONTENT_LENGTH apenas nesta rota (planilhas)
+    request.max_content_length = app.config["PLANILHA_MAX_CONTENT_LENGTH"]
+
     try:
         response_data = {}
         # Processa o upload da foto de perfil
@@ -253,18 +378,35 @@ def profile():
         if "uploadPlanilha" in request.files:
             file = request.files["uploadPlanilha"]
             if file.filename != "" and allowed_file(file.filename, ALLOWED_EXCEL_EXTENSIONS):
-                planilha_folder = os.path.join(
-                    os.getcwd(), "static", "uploads", "planilhas"
+                # Nome único por upload, fora de static/: dois gestores podem enviar
+                # arquivos com o mesmo nome antes de as tarefas rodarem
+                extensao = secure_filename(file.filename).rsplit(".", 1)[1].lower()
+                planilha_path = os.path.join(
+                    app.config["PLANILHA_FOLDER"], f"{uuid.uuid4().hex}.{extensao}"
                 )
-                if not os.path.exists(planilha_folder):
-                    os.makedirs(planilha_folder)
-                planilha_filename = secure_filename(file.filename)
-                planilha_path = os.path.join(planilha_folder, planilha_filename)
                 file.save(planilha_path)
-                from modules.planilha_processor import process_planilha
 
-                process_message = process_planilha(planilha_path)
-                response_data["planilhaStatus"] = process_message
+                # A importação roda em segundo plano; o cliente acompanha em /jobs/<id>.
+                # O modo streaming lê .xlsx com openpyxl, que não lê .xls (fica com pandas/xlrd)
+                streaming = extensao == "csv" or (
+                    extensao in ("xlsx", "xlsm")
+                    and os.path.getsize(planilha_path) >= app.config["PLANILHA_STREAMING_MIN_BYTES"]
+                )
+                try:
+                    job_id = jobs.submeter(
+                        "importar_planilha",
+                        session["usuario"],
+                        {
+                            "arquivo": planilha_path,
+                            "employee_db": session["employee_db"],
+                            "streaming": streaming,
+                        },
+                    )
+                except Exception:
+                    os.remove(planilha_path)
+                    raise
+                response_data["planilhaStatus"] = "Importação da planilha iniciada."
+                response_data["planilhaJob"] = job_id
             elif file.filename != "":
                 return jsonify(success=False, message="Extensão de planilha não permitida."), 400
 
@@ -297,27 +439,45 @@ def buscar_funcionario():
     if not chapa:
         return jsonify(nome=None)
 
+    funcionario = diretorio_funcionarios.buscar(chapa)
+    if funcionario:
+        return jsonify(nome=funcionario.nome, area=funcionario.area, areaId=funcionario.area_id)
+    else:
+        return jsonify(nome=None)
+
+
+# ------------------------------------------------------------
+# BUSCAR FUNCIONÁRIOS (autocomplete)
+# ------------------------------------------------------------
+@app.route("/buscar_funcionarios", methods=["GET"])
+def buscar_funcionarios():
+    """
+    Autocomplete: funcionários cujo nome ou chapa contém 'q', por relevância.
+    Parâmetro opcional 'limit' (padrão 10, máximo 50).
+    Retorna JSON: [{ chapa, nome, area, areaId }, ...].
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    termo = request.args.get("q", "")
+    try:
+        limite = min(int(request.args.get("limit", busca_funcionarios.LIMITE_PADRAO)),
+                     busca_funcionarios.LIMITE_MAXIMO)
+    except ValueError:
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+    if limite < 1:
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+
     from modules.employee_db import get_user_connection
 
     conn = get_user_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT f.nome, a.nome AS area
-        FROM funcionarios f
-        LEFT JOIN areas a ON f.area_id = a.id
-        WHERE f.chapa = ?
-    """,
-        (chapa,),
-    )
-    funcionario = cursor.fetchone()
+    rows = busca_funcionarios.buscar(cursor, termo, limite)
     cursor.close()
     conn.close()
-
-    if funcionario:
-        return jsonify(nome=funcionario["nome"], area=funcionario["area"])
-    else:
-        return jsonify(nome=None)
+    return jsonify([
+        {"chapa": row["chapa"], "nome": row["nome"], "area": row["area"], "areaId": row["area_id"]}
+        for row in rows
+    ])
 
 
 # ------------------------------------------------------------
@@ -332,12 +492,11 @@ def verificar_agendamento():
     chapa = request.args.get("chapa")
     if not chapa:
         return jsonify(agendado=False)
+    funcionario = diretorio_funcionarios.buscar(chapa)
     conn = EmployeeDB.get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT id FROM funcionarios WHERE chapa = ?", (chapa,))
-    funcionario = cursor.fetchone()
     if funcionario:
-        funcionario_id = funcionario["id"]
+        funcionario_id = funcionario.id
         cursor.execute(
             "SELECT data_ferias, dias_ferias FROM ferias_agendadas WHERE funcionario_id = ?",
             (funcionario_id,),
@@ -362,6 +521,23 @@ def verificar_agendamento():
     return jsonify(agendado=False)
 
 
+def conflito_response(conflict):
+    """
+    Resposta 409 padrão para um agendamento que se sobrepõe a outro da mesma área.
+    """
+    return (
+        jsonify(
+            success=False,
+            conflito=True,
+            nome=conflict["nome"],
+            dataFerias=conflict["data_ferias"],
+            dataRetorno=conflict["data_retorno"],
+            message="Conflito: Outro funcionário do seu setor já está agendado para um período que se sobrepõe. Solicite aprovação.",
+        ),
+        409,
+    )
+
+
 # ------------------------------------------------------------
 # AGENDAR FÉRIAS
 # ------------------------------------------------------------
@@ -393,6 +569,7 @@ def agendar_ferias():
     except Exception as e:
         return jsonify(success=False, message="Data inválida."), 400
     end_date = start_date + timedelta(days=diasFerias)
+    dataFerias = start_date.isoformat()
 
     # Usa a conexão do banco de dados específico do usuário (gestor)
     from modules.employee_db import get_user_connection
@@ -401,14 +578,13 @@ def agendar_ferias():
     cursor = conn.cursor()
 
     # Busca o funcionário pela chapa
-    cursor.execute("SELECT id, area_id FROM funcionarios WHERE chapa = ?", (chapa,))
-    funcionario = cursor.fetchone()
+    funcionario = diretorio_funcionarios.buscar(chapa)
     if not funcionario:
         cursor.close()
         conn.close()
         return jsonify(success=False, message="Funcionário não encontrado."), 404
-    funcionario_id = funcionario["id"]
-    area_id = funcionario["area_id"]
+    funcionario_id = funcionario.id
+    area_id = funcionario.area_id
 
     # Verifica se o funcionário já possui um agendamento
     cursor.execute(
@@ -426,47 +602,20 @@ def agendar_ferias():
         )
 
     # Verifica conflitos: Se outro funcionário da mesma área tiver agendamento sobreposto
-    cursor.execute(
-        """
-        SELECT f.nome, fa.data_ferias, fa.dias_ferias 
-        FROM ferias_agendadas fa
-        JOIN funcionarios f ON fa.funcionario_id = f.id
-        WHERE f.area_id = ?
-        AND (date(fa.data_ferias) <= ? AND date(fa.data_ferias, '+' || fa.dias_ferias || ' days') >= ?)
-    """,
-        (area_id, end_date.isoformat(), start_date.isoformat()),
+    conflict = agendamentos.buscar_conflito(
+        cursor, area_id, start_date.isoformat(), end_date.isoformat()
     )
-    conflict = cursor.fetchone()
     if conflict:
-        conflict_name = conflict["nome"]
-        conflict_start = conflict["data_ferias"]
-        conflict_days = int(conflict["dias_ferias"])
-        conflict_end = (
-            datetime.strptime(conflict_start, "%Y-%m-%d").date()
-            + timedelta(days=conflict_days)
-        ).isoformat()
         cursor.close()
         conn.close()
-        return (
-            jsonify(
-                success=False,
-                conflito=True,
-                nome=conflict_name,
-                dataFerias=conflict_start,
-                dataRetorno=conflict_end,
-                message="Conflito: Outro funcionário do seu setor já está agendado para um período que se sobrepõe. Solicite aprovação.",
-            ),
-            409,
-        )
+        return conflito_response(conflict)
 
     # Se não houver conflito, insere o novo agendamento
-    cursor.execute(
-        "INSERT INTO ferias_agendadas (funcionario_id, data_ferias, dias_ferias) VALUES (?, ?, ?)",
-        (funcionario_id, dataFerias, diasFerias),
-    )
+    agendamentos.inserir(cursor, funcionario_id, area_id, dataFerias, diasFerias)
     conn.commit()
     cursor.close()
     conn.close()
+    publicar_evento("agendamento", acao="agendado", chapa=chapa, dataFerias=dataFerias, diasFerias=diasFerias)
     return jsonify(success=True, message="Férias agendadas com sucesso.")
 
 
@@ -482,21 +631,17 @@ def cancelar_agendamentos():
     chapa = data.get("chapa")
     if not chapa:
         return jsonify(success=False, message="Dados incompletos."), 400
-    conn = EmployeeDB.get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM funcionarios WHERE chapa = ?", (chapa,))
-    funcionario = cursor.fetchone()
+    funcionario = diretorio_funcionarios.buscar(chapa)
     if not funcionario:
-        cursor.close()
-        conn.close()
         return jsonify(success=False, message="Funcionário não encontrado."), 404
-    funcionario_id = funcionario["id"]
-    cursor.execute(
-        "DELETE FROM ferias_agendadas WHERE funcionario_id = ?", (funcionario_id,)
-    )
+    conn = EmployeeDB.get_connection()
+    cursor = conn.cursor()
+    funcionario_id = funcionario.id
+    agendamentos.cancelar(cursor, funcionario_id)
     conn.commit()
     cursor.close()
     conn.close()
+    publicar_evento("agendamento", acao="cancelado", chapa=chapa)
     return jsonify(success=True, message="Agendamento cancelado com sucesso.")
 
 
@@ -509,7 +654,8 @@ def alterar_agendamento():
     Rota: /alterar_agendamento
     - Recebe JSON com 'chapa', 'dataFerias' e 'diasFerias'.
     - Verifica se o funcionário possui um agendamento existente.
-    - Se existir, atualiza o registro com os novos dados e retorna success=True.
+    - Verifica conflitos com outros funcionários da mesma área (como em /agendar_ferias).
+    - Se existir e não houver conflito, atualiza o registro com os novos dados e retorna success=True.
     - Caso contrário, retorna erro informando que não há agendamento para alterar.
     """
     data = request.get_json()
@@ -520,19 +666,28 @@ def alterar_agendamento():
     if not chapa or not dataFerias or not diasFerias:
         return jsonify(success=False, message="Dados incompletos."), 400
 
+    from datetime import datetime, timedelta
+
+    try:
+        diasFerias = int(diasFerias)
+        start_date = datetime.strptime(dataFerias, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return jsonify(success=False, message="Dados inválidos."), 400
+    end_date = start_date + timedelta(days=diasFerias)
+    dataFerias = start_date.isoformat()
+
     from modules.employee_db import get_user_connection
 
     conn = get_user_connection()
     cursor = conn.cursor()
 
     # Busca o funcionário pela chapa
-    cursor.execute("SELECT id FROM funcionarios WHERE chapa = ?", (chapa,))
-    funcionario = cursor.fetchone()
+    funcionario = diretorio_funcionarios.buscar(chapa)
     if not funcionario:
         cursor.close()
         conn.close()
         return jsonify(success=False, message="Funcionário não encontrado."), 404
-    funcionario_id = funcionario["id"]
+    funcionario_id = funcionario.id
 
     # Verifica se há um agendamento para esse funcionário
     cursor.execute(
@@ -549,14 +704,25 @@ def alterar_agendamento():
             404,
         )
 
-    # Atualiza o agendamento com os novos dados
-    cursor.execute(
-        "UPDATE ferias_agendadas SET data_ferias = ?, dias_ferias = ? WHERE funcionario_id = ?",
-        (dataFerias, diasFerias, funcionario_id),
+    # Verifica conflitos com outros funcionários da mesma área
+    conflict = agendamentos.buscar_conflito(
+        cursor,
+        funcionario.area_id,
+        start_date.isoformat(),
+        end_date.isoformat(),
+        ignorar_funcionario_id=funcionario_id,
     )
+    if conflict:
+        cursor.close()
+        conn.close()
+        return conflito_response(conflict)
+
+    # Atualiza o agendamento com os novos dados
+    agendamentos.alterar(cursor, funcionario_id, funcionario.area_id, dataFerias, diasFerias)
     conn.commit()
     cursor.close()
     conn.close()
+    publicar_evento("agendamento", acao="alterado", chapa=chapa, dataFerias=dataFerias, diasFerias=diasFerias)
     return jsonify(success=True, message="Agendamento alterado com sucesso.")
 
 
@@ -564,22 +730,119 @@ def alterar_agendamento():
 # LISTAR AGENDAMENTO
 # ------------------------------------------------------------
 
+LISTAGEM_LIMITE_PADRAO = 200
+LISTAGEM_LIMITE_MAXIMO = 1000
+
+
+def resposta_condicional(etag):
+    """
+    Cria a resposta com ETag (revalidada a cada uso, pois os dados são do
+    usuário). Retorna (response, nao_modificado): se o cliente já tem essa
+    versão, response é o 304 pronto para ser retornado.
+    """
+    response = make_response()
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    nao_modificado = response.make_conditional(request).status_code == 304
+    return response, nao_modificado
+
+
 @app.route('/listar_agendamentos', methods=['GET'])
 def listar_agendamentos():
+    """
+    Lista os agendamentos ordenados por data de início.
+    Parâmetros opcionais:
+      - area: id da área;
+      - inicio/fim (YYYY-MM-DD): apenas agendamentos que se sobrepõem ao período;
+      - limit (padrão 200, máximo 1000) e after (cursor da página anterior).
+    Se houver mais resultados, o cabeçalho Link (rel="next") aponta para a
+    próxima página. O ETag deriva da versão dos dados: sem alterações, 304.
+    """
+    try:
+        area_id = int(request.args["area"]) if request.args.get("area") else None
+        inicio, fim = (
+            datetime.strptime(request.args[nome], "%Y-%m-%d").date().isoformat()
+            if request.args.get(nome) else None
+            for nome in ("inicio", "fim")
+        )
+        limite = min(int(request.args.get("limit", LISTAGEM_LIMITE_PADRAO)), LISTAGEM_LIMITE_MAXIMO)
+        if limite < 1:
+            raise ValueError
+        # Cursor: "<data_ferias>_<id>" do último item da página anterior
+        apos_data = apos_id = None
+        if request.args.get("after"):
+            apos_data, apos_id = request.args["after"].split("_")
+            apos_data = datetime.strptime(apos_data, "%Y-%m-%d").date().isoformat()
+            apos_id = int(apos_id)
+    except (TypeError, ValueError):
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+
     from modules.employee_db import get_user_connection
     conn = get_user_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT f.chapa, f.nome, a.nome AS area, fa.data_ferias, fa.dias_ferias,
-               date(fa.data_ferias, '+' || fa.dias_ferias || ' days') AS data_retorno
+
+    versao, _ = versao_dados.ler(cursor)
+    etag = versao_dados.etag(
+        session["employee_db"], versao, "listar_agendamentos", area_id, inicio, fim, limite, apos_data, apos_id
+    )
+    response, nao_modificado = resposta_condicional(etag)
+    if nao_modificado:
+        cursor.close()
+        conn.close()
+        return response
+
+    result, proximo = consultar_agendamentos(cursor, area_id, inicio, fim, limite, apos_data, apos_id)
+    cursor.close()
+    conn.close()
+
+    if proximo:
+        args = request.args.to_dict()
+        args["after"] = proximo
+        response.headers["Link"] = f'<{url_for("listar_agendamentos", **args)}>; rel="next"'
+
+    response.set_data(app.json.dumps(result))
+    response.mimetype = "application/json"
+    return response
+
+
+def consultar_agendamentos(cursor, area_id=None, inicio=None, fim=None, limite=LISTAGEM_LIMITE_PADRAO,
+                           apos_data=None, apos_id=None):
+    """
+    Uma página de agendamentos ordenados por (data_ferias, id), com os filtros de
+    /listar_agendamentos. Retorna (itens, cursor da próxima página ou None).
+    """
+    # Só os filtros informados entram na consulta, para o planejador escolher o índice
+    condicoes = []
+    if area_id is not None:
+        condicoes.append("fa.area_id = :area_id")
+    if inicio:
+        condicoes.append("fa.data_retorno >= :inicio")
+    if fim:
+        condicoes.append("fa.data_ferias <= :fim")
+    if apos_data:
+        condicoes.append("(fa.data_ferias, fa.id) > (:apos_data, :apos_id)")
+    cursor.execute(f"""
+        SELECT fa.id, f.chapa, f.nome, a.nome AS area, fa.data_ferias, fa.dias_ferias, fa.data_retorno
         FROM ferias_agendadas fa
         JOIN funcionarios f ON fa.funcionario_id = f.id
-        JOIN areas a ON f.area_id = a.id
-        ORDER BY fa.data_ferias
-    """)
+        JOIN areas a ON fa.area_id = a.id
+        {"WHERE " + " AND ".join(condicoes) if condicoes else ""}
+        ORDER BY fa.data_ferias, fa.id
+        LIMIT :limite
+    """, {
+        "area_id": area_id,
+        "inicio": inicio,
+        "fim": fim,
+        "apos_data": apos_data,
+        "apos_id": apos_id,
+        # Uma linha a mais indica se existe próxima página
+        "limite": limite + 1,
+    })
     rows = cursor.fetchall()
+
     result = []
-    for row in rows:
+    for row in rows[:limite]:
         result.append({
             "chapa": row["chapa"],
             "nome": row["nome"],
@@ -588,9 +851,139 @@ def listar_agendamentos():
             "diasFerias": row["dias_ferias"],
             "data_retorno": row["data_retorno"]
         })
+    proximo = None
+    if len(rows) > limite:
+        ultimo = rows[limite - 1]
+        proximo = f"{ultimo['data_ferias']}_{ultimo['id']}"
+    return result, proximo
+
+
+# ------------------------------------------------------------
+# JANELAS LIVRES (sugestão de datas sem conflito)
+# ------------------------------------------------------------
+JANELAS_QUANTIDADE_PADRAO = 5
+JANELAS_QUANTIDADE_MAXIMA = 50
+
+
+@app.route("/janelas_livres", methods=["GET"])
+def janelas_livres():
+    """
+    Sugere as primeiras datas de início em que o funcionário ('chapa') pode
+    tirar 'dias' dias de férias sem conflito com a sua área (modules/janelas_livres.py).
+    Parâmetros opcionais: a_partir (YYYY-MM-DD, padrão hoje) e quantidade
+    (padrão 5, máximo 50).
+    Retorna JSON: { janelas: [{ dataFerias, dataRetorno }, ...] }, ou 400 se
+    o período não cabe no horizonte de planejamento (JANELAS_HORIZONTE_DIAS).
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    chapa = request.args.get("chapa")
+    try:
+        dias = int(request.args["dias"])
+        quantidade = min(int(request.args.get("quantidade", JANELAS_QUANTIDADE_PADRAO)),
+                         JANELAS_QUANTIDADE_MAXIMA)
+        a_partir = (datetime.strptime(request.args["a_partir"], "%Y-%m-%d").date()
+                    if request.args.get("a_partir") else None)
+        if not chapa or dias < 1 or quantidade < 1:
+            raise ValueError
+    except (KeyError, ValueError):
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+
+    funcionario = diretorio_funcionarios.buscar(chapa)
+    if not funcionario:
+        return jsonify(success=False, message="Funcionário não encontrado."), 404
+
+    # NumPy só é carregado na primeira consulta
+    from modules import janelas_livres as janelas
+    from modules.employee_db import get_user_connection
+    conn = get_user_connection()
+    cursor = conn.cursor()
+    try:
+        inicios = janelas.buscar(cursor, session["employee_db"], funcionario, dias, quantidade, a_partir)
+    except ValueError as e:
+        return jsonify(success=False, message=str(e)), 400
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify(janelas=[
+        {"dataFerias": inicio, "dataRetorno": agendamentos.calcular_retorno(inicio, dias)}
+        for inicio in inicios
+    ])
+
+
+# ------------------------------------------------------------
+# CONTEXTO DO FUNCIONÁRIO (marcar_ferias)
+# ------------------------------------------------------------
+@app.route("/funcionario/<chapa>/contexto", methods=["GET"])
+def contexto_funcionario(chapa):
+    """
+    Reúne em uma requisição (e uma conexão) o que a página de marcar férias
+    precisa após digitar a chapa:
+      - funcionario: nome, área e id da área;
+      - agendamento: { agendado, dataFerias, diasFerias, dataRetorno };
+      - pedidos: pedidos de aprovação pendentes do funcionário;
+      - agendamentosArea: primeira página dos agendamentos da área (como em
+        /listar_agendamentos?area=<id>) e proximaPagina, se houver mais.
+    Retorna 404 se a chapa não existir.
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    funcionario = diretorio_funcionarios.buscar(chapa)
+    if not funcionario:
+        return jsonify(success=False, message="Funcionário não encontrado."), 404
+
+    from modules.employee_db import get_user_connection
+
+    conn = get_user_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT data_ferias, dias_ferias, data_retorno FROM ferias_agendadas WHERE funcionario_id = ?",
+        (funcionario.id,),
+    )
+    atual = cursor.fetchone()
+
+    cursor.execute(
+        """
+        SELECT id, dataFerias, diasFerias, data_pedido
+        FROM pedidos_aprovacao
+        WHERE chapa = ? AND status = 'PENDENTE'
+        ORDER BY data_pedido
+    """,
+        (chapa,),
+    )
+    pedidos = [dict(row) for row in cursor.fetchall()]
+
+    agendamentos_area, proximo = [], None
+    if funcionario.area_id is not None:
+        agendamentos_area, proximo = consultar_agendamentos(cursor, area_id=funcionario.area_id)
     cursor.close()
     conn.close()
-    return jsonify(result)
+
+    if atual:
+        agendamento = {
+            "agendado": True,
+            "dataFerias": atual["data_ferias"],
+            "diasFerias": atual["dias_ferias"],
+            "dataRetorno": atual["data_retorno"],
+        }
+    else:
+        agendamento = {"agendado": False}
+
+    return jsonify(
+        funcionario={
+            "chapa": chapa,
+            "nome": funcionario.nome,
+            "area": funcionario.area,
+            "areaId": funcionario.area_id,
+        },
+        agendamento=agendamento,
+        pedidos=pedidos,
+        agendamentosArea=agendamentos_area,
+        proximaPagina=(
+            url_for("listar_agendamentos", area=funcionario.area_id, after=proximo)
+            if proximo else None
+        ),
+    )
 
 
 # ------------------------------------------------------------
@@ -600,10 +993,14 @@ def listar_agendamentos():
 def solicitar_aprovacao():
     if not session.get("logged_in"):
         return jsonify(success=False, message="Não autorizado"), 401
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     chapa = data.get("chapa")
-    dataFerias = data.get("dataFerias")
-    diasFerias = data.get("diasFerias")
+    if not chapa:
+        return jsonify(success=False, message="Dados incompletos."), 400
+    try:
+        dataFerias, diasFerias, _ = agendamentos.validar_periodo(data.get("dataFerias"), data.get("diasFerias"))
+    except ValueError:
+        return jsonify(success=False, message="Dados inválidos: informe a data (AAAA-MM-DD) e os dias."), 400
     try:
         conn = EmployeeDB.get_connection()
         cursor = conn.cursor()
@@ -617,6 +1014,7 @@ def solicitar_aprovacao():
         conn.commit()
         cursor.close()
         conn.close()
+        publicar_evento("pedido", acao="novo", chapa=chapa, dataFerias=dataFerias, diasFerias=diasFerias)
         return jsonify(
             success=True, message="Pedido de aprovação enviado ao supervisor."
         )
@@ -631,15 +1029,17 @@ def solicitar_aprovacao():
 @app.route("/dashboard", methods=["GET"])
 def dashboard():
     """
-    Renderiza o dashboard com os dados obtidos pelo DashboardManager.
+    Renderiza o dashboard com o total de agendamentos e os pedidos pendentes;
+    o gráfico é carregado pelo navegador em /dashboard_data.
     """
     if not session.get("logged_in"):
         return redirect(url_for("login"))
-    data = DashboardManager.get_dashboard_data()
+    data = DashboardManager.get_resumo_pagina()
     return render_template(
         "dashboard.html",
         total_agendamentos=data["total_agendamentos"],
         pedidos_aprovacao=data["pedidos_aprovacao"],
+        chave_dados=versao_dados.etag(session["employee_db"], 0, "dashboard"),
         profile_pic_path=session.get("profile_pic"),
     )
 
@@ -650,23 +1050,205 @@ def dashboard():
 @app.route("/dashboard_data", methods=["GET"])
 def dashboard_data():
     """
-    Retorna os dados do dashboard em formato JSON.
+    Retorna os dados do dashboard em formato JSON, com a versão dos dados (versao).
     Inclui labels (meses), datasets (dados agrupados por área), total_agendamentos e pedidos_aprovacao.
+    Com ?since=<versao>, retorna só as células do resumo alteradas depois
+    dessa versão (celulas: [{mes, areaId, area, total, detalhes}]; total 0 =
+    célula removida), total_agendamentos e pedidos_aprovacao. Com since=0 ou
+    uma versão que o banco não tem (completo=true), todas as células: o
+    navegador descarta as que guardava.
+    O ETag deriva da versão dos dados: sem alterações, 304.
     """
     if not session.get("logged_in"):
         return jsonify(success=False, message="Não autorizado"), 401
-    data = DashboardManager.get_dashboard_data()
-    return jsonify(
-        labels=data["labels"],
-        datasets=data["datasets"],
-        total_agendamentos=data["total_agendamentos"],
-        pedidos_aprovacao=data["pedidos_aprovacao"],
-    )
+    try:
+        desde = int(request.args["since"]) if request.args.get("since") else None
+        if desde is not None and desde < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+
+    from modules.employee_db import get_user_connection
+    conn = get_user_connection()
+    cursor = conn.cursor()
+    versao, _ = versao_dados.ler(cursor)
+    cursor.close()
+    conn.close()
+    if desde is not None and desde > versao:
+        desde = 0
+    etag = versao_dados.etag(session["employee_db"], versao, "dashboard_data", desde)
+    response, nao_modificado = resposta_condicional(etag)
+    if nao_modificado:
+        return response
+
+    if desde is None:
+        data = DashboardManager.get_dashboard_data()
+        resultado = {
+            "versao": versao,
+            "labels": data["labels"],
+            "datasets": data["datasets"],
+            "total_agendamentos": data["total_agendamentos"],
+            "pedidos_aprovacao": data["pedidos_aprovacao"],
+        }
+    else:
+        data = DashboardManager.get_dashboard_delta(desde)
+        resultado = {
+            "versao": versao,
+            "completo": desde == 0,
+            "celulas": data["celulas"],
+            "total_agendamentos": data["total_agendamentos"],
+            "pedidos_aprovacao": data["pedidos_aprovacao"],
+        }
+
+    response.set_data(app.json.dumps(resultado))
+    response.mimetype = "application/json"
+    return response
+
+
+# ------------------------------------------------------------
+# EVENTOS DO DASHBOARD (SERVER-SENT EVENTS)
+# ------------------------------------------------------------
+def publicar_evento(tipo, **dados):
+    """
+    Publica um evento do dashboard (modules/eventos.py) para o banco da
+    sessão. Chamada pelas rotas de escrita depois do commit.
+    """
+    eventos.publicar(session["employee_db"], tipo, dados)
+
+
+@app.route("/eventos", methods=["GET"])
+def eventos_dashboard():
+    """
+    Fluxo text/event-stream com os eventos do banco do usuário: 'pedido'
+    (acao novo, aprovado ou rejeitado; aprovar também agenda as férias),
+    'agendamento' (agendado, alterado, cancelado ou excluidos) e
+    'recarregar'. Retoma depois do cabeçalho Last-Event-ID. Acima do limite
+    de fluxos abertos, 503 com Retry-After.
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    assincrono = request.environ.get("eventos.assincrono", False)
+    fluxo = eventos.abrir(session["employee_db"], request.headers.get("Last-Event-ID"), assincrono)
+    if fluxo is None:
+        response = jsonify(success=False, message="Muitas conexões de eventos. Tente novamente em instantes.")
+        response.status_code = 503
+        response.headers["Retry-After"] = str(eventos.RECONEXAO_MS // 1000)
+        return response
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if assincrono:
+        # O adaptador ASGI envia os eventos pelo laço de eventos (modules/asgi.py)
+        request.environ["eventos.fluxo"] = fluxo
+        return Response(b"", mimetype="text/event-stream", headers=headers)
+    return Response(fluxo, mimetype="text/event-stream", headers=headers)
+
+
+# ------------------------------------------------------------
+# CONFLITOS (SOBREPOSIÇÕES EXISTENTES)
+# ------------------------------------------------------------
+@app.route("/conflitos", methods=["GET"])
+def listar_conflitos():
+    """
+    Retorna os grupos de agendamentos sobrepostos em cada área (modules/conflitos.py).
+    Parâmetros opcionais:
+      - area: id da área;
+      - pedidos=0: não inclui os pedidos pendentes como períodos hipotéticos.
+    O ETag deriva da versão dos dados: sem alterações, 304.
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    try:
+        area_id = int(request.args["area"]) if request.args.get("area") else None
+    except ValueError:
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+    incluir_pedidos = request.args.get("pedidos", "1") != "0"
+
+    from modules.employee_db import get_user_connection
+    conn = get_user_connection()
+    cursor = conn.cursor()
+
+    versao, _ = versao_dados.ler(cursor)
+    etag = versao_dados.etag(session["employee_db"], versao, "conflitos", area_id, incluir_pedidos)
+    response, nao_modificado = resposta_condicional(etag)
+    if nao_modificado:
+        cursor.close()
+        conn.close()
+        return response
+
+    resultado = conflitos.relatorio(cursor, area_id, incluir_pedidos)
+    cursor.close()
+    conn.close()
+
+    response.set_data(app.json.dumps(resultado))
+    response.mimetype = "application/json"
+    return response
+
+
+# ------------------------------------------------------------
+# OCUPAÇÃO DIÁRIA POR ÁREA (mapa de calor)
+# ------------------------------------------------------------
+OCUPACAO_DIAS_PADRAO = 365
+OCUPACAO_DIAS_MAXIMO = 731
+
+
+@app.route("/ocupacao", methods=["GET"])
+def ocupacao_diaria():
+    """
+    Retorna, para cada área, quantos funcionários estão de férias em cada dia
+    do intervalo e o percentual do quadro da área (modules/ocupacao.py).
+    Parâmetros opcionais:
+      - inicio/fim (YYYY-MM-DD): padrão, 365 dias a partir de hoje; no máximo 731 dias;
+      - area: id da área.
+    O ETag deriva da versão dos dados: sem alterações, 304.
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    try:
+        inicio = (datetime.strptime(request.args["inicio"], "%Y-%m-%d").date()
+                  if request.args.get("inicio") else datetime.now().date())
+        fim = (datetime.strptime(request.args["fim"], "%Y-%m-%d").date()
+               if request.args.get("fim") else inicio + timedelta(days=OCUPACAO_DIAS_PADRAO - 1))
+        area_id = int(request.args["area"]) if request.args.get("area") else None
+        if not 0 <= (fim - inicio).days < OCUPACAO_DIAS_MAXIMO:
+            raise ValueError
+    except ValueError:
+        return jsonify(success=False, message="Parâmetros inválidos."), 400
+
+    from modules.employee_db import get_user_connection
+    conn = get_user_connection()
+    cursor = conn.cursor()
+
+    versao, _ = versao_dados.ler(cursor)
+    etag = versao_dados.etag(session["employee_db"], versao, "ocupacao", inicio, fim, area_id)
+    response, nao_modificado = resposta_condicional(etag)
+    if nao_modificado:
+        cursor.close()
+        conn.close()
+        return response
+
+    # NumPy só é carregado na primeira consulta
+    from modules import ocupacao
+    resultado = ocupacao.calcular(cursor, inicio, fim, area_id)
+    cursor.close()
+    conn.close()
+
+    response.set_data(app.json.dumps(resultado))
+    response.mimetype = "application/json"
+    return response
 
 
 # ------------------------------------------------------------
 # APROVAR/REJEITAR PEDIDOS
 # ------------------------------------------------------------
+# Pedido não aprovado por /aprovar_pedido: resultado -> mensagem
+MENSAGENS_PEDIDO = {
+    "NAO_ENCONTRADO": "Pedido não encontrado.",
+    "JA_PROCESSADO": "Pedido já processado.",
+    "FUNCIONARIO_NAO_ENCONTRADO": "Funcionário não encontrado.",
+    "DADOS_INVALIDOS": "Data ou dias do pedido inválidos.",
+    "JA_AGENDADO": "O funcionário já tem férias agendadas. Altere o agendamento existente.",
+}
+
+
 @app.route("/aprovar_pedido", methods=["POST"])
 def aprovar_pedido():
     if not session.get("logged_in"):
@@ -675,15 +1257,66 @@ def aprovar_pedido():
     pedido_id = data.get("pedido_id")
     acao = data.get("acao")
     if acao == "aprovar":
-        result = DashboardManager.aprovar_pedido(pedido_id)
+        status = DashboardManager.aprovar_pedido(pedido_id)
+        if status is None:
+            return jsonify(success=False), 500
+        if status != "APROVADO":
+            return jsonify(success=False, status=status, message=MENSAGENS_PEDIDO[status]), (
+                404 if status == "NAO_ENCONTRADO" else 409)
+        result = True
     else:
         result = DashboardManager.rejeitar_pedido(pedido_id)
     if result:
+        publicar_evento("pedido", acao="aprovado" if acao == "aprovar" else "rejeitado", pedidoIds=[pedido_id])
         return jsonify(success=True)
     else:
         return jsonify(success=False), 500
 
 
+# Máximo de pedidos aceitos por chamada de /aprovar_pedidos
+MAX_PEDIDOS_LOTE = 1000
+
+
+@app.route("/aprovar_pedidos", methods=["POST"])
+def aprovar_pedidos():
+    """
+    Aprova ou rejeita vários pedidos em uma única transação.
+    Corpo: {"pedido_ids": [1, 2, ...], "acao": "aprovar" | "rejeitar"}.
+    Retorna o resultado de cada pedido (APROVADO, REJEITADO, NAO_ENCONTRADO,
+    JA_PROCESSADO, FUNCIONARIO_NAO_ENCONTRADO, DADOS_INVALIDOS ou JA_AGENDADO)
+    e os totais.
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    data = request.get_json(silent=True) or {}
+    pedido_ids = data.get("pedido_ids")
+    acao = data.get("acao")
+    if acao not in ("aprovar", "rejeitar"):
+        return jsonify(success=False, message="Ação inválida."), 400
+    if (not isinstance(pedido_ids, list) or not pedido_ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in pedido_ids)):
+        return jsonify(success=False, message="Informe a lista de pedidos."), 400
+    # Remove repetidos, mantendo a ordem
+    pedido_ids = list(dict.fromkeys(pedido_ids))
+    if len(pedido_ids) > MAX_PEDIDOS_LOTE:
+        return jsonify(success=False, message=f"No máximo {MAX_PEDIDOS_LOTE} pedidos por vez."), 400
+
+    resultados = DashboardManager.processar_pedidos(pedido_ids, acao)
+    if resultados is None:
+        return jsonify(success=False, message="Erro ao processar os pedidos."), 500
+    processados = [i for i, s in resultados.items() if s in ("APROVADO", "REJEITADO")]
+    if processados:
+        publicar_evento("pedido", acao="aprovado" if acao == "aprovar" else "rejeitado", pedidoIds=processados)
+    status = list(resultados.values())
+    return jsonify(
+        success=True,
+        resultados=[{"pedidoId": i, "status": s} for i, s in resultados.items()],
+        aprovados=status.count("APROVADO"),
+        rejeitados=status.count("REJEITADO"),
+        ignorados=len(status) - status.count("APROVADO") - status.count("REJEITADO"),
+    )
+
+
 # ------------------------------------------------------------
 # EXCLUIR TODOS OS AGENDAMENTOS
 # ------------------------------------------------------------
@@ -693,6 +1326,7 @@ def excluir_agendamentos():
         return jsonify(success=False, message="Não autorizado"), 401
     result = DashboardManager.excluir_agendamentos()
     if result:
+        publicar_evento("agendamento", acao="excluidos")
         return jsonify(success=True)
     else:
         return jsonify(success=False), 500
@@ -703,144 +1337,270 @@ def excluir_agendamentos():
 # ------------------------------------------------------------
 @app.route("/relatorio")
 def relatorio():
+    """
+    Relatório de férias (HTML). Filtros opcionais: ?area=<id>&inicio=YYYY-MM-DD&fim=YYYY-MM-DD.
+    """
     if not session.get("logged_in"):
         return redirect(url_for("login"))
+    try:
+        filtros = filtros_relatorio()
+    except ValueError:
+        return "Parâmetros inválidos", 400
+
+    return responder_relatorio(
+        "html",
+        filtros,
+        lambda: gerar_html_relatorio(filtros=filtros).encode("utf-8"),
+        "text/html; charset=utf-8",
+    )
 
-    conn = EmployeeDB.get_connection()
-    cursor = conn.cursor()
 
-    # Funcionários em período de férias (data_ferias <= hoje <= data_ferias + dias_ferias)
-    cursor.execute(
-        """
-        SELECT f.chapa, f.nome, fa.data_ferias, fa.dias_ferias,
-               date(fa.data_ferias, '+' || fa.dias_ferias || ' days') AS data_retorno
-        FROM ferias_agendadas fa
-        JOIN funcionarios f ON fa.funcionario_id = f.id
-        WHERE date(fa.data_ferias) <= date('now')
-          AND date(fa.data_ferias, '+' || fa.dias_ferias || ' days') >= date('now')
+def filtros_relatorio():
     """
-    )
-    em_ferias_rows = cursor.fetchall()
-    # Transforma em lista de tuplas (ou use como preferir)
-    em_ferias = []
-    for row in em_ferias_rows:
-        em_ferias.append(
-            (
-                row["chapa"],
-                row["nome"],
-                row["data_ferias"],
-                row["dias_ferias"],
-                row["data_retorno"],
-            )
-        )
-
-    # Funcionários com férias agendadas, mas ainda não iniciadas
-    cursor.execute(
-        """
-        SELECT f.chapa, f.nome, fa.data_ferias, fa.dias_ferias,
-        date(fa.data_ferias, '+' || fa.dias_ferias || ' days') AS data_retorno
-        FROM ferias_agendadas fa
-        JOIN funcionarios f ON fa.funcionario_id = f.id
-        WHERE date(fa.data_ferias) > date('now')
+    Lê e valida os filtros do relatório da query string (area, inicio, fim).
+    Levanta ValueError se algum for inválido.
     """
-    )
-    agendados_rows = cursor.fetchall()
-    agendados = []
-    for row in agendados_rows:
-        agendados.append(
-            (
-                row["chapa"],
-                row["nome"],
-                row["data_ferias"],
-                row["dias_ferias"],
-                row["data_retorno"],
-            )
-        )
+    filtros = {}
+    if request.args.get("area"):
+        filtros["area_id"] = int(request.args["area"])
+    for nome in ("inicio", "fim"):
+        if request.args.get(nome):
+            filtros[nome] = datetime.strptime(request.args[nome], "%Y-%m-%d").date().isoformat()
+    return filtros
 
+
+def versao_relatorio(db_path, formato, filtros=None):
+    """
+    Retorna (etag, ultima_modificacao) do relatório do banco 'db_path' no formato
+    informado: a chave do cache (modules/relatorio_cache.py) e o instante da
+    última alteração dos dados (ou o início do dia, se posterior, pois o
+    relatório depende da data atual).
+    """
+    conn = EmployeeDB.get_connection(db_path)
+    cursor = conn.cursor()
+    versao, atualizado_em = versao_dados.ler(cursor)
     cursor.close()
     conn.close()
 
-    return render_template("relatorio.html", em_ferias=em_ferias, agendados=agendados)
+    agora = datetime.now(timezone.utc)
+    etag = relatorio_cache.chave(db_path, versao, agora.date().isoformat(), formato, filtros)
+    ultima_modificacao = max(
+        datetime.strptime(atualizado_em, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc),
+        datetime.combine(agora.date(), time.min, timezone.utc),
+    )
+    return etag, ultima_modificacao
+
+
+def relatorio_cacheado(etag, formato, gerar):
+    """
+    Retorna o relatório do cache ou o gera com gerar() e o grava no cache
+    (None se a geração falhar).
+    """
+    conteudo = relatorio_cache.obter(etag, formato)
+    if conteudo is None:
+        conteudo = gerar()
+        if conteudo:
+            relatorio_cache.gravar(etag, formato, conteudo)
+    return conteudo
+
+
+def responder_relatorio(formato, filtros, gerar, content_type, headers=None):
+    """
+    Responde com o relatório do usuário logado, usando o cache em disco e
+    ETag/Last-Modified: se o cliente já tem a versão atual, retorna 304 sem
+    consultar nem renderizar nada.
+    """
+    etag, ultima_modificacao = versao_relatorio(session["employee_db"], formato, filtros)
+
+    response = make_response()
+    response.set_etag(etag)
+    response.last_modified = ultima_modificacao
+    # O navegador guarda a cópia, mas sempre revalida (os dados são por usuário)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    if response.make_conditional(request).status_code == 304:
+        return response
+
+    conteudo = relatorio_cacheado(etag, formato, gerar)
+    if not conteudo:
+        return "Erro ao gerar relatório", 500
+    response.set_data(conteudo)
+    response.headers["Content-Type"] = content_type
+    response.headers.update(headers or {})
+    return response
+
+
+def gerar_html_relatorio(db_path=None, filtros=None):
+    """
+    Consulta os dados do relatório (modules/report_service.py) e renderiza relatorio.html.
+    """
+    dados = ReportService.dados_relatorio(db_path, **(filtros or {}))
+    return render_template("relatorio.html", filtros=filtros or {}, **dados)
 
 
 # ------------------------------------------------------------
 # GERAR PDF
 # ------------------------------------------------------------
-@app.route("/gerar_pdf")
+@app.route("/gerar_pdf", methods=["GET", "POST"])
 def gerar_pdf():
+    """
+    GET: gera o PDF do relatório na própria requisição e o retorna.
+    POST: agenda a geração em segundo plano e retorna { jobId } (acompanhe em /jobs/<id>).
+    Aceita os mesmos filtros de /relatorio.
+    """
     if not session.get("logged_in"):
+        if request.method == "POST":
+            return jsonify(success=False, message="Não autorizado"), 401
         return redirect(url_for("login"))
+    try:
+        filtros = filtros_relatorio()
+    except ValueError:
+        if request.method == "POST":
+            return jsonify(success=False, message="Parâmetros inválidos"), 400
+        return "Parâmetros inválidos", 400
+
+    if request.method == "POST":
+        job_id = jobs.submeter(
+            "gerar_pdf",
+            session["usuario"],
+            {"employee_db": session["employee_db"], "filtros": filtros},
+        )
+        return jsonify(success=True, jobId=job_id), 202
+
+    return responder_relatorio(
+        "pdf",
+        filtros,
+        lambda: gerar_pdf_relatorio(filtros=filtros),
+        "application/pdf",
+        {"Content-Disposition": "inline; filename=relatorio_ferias.pdf"},
+    )
 
-    conn = EmployeeDB.get_connection()
-    cursor = conn.cursor()
 
-    # Consulta de funcionários em período de férias
-    cursor.execute(
-        """
-        SELECT f.chapa, f.nome, fa.data_ferias, fa.dias_ferias,
-        date(fa.data_ferias, '+' || fa.dias_ferias || ' days') as data_retorno
-        FROM ferias_agendadas fa
-        JOIN funcionarios f ON fa.funcionario_id = f.id
-        WHERE date(fa.data_ferias) <= date('now')
-        AND date(fa.data_ferias, '+' || fa.dias_ferias || ' days') >= date('now')
+def gerar_pdf_relatorio(db_path=None, filtros=None):
     """
-    )
-    em_ferias_rows = cursor.fetchall()
-    em_ferias = []
-    for row in em_ferias_rows:
-        em_ferias.append(
-            (
-                row["chapa"],
-                row["nome"],
-                row["data_ferias"],
-                row["dias_ferias"],
-                row["data_retorno"],
-            )
-        )
+    Consulta os dados do relatório no banco do usuário (ou em db_path),
+    renderiza relatorio_pdf.html e retorna os bytes do PDF (None em caso de erro).
+    """
+    dados = ReportService.dados_relatorio(db_path, **(filtros or {}))
+    html = render_template("relatorio_pdf.html", **dados)
+    # A renderização do PDF é CPU pura: vai para o pool de processos, se ativo
+    with metricas.cronometro("ferias_pdf_render_duration_seconds"):
+        return processos.executar(html_to_pdf, html)
 
-    # Consulta de funcionários com férias agendadas (futuras)
-    cursor.execute(
-        """
-        SELECT f.chapa, f.nome, fa.data_ferias, fa.dias_ferias,
-        date(fa.data_ferias, '+' || fa.dias_ferias || ' days') as data_retorno
-        FROM ferias_agendadas fa
-        JOIN funcionarios f ON fa.funcionario_id = f.id
-        WHERE date(fa.data_ferias) > date('now')
+
+# ------------------------------------------------------------
+# TAREFAS EM SEGUNDO PLANO
+# ------------------------------------------------------------
+def importar_planilha(parametros, job_id):
     """
-    )
-    agendados_rows = cursor.fetchall()
-    agendados = []
-    for row in agendados_rows:
-        agendados.append(
-            (
-                row["chapa"],
-                row["nome"],
-                row["data_ferias"],
-                row["dias_ferias"],
-                row["data_retorno"],
-            )
+    Importa a planilha da tarefa 'job_id'. Roda na thread da tarefa ou em um
+    processo do pool (modules/processos.py). Retorna (mensagem, estatisticas).
+    """
+    from modules.planilha_processor import process_planilha, process_planilha_streaming
+
+    if parametros.get("streaming"):
+        job = jobs.Job(job_id)
+        return process_planilha_streaming(
+            parametros["arquivo"],
+            parametros["employee_db"],
+            progresso=lambda linhas: job.progresso(mensagem=f"{linhas} linhas importadas."),
         )
+    return process_planilha(parametros["arquivo"], parametros["employee_db"])
 
-    cursor.close()
-    conn.close()
 
-    html = render_template(
-        "relatorio_pdf.html", em_ferias=em_ferias, agendados=agendados
+@jobs.registrar("importar_planilha")
+def job_importar_planilha(parametros, job):
+    """
+    Importa a planilha enviada em /profile para o banco do gestor. O arquivo
+    enviado é apagado ao fim da tarefa, com sucesso ou falha.
+    """
+    try:
+        mensagem, estatisticas = processos.executar(importar_planilha, parametros, job.id)
+    finally:
+        try:
+            os.remove(parametros["arquivo"])
+        except OSError as e:
+            print(f"Erro ao apagar a planilha '{parametros['arquivo']}':", e)
+    if processos.ativo():
+        # O diretório recarregado foi o do processo do pool, não o deste
+        diretorio_funcionarios.invalidar(parametros["employee_db"])
+    if estatisticas is None:
+        raise RuntimeError(mensagem)
+    return {"mensagem": mensagem, "estatisticas": estatisticas}
+
+
+@jobs.registrar("gerar_pdf")
+def job_gerar_pdf(parametros, job):
+    """
+    Gera o PDF do relatório e o grava como resultado da tarefa.
+    """
+    job.progresso(0.1, "Gerando PDF do relatório.")
+    db_path = parametros["employee_db"]
+    filtros = parametros.get("filtros") or {}
+    etag, _ = versao_relatorio(db_path, "pdf", filtros)
+    pdf = relatorio_cacheado(etag, "pdf", lambda: gerar_pdf_relatorio(db_path, filtros))
+    if not pdf:
+        raise RuntimeError("Erro ao gerar PDF")
+    caminho = job.caminho_arquivo("pdf")
+    with open(caminho, "wb") as f:
+        f.write(pdf)
+    return {"mensagem": "PDF gerado com sucesso.", "arquivo": caminho}
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """
+    Retorna status, progresso, mensagem e resultado de uma tarefa do usuário logado.
+    """
+    if not session.get("logged_in"):
+        return jsonify(success=False, message="Não autorizado"), 401
+    job = jobs.obter(job_id, session["usuario"])
+    if not job:
+        return jsonify(success=False, message="Tarefa não encontrada."), 404
+    resultado = job["resultado"] or {}
+    if "arquivo" in resultado:
+        # Não expõe o caminho no servidor
+        resultado.pop("arquivo")
+        job["resultadoUrl"] = url_for("job_resultado", job_id=job_id)
+    return jsonify(job)
+
+
+@app.route("/jobs/<job_id>/resultado", methods=["GET"])
+def job_resultado(job_id):
+    """
+    Entrega o arquivo gerado por uma tarefa concluída (ex.: PDF do relatório).
+    """
+    if not session.get("logged_in"):
+        return redirect(url_for("login"))
+    job = jobs.obter(job_id, session["usuario"])
+    if not job or job["status"] != "CONCLUIDO" or not (job["resultado"] or {}).get("arquivo"):
+        return jsonify(success=False, message="Resultado não disponível."), 404
+    return send_file(
+        job["resultado"]["arquivo"],
+        mimetype="application/pdf",
+        download_name="relatorio_ferias.pdf",
     )
-    pdf = html_to_pdf(html)
-    if pdf:
-        response = make_response(pdf)
-        response.headers["Content-Type"] = "application/pdf"
-        response.headers["Content-Disposition"] = (
-            "inline; filename=relatorio_ferias.pdf"
-        )
-        return response
-    else:
-        return "Erro ao gerar PDF", 500
+
+
+# ------------------------------------------------------------
+# MÉTRICAS
+# ------------------------------------------------------------
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Métricas de todos os processos no formato de texto do Prometheus
+    (modules/metricas.py). Com METRICAS_TOKEN definido, exige
+    "Authorization: Bearer <token>".
+    """
+    if metricas.TOKEN:
+        esperado = f"Bearer {metricas.TOKEN}".encode()
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), esperado):
+            return jsonify(success=False, message="Não autorizado"), 401
+    return Response(metricas.exportar(), mimetype="text/plain; version=0.0.4")
 
 
 # ------------------------------------------------------------
 # EXECUÇÃO DO SERVIDOR FLASK
 # ------------------------------------------------------------
 if __name__ == "__main__":
-    app.run()  # Não use debug=True em produção
+    create_app().run()  # Não use debug=True em produção
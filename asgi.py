@@ -0,0 +1,22 @@
+"""
+Ponto de entrada do modo ASGI (modules/asgi.py):
+
+    uvicorn asgi:app            (ou outro servidor ASGI, ex.: hypercorn)
+
+As views rodam em um executor de threads limitado (ASGI_THREADS, ASGI_FILA)
+e o PDF e a importação de planilhas em um pool de processos
+(PROCESSOS_WORKERS, padrão: número de CPUs). Corpos acima do limite da rota
+(MAX_CONTENT_LENGTH; PLANILHA_MAX_MB em /profile) são recusados com 413
+antes de serem gravados.
+"""
+
+import os
+
+from app import create_app, limite_corpo
+from modules import processos
+from modules.asgi import AdaptadorAsgi
+
+if "PROCESSOS_WORKERS" not in os.environ:
+    processos.configurar(os.cpu_count() or 1)
+
+app = AdaptadorAsgi(create_app(), limite_corpo=limite_corpo)
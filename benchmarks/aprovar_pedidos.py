@@ -0,0 +1,123 @@
+"""
+Benchmark: benchmarks/aprovar_pedidos.py
+----------------------------------------
+Compara as duas formas de esvaziar a fila de pedidos de aprovação do
+dashboard:
+
+  - um a um: uma chamada de /aprovar_pedido por pedido (uma transação,
+    uma busca do pedido e do funcionário e um commit por chamada);
+  - em lote: uma única chamada de /aprovar_pedidos com todos os ids
+    (uma consulta, executemany e um único commit).
+
+Os pedidos são de funcionários de poucas áreas e meses, como ao fim da janela
+anual de planejamento. As chamadas passam pela aplicação (test_client), com
+sessão autenticada, no modo de armazenamento por arquivo.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.aprovar_pedidos [--pedidos 300] [--funcionarios 2000]
+
+A aplicação roda em um diretório temporário (app.db e bancos próprios).
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AREAS = 8
+
+
+def popular(arquivo, funcionarios):
+    conn = sqlite3.connect(arquivo)
+    conn.executemany("INSERT INTO areas (id, nome) VALUES (?, ?)",
+                     [(a, f"ÁREA {a}") for a in range(1, AREAS + 1)])
+    conn.executemany(
+        "INSERT INTO funcionarios (nome, chapa, area_id) VALUES (?, ?, ?)",
+        [(f"FUNCIONARIO {i}", str(100000 + i), 1 + i % AREAS) for i in range(funcionarios)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def criar_pedidos(arquivo, pedidos, funcionarios):
+    """
+    Zera agendamentos e pedidos e cria 'pedidos' pedidos pendentes. Retorna os ids.
+    """
+    random.seed(1)
+    conn = sqlite3.connect(arquivo)
+    conn.execute("DELETE FROM ferias_agendadas")
+    conn.execute("DELETE FROM resumo_ferias_mensal")
+    conn.execute("DELETE FROM pedidos_aprovacao")
+    for chapa in random.sample(range(funcionarios), pedidos):
+        inicio = date(2031, 1, 1) + timedelta(days=random.randint(0, 89))
+        conn.execute(
+            "INSERT INTO pedidos_aprovacao (chapa, dataFerias, diasFerias) VALUES (?, ?, ?)",
+            (str(100000 + chapa), inicio.isoformat(), random.choice((10, 15, 20, 30))),
+        )
+    ids = [row[0] for row in conn.execute("SELECT id FROM pedidos_aprovacao ORDER BY id")]
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def resumo(arquivo):
+    conn = sqlite3.connect(arquivo)
+    linhas = conn.execute(
+        "SELECT mes, area_id, total, detalhes FROM resumo_ferias_mensal ORDER BY mes, area_id"
+    ).fetchall()
+    conn.close()
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=300)
+    parser.add_argument("--funcionarios", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        sys.path.insert(0, RAIZ)
+        from app import create_app
+
+        app = create_app()
+        app.logger.disabled = True
+        cliente = app.test_client()
+        cliente.post("/register", json={"usuario": "bench", "senha": "senha-bench"})
+        cliente.post("/login", json={"usuario": "bench", "senha": "senha-bench"})
+        arquivo = os.path.join(tmp, "gestor_bench_funcionarios.db")
+        popular(arquivo, args.funcionarios)
+
+        ids = criar_pedidos(arquivo, args.pedidos, args.funcionarios)
+        t0 = time.perf_counter()
+        for pedido_id in ids:
+            resposta = cliente.post("/aprovar_pedido", json={"pedido_id": pedido_id, "acao": "aprovar"})
+            assert resposta.status_code == 200, resposta.get_json()
+        um_a_um = time.perf_counter() - t0
+        resumo_um_a_um = resumo(arquivo)
+
+        ids = criar_pedidos(arquivo, args.pedidos, args.funcionarios)
+        t0 = time.perf_counter()
+        resposta = cliente.post("/aprovar_pedidos", json={"pedido_ids": ids, "acao": "aprovar"})
+        em_lote = time.perf_counter() - t0
+        dados = resposta.get_json()
+        assert dados["success"] and dados["aprovados"] == len(ids), dados
+        # Os dois caminhos devem produzir o mesmo resumo do dashboard
+        assert resumo(arquivo) == resumo_um_a_um
+        os.chdir(RAIZ)
+
+    print(f"{args.pedidos} pedidos aprovados ({args.funcionarios} funcionários, {AREAS} áreas)")
+    print(f"  um a um ({args.pedidos} chamadas): {um_a_um * 1000:8.1f} ms   "
+          f"({um_a_um / args.pedidos * 1000:.2f} ms por pedido)")
+    print(f"  em lote (1 chamada):   {em_lote * 1000:8.1f} ms   "
+          f"({um_a_um / em_lote:.0f}x mais rápido)")
+
+
+if __name__ == "__main__":
+    main()
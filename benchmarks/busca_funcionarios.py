@@ -0,0 +1,103 @@
+"""
+Benchmark: benchmarks/busca_funcionarios.py
+-------------------------------------------
+Mede o tempo do autocomplete de funcionários (modules/busca_funcionarios.py)
+em um banco temporário com muitos funcionários, buscando trechos de nomes e
+de chapas como os digitados na tela.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.busca_funcionarios [--funcionarios 50000] [--consultas 2000]
+
+Falha (código de saída 1) se o p99 por busca passar de 10 ms.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from modules import busca_funcionarios
+from modules.employee_db import create_user_db
+
+LIMITE_MS = 10.0
+
+NOMES = ["ANA", "ANDRE", "BRUNO", "CARLOS", "CLAUDINEI", "DANIELA", "EDUARDO", "FERNANDA",
+         "GABRIEL", "HELENA", "JOAO", "JULIANA", "LUCAS", "MARIA", "PAULO", "RAFAEL"]
+SOBRENOMES = ["SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "FERREIRA", "COSTA",
+              "RODRIGUES", "ALMEIDA", "NASCIMENTO", "CARVALHO", "ARAUJO", "RIBEIRO", "TAVARES"]
+
+
+def popular(conn, total):
+    """
+    Insere 'total' funcionários com nomes compostos e chapas de 6 dígitos.
+    """
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO areas (id, nome) VALUES (?, ?)",
+                       [(i, f"Área {i}") for i in range(1, 51)])
+    funcionarios = [
+        (f"{random.choice(NOMES)} {random.choice(SOBRENOMES)} {random.choice(SOBRENOMES)}",
+         str(100000 + i), random.randint(1, 50))
+        for i in range(total)
+    ]
+    cursor.executemany("INSERT INTO funcionarios (nome, chapa, area_id) VALUES (?, ?, ?)", funcionarios)
+    busca_funcionarios.otimizar(cursor)
+    conn.commit()
+    cursor.close()
+    return funcionarios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--funcionarios", type=int, default=50000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_busca.db")
+        create_user_db(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        funcionarios = popular(conn, args.funcionarios)
+
+        cursor = conn.cursor()
+        tempos = []
+        encontrados = 0
+        for _ in range(args.consultas):
+            nome, chapa, _ = random.choice(funcionarios)
+            tipo = random.random()
+            if tipo < 0.4:
+                # Começo de um sobrenome ("SIL", "SILV", ...)
+                palavra = random.choice(nome.split()[1:])
+                termo = palavra[:random.randint(3, len(palavra))]
+            elif tipo < 0.7:
+                # Nome e parte do sobrenome ("ANA SOU")
+                partes = nome.split()
+                termo = f"{partes[0]} {partes[1][:3]}"
+            elif tipo < 0.9:
+                # Trecho da chapa
+                inicio = random.randint(0, 3)
+                termo = chapa[inicio:inicio + 3]
+            else:
+                # Prefixo curto da chapa
+                termo = chapa[:2]
+            t0 = time.perf_counter()
+            if busca_funcionarios.buscar(cursor, termo):
+                encontrados += 1
+            tempos.append(time.perf_counter() - t0)
+        cursor.close()
+        conn.close()
+
+    tempos.sort()
+    media_ms = sum(tempos) / len(tempos) * 1000
+    p99_ms = tempos[int(len(tempos) * 0.99) - 1] * 1000
+    print(f"{args.funcionarios} funcionários, {args.consultas} buscas ({encontrados} com resultado)")
+    print(f"média: {media_ms:.3f} ms   p99: {p99_ms:.3f} ms   limite (p99): {LIMITE_MS} ms")
+    if p99_ms > LIMITE_MS:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: benchmarks/conflitos.py
+----------------------------------
+Mede o tempo da verificação de conflitos de férias (modules/agendamentos.py)
+em um banco temporário com muitos agendamentos.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.conflitos [--agendamentos 100000] [--areas 50] [--consultas 5000]
+
+Falha (código de saída 1) se o tempo médio por verificação passar de 1 ms.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from modules import agendamentos
+from modules.employee_db import create_user_db
+
+LIMITE_MS = 1.0
+
+
+def popular(conn, total, areas):
+    """
+    Cria 'areas' áreas, um funcionário por agendamento e 'total' agendamentos
+    espalhados por dez anos.
+    """
+    cursor = conn.cursor()
+    cursor.executemany("INSERT INTO areas (id, nome) VALUES (?, ?)",
+                       [(i, f"Área {i}") for i in range(1, areas + 1)])
+    inicio = date(2020, 1, 1)
+    funcionarios = []
+    ferias = []
+    for i in range(1, total + 1):
+        area_id = random.randint(1, areas)
+        dias = random.choice((10, 15, 20, 30))
+        data_ferias = inicio + timedelta(days=random.randrange(3650))
+        funcionarios.append((i, f"Funcionário {i}", str(100000 + i), area_id))
+        ferias.append((i, data_ferias.isoformat(), dias,
+                       (data_ferias + timedelta(days=dias)).isoformat(), area_id))
+    cursor.executemany("INSERT INTO funcionarios (id, nome, chapa, area_id) VALUES (?, ?, ?, ?)",
+                       funcionarios)
+    cursor.executemany("""
+        INSERT INTO ferias_agendadas (funcionario_id, data_ferias, dias_ferias, data_retorno, area_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, ferias)
+    conn.commit()
+    cursor.execute("ANALYZE")
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agendamentos", type=int, default=100000)
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--consultas", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_conflitos.db")
+        create_user_db(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        popular(conn, args.agendamentos, args.areas)
+
+        cursor = conn.cursor()
+        inicio = date(2020, 1, 1)
+        conflitos = 0
+        tempos = []
+        for _ in range(args.consultas):
+            area_id = random.randint(1, args.areas)
+            data_inicio = inicio + timedelta(days=random.randrange(3650))
+            data_fim = data_inicio + timedelta(days=random.choice((10, 15, 20, 30)))
+            t0 = time.perf_counter()
+            if agendamentos.buscar_conflito(cursor, area_id, data_inicio.isoformat(), data_fim.isoformat()):
+                conflitos += 1
+            tempos.append(time.perf_counter() - t0)
+        cursor.close()
+        conn.close()
+
+    tempos.sort()
+    media_ms = sum(tempos) / len(tempos) * 1000
+    p99_ms = tempos[int(len(tempos) * 0.99) - 1] * 1000
+    print(f"{args.agendamentos} agendamentos, {args.areas} áreas, {args.consultas} verificações "
+          f"({conflitos} com conflito)")
+    print(f"média: {media_ms:.3f} ms   p99: {p99_ms:.3f} ms   limite: {LIMITE_MS} ms")
+    if media_ms > LIMITE_MS:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
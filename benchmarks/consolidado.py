@@ -0,0 +1,180 @@
+"""
+Benchmark: benchmarks/consolidado.py
+------------------------------------
+Compara os dois modos de armazenamento dos bancos de funcionários com muitos
+gestores (tenants):
+
+  - arquivos: um gestor_<usuario>_funcionarios.db por gestor (padrão);
+  - consolidado: todos os gestores em um único banco (modules/consolidado.py).
+
+Cria os bancos por arquivo, copia-os para o consolidado com a mesma função da
+ferramenta de migração (consolidado.copiar) e, em cada modo, mede:
+
+  - requisições típicas (resolver uma chapa, verificar conflito de período e
+    listar os agendamentos do gestor), cada uma para um gestor sorteado, pelo
+    mesmo caminho das rotas (employee_db.get_user_connection e o pool);
+  - uma consulta entre gestores (agendamentos por gestor), que no modo por
+    arquivo exige abrir todos os arquivos;
+  - tamanho em disco e número de arquivos.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.consolidado [--tenants 1000] [--funcionarios 50] [--requisicoes 5000]
+"""
+
+import argparse
+import glob
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from flask import Flask
+
+from modules import agendamentos, consolidado
+from modules.connection_pool import pool, release_request_connections
+from modules.employee_db import create_user_db, get_user_connection
+
+AREAS = 5
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[max(int(len(valores) * p) - 1, 0)]
+
+
+def criar_arquivos(pasta, tenants, funcionarios):
+    """
+    Cria um banco por gestor a partir de um modelo já migrado e o popula.
+    Retorna a lista de arquivos.
+    """
+    modelo = os.path.join(pasta, "modelo.db")
+    create_user_db(modelo)
+    arquivos = []
+    for t in range(tenants):
+        arquivo = os.path.join(pasta, f"gestor_t{t:05d}_funcionarios.db")
+        shutil.copyfile(modelo, arquivo)
+        conn = sqlite3.connect(arquivo)
+        cursor = conn.cursor()
+        cursor.executemany("INSERT INTO areas (id, nome) VALUES (?, ?)",
+                           [(a, f"ÁREA {a}") for a in range(1, AREAS + 1)])
+        cursor.executemany(
+            "INSERT INTO funcionarios (id, nome, chapa, area_id) VALUES (?, ?, ?, ?)",
+            [(i, f"FUNCIONARIO {t} {i}", str(100000 + i), 1 + i % AREAS) for i in range(1, funcionarios + 1)],
+        )
+        for i in range(1, funcionarios + 1, 2):
+            inicio = date(2030, 1, 1) + timedelta(days=random.randint(0, 360))
+            agendamentos.inserir(cursor, i, 1 + i % AREAS, inicio.isoformat(), random.choice((5, 10, 15, 20)))
+        conn.commit()
+        conn.close()
+        arquivos.append(arquivo)
+    os.remove(modelo)
+    return arquivos
+
+
+def tamanho(caminhos):
+    return sum(os.path.getsize(c) for c in caminhos if os.path.exists(c))
+
+
+def requisicoes(app, arquivos, funcionarios, total):
+    """
+    Executa 'total' requisições típicas, cada uma para um gestor sorteado.
+    Retorna as durações em segundos.
+    """
+    duracoes = []
+    for _ in range(total):
+        arquivo = os.path.basename(random.choice(arquivos))
+        chapa = str(100000 + random.randint(1, funcionarios))
+        inicio = date(2030, 1, 1) + timedelta(days=random.randint(0, 360))
+        t0 = time.perf_counter()
+        with app.app_context():
+            conn = get_user_connection(arquivo)
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, area_id FROM funcionarios WHERE chapa = ?", (chapa,))
+            funcionario_id, area_id = cursor.fetchone()
+            agendamentos.buscar_conflito(cursor, area_id, inicio.isoformat(),
+                                         (inicio + timedelta(days=10)).isoformat(), funcionario_id)
+            cursor.execute("""
+                SELECT f.chapa, f.nome, fa.data_ferias, fa.dias_ferias
+                FROM ferias_agendadas fa JOIN funcionarios f ON fa.funcionario_id = f.id
+                ORDER BY fa.data_ferias, fa.id LIMIT 200
+            """)
+            cursor.fetchall()
+            cursor.close()
+        duracoes.append(time.perf_counter() - t0)
+    return duracoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=1000)
+    parser.add_argument("--funcionarios", type=int, default=50)
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.teardown_appcontext(release_request_connections)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        diretorio_original = os.getcwd()
+        os.chdir(tmp)
+        try:
+            t0 = time.perf_counter()
+            arquivos = criar_arquivos(tmp, args.tenants, args.funcionarios)
+            print(f"{args.tenants} gestores x {args.funcionarios} funcionários criados em "
+                  f"{time.perf_counter() - t0:.1f} s")
+
+            consolidado.CAMINHO = os.path.join(tmp, "consolidado.db")
+            consolidado.garantir()
+            t0 = time.perf_counter()
+            conn = sqlite3.connect(consolidado.CAMINHO)
+            for arquivo in arquivos:
+                consolidado.copiar(conn, arquivo)
+            conn.close()
+            print(f"migração para o consolidado: {time.perf_counter() - t0:.1f} s")
+
+            resultados = {}
+            for modo in ("arquivos", "consolidado"):
+                consolidado.ATIVO = modo == "consolidado"
+                pool.close_all()
+                random.seed(1)
+                requisicoes(app, arquivos, args.funcionarios, min(200, args.requisicoes))  # aquecimento
+                duracoes = requisicoes(app, arquivos, args.funcionarios, args.requisicoes)
+
+                t0 = time.perf_counter()
+                if consolidado.ATIVO:
+                    conn = sqlite3.connect(consolidado.CAMINHO)
+                    por_gestor = conn.execute(
+                        "SELECT tenant_id, COUNT(*) FROM t_ferias_agendadas GROUP BY tenant_id"
+                    ).fetchall()
+                    conn.close()
+                else:
+                    por_gestor = []
+                    for arquivo in arquivos:
+                        conn = sqlite3.connect(arquivo)
+                        por_gestor.append(conn.execute("SELECT COUNT(*) FROM ferias_agendadas").fetchone())
+                        conn.close()
+                entre_gestores = time.perf_counter() - t0
+                pool.close_all()
+
+                if consolidado.ATIVO:
+                    caminhos = glob.glob(consolidado.CAMINHO + "*")
+                else:
+                    caminhos = [c for a in arquivos for c in glob.glob(a + "*")]
+                resultados[modo] = (duracoes, entre_gestores, len(por_gestor), caminhos)
+        finally:
+            os.chdir(diretorio_original)
+
+        print(f"{args.requisicoes} requisições para gestores sorteados")
+        for modo, (duracoes, entre_gestores, gestores, caminhos) in resultados.items():
+            print(f"  {modo:<12} média {sum(duracoes) / len(duracoes) * 1000:6.3f} ms   "
+                  f"p50 {percentil(duracoes, 0.5) * 1000:6.3f} ms   p99 {percentil(duracoes, 0.99) * 1000:6.3f} ms   "
+                  f"entre gestores ({gestores}): {entre_gestores * 1000:7.1f} ms   "
+                  f"disco: {tamanho(caminhos) / 1024 / 1024:.1f} MB em {len(caminhos)} arquivos")
+
+
+if __name__ == "__main__":
+    main()
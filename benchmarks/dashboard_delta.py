@@ -0,0 +1,136 @@
+"""
+Benchmark: benchmarks/dashboard_delta.py
+----------------------------------------
+Compara o que o dashboard baixa a cada visita depois de uma alteração:
+
+  - completo: /dashboard_data sem parâmetros (todas as células, com todos os
+    textos dos tooltips, montadas em datasets);
+  - parcial: /dashboard_data?since=<versão> (só as células alteradas desde a
+    versão que o navegador guardou);
+  - revalidação: a mesma URL com If-None-Match, sem alterações (304).
+
+Confere que as células guardadas, atualizadas com a resposta parcial (como
+faz static/js/dashboard.js), montam o mesmo gráfico que a resposta completa.
+As chamadas passam pela aplicação (test_client), com sessão autenticada, no
+modo de armazenamento por arquivo.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.dashboard_delta [--agendamentos 20000] [--areas 50] [--repeticoes 20]
+
+A aplicação roda em um diretório temporário (app.db e bancos próprios).
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.conflitos import popular
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def mesclar(celulas, dados):
+    """
+    Aplica uma resposta de ?since= às células {(area_id, mes): célula}.
+    """
+    if dados["completo"]:
+        celulas.clear()
+    for celula in dados["celulas"]:
+        chave = (celula["areaId"], celula["mes"])
+        if celula["total"] > 0 and celula["area"] is not None:
+            celulas[chave] = celula
+        else:
+            celulas.pop(chave, None)
+
+
+def grafico(celulas):
+    """
+    (labels, [(label, data, customData)]) das células, como no dashboard.
+    """
+    contagens, detalhes = {}, {}
+    for celula in sorted(celulas.values(), key=lambda c: c["areaId"]):
+        chave = (celula["area"], celula["mes"])
+        contagens[chave] = contagens.get(chave, 0) + celula["total"]
+        detalhes.setdefault(chave, []).append(celula["detalhes"])
+    meses = sorted({mes for _, mes in detalhes})
+    areas = sorted({area for area, _ in detalhes})
+    return meses, [(area, [contagens.get((area, mes), 0) for mes in meses],
+                    ["\n".join(detalhes.get((area, mes), [])) for mes in meses]) for area in areas]
+
+
+def medir(cliente, url, repeticoes, **kwargs):
+    """
+    (tempo médio em segundos, última resposta) de 'repeticoes' GETs.
+    """
+    t0 = time.perf_counter()
+    for _ in range(repeticoes):
+        resposta = cliente.get(url, **kwargs)
+    return (time.perf_counter() - t0) / repeticoes, resposta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agendamentos", type=int, default=20000)
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        sys.path.insert(0, RAIZ)
+        from app import create_app
+        from modules import resumo_ferias
+
+        app = create_app()
+        app.logger.disabled = True
+        cliente = app.test_client()
+        cliente.post("/register", json={"usuario": "bench", "senha": "senha-bench"})
+        cliente.post("/login", json={"usuario": "bench", "senha": "senha-bench"})
+        conn = sqlite3.connect(os.path.join(tmp, "gestor_bench_funcionarios.db"))
+        popular(conn, args.agendamentos, args.areas)
+        resumo_ferias.reconstruir(conn)
+        conn.close()
+
+        # Primeira visita: o navegador guarda todas as células
+        celulas = {}
+        dados = cliente.get("/dashboard_data?since=0").get_json()
+        mesclar(celulas, dados)
+        versao = dados["versao"]
+
+        # Uma alteração entre as visitas
+        resposta = cliente.post("/alterar_agendamento",
+                                json={"chapa": "100001", "dataFerias": "2031-03-02", "diasFerias": 10})
+        assert resposta.status_code == 200, resposta.get_json()
+
+        completo, resposta_completa = medir(cliente, "/dashboard_data", args.repeticoes)
+        url = f"/dashboard_data?since={versao}"
+        parcial, resposta_parcial = medir(cliente, url, args.repeticoes)
+        revalidacao, resposta_304 = medir(cliente, url, args.repeticoes,
+                                          headers={"If-None-Match": resposta_parcial.headers["ETag"]})
+        pagina, _ = medir(cliente, "/dashboard", args.repeticoes)
+        os.chdir(RAIZ)
+
+    assert resposta_304.status_code == 304
+    dados = resposta_parcial.get_json()
+    mesclar(celulas, dados)
+    esperado = resposta_completa.get_json()
+    assert grafico(celulas) == (esperado["labels"],
+                                [(d["label"], d["data"], d["customData"]) for d in esperado["datasets"]]), \
+        "as células atualizadas diferem da resposta completa"
+
+    print(f"{args.agendamentos} agendamentos, {args.areas} áreas, {len(celulas)} células; "
+          f"1 agendamento alterado ({len(dados['celulas'])} células na resposta parcial)")
+    print(f"  completo:         {completo * 1000:7.2f} ms   {len(resposta_completa.data) / 1024:8.1f} KB")
+    print(f"  parcial (since):  {parcial * 1000:7.2f} ms   {len(resposta_parcial.data) / 1024:8.1f} KB")
+    print(f"  revalidação 304:  {revalidacao * 1000:7.2f} ms")
+    print(f"  página /dashboard: {pagina * 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
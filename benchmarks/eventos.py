@@ -0,0 +1,157 @@
+"""
+Benchmark: benchmarks/eventos.py
+--------------------------------
+Abre muitos fluxos de eventos (/eventos, modules/eventos.py) pelo adaptador
+ASGI (modules/asgi.py), chamado diretamente por um driver ASGI no mesmo
+processo (sem rede), e informa:
+
+  - quantas threads o processo tem e quantas vagas do executor ficam
+    ocupadas com todos os fluxos abertos (devem ser zero);
+  - a latência de uma rota comum com os fluxos abertos;
+  - o tempo entre a resposta de /agendar_ferias e o evento chegar a todos
+    os fluxos.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.eventos [--fluxos 1000] [--threads 8]
+
+A aplicação roda em um diretório temporário (app.db e bancos próprios).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def escopo(caminho, cookie, metodo="GET", cabecalhos=()):
+    return {
+        "type": "http",
+        "method": metodo,
+        "path": caminho,
+        "query_string": b"",
+        "headers": [(b"cookie", cookie), *cabecalhos],
+        "http_version": "1.1",
+    }
+
+
+async def requisitar(asgi, cookie, caminho, metodo="GET", corpo=b""):
+    """
+    Faz uma requisição comum e retorna o status.
+    """
+    enviados = []
+
+    async def receive():
+        return {"type": "http.request", "body": corpo, "more_body": False}
+
+    async def send(mensagem):
+        enviados.append(mensagem)
+
+    await asgi(escopo(caminho, cookie, metodo, [(b"content-type", b"application/json")]), receive, send)
+    return enviados[0]["status"]
+
+
+async def fluxo(asgi, cookie, fim, recebido):
+    """
+    Um cliente de /eventos que desconecta quando 'fim' é sinalizado e marca
+    'recebido' quando chega um evento de agendamento.
+    """
+    inicio = []
+
+    async def receive():
+        if not inicio:
+            inicio.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await fim.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(mensagem):
+        if b"event: agendamento" in mensagem.get("body", b""):
+            recebido(time.perf_counter())
+
+    await asgi(escopo("/eventos", cookie), receive, send)
+
+
+async def medir(asgi, cookie, fluxos, eventos):
+    fim = asyncio.Event()
+    chegadas = []
+    todos = asyncio.Event()
+
+    def recebido(instante):
+        chegadas.append(instante)
+        if len(chegadas) == fluxos:
+            todos.set()
+
+    t0 = time.perf_counter()
+    tarefas = [asyncio.ensure_future(fluxo(asgi, cookie, fim, recebido)) for _ in range(fluxos)]
+    while eventos.abertos()[0] < fluxos or asgi.ocupadas:
+        await asyncio.sleep(0.01)
+    abertura = time.perf_counter() - t0
+    threads = threading.active_count()
+    ocupadas = asgi.ocupadas
+
+    t0 = time.perf_counter()
+    status = await requisitar(asgi, cookie, "/login")
+    rota_comum = time.perf_counter() - t0
+    assert status == 200, status
+
+    corpo = json.dumps({"chapa": "100001", "dataFerias": "2030-01-01", "diasFerias": 10}).encode()
+    status = await requisitar(asgi, cookie, "/agendar_ferias", "POST", corpo)
+    publicado = time.perf_counter()
+    assert status == 200, status
+    await asyncio.wait_for(todos.wait(), 30)
+    entrega = max(chegadas) - publicado
+
+    fim.set()
+    await asyncio.gather(*tarefas)
+    assert eventos.abertos() == (0, 0), eventos.abertos()
+    return abertura, threads, ocupadas, rota_comum, entrega
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fluxos", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    os.environ["EVENTOS_MAX_FLUXOS"] = str(args.fluxos)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        sys.path.insert(0, RAIZ)
+        from app import create_app
+        from modules import eventos
+        from modules.asgi import AdaptadorAsgi
+
+        app = create_app()
+        app.logger.disabled = True
+        cliente = app.test_client()
+        cliente.post("/register", json={"usuario": "bench", "senha": "senha-bench"})
+        cliente.post("/login", json={"usuario": "bench", "senha": "senha-bench"})
+        cookie = f"session={cliente.get_cookie('session').value}".encode()
+        conn = sqlite3.connect(os.path.join(tmp, "gestor_bench_funcionarios.db"))
+        conn.execute("INSERT INTO areas (id, nome) VALUES (1, 'Área 1')")
+        conn.execute("INSERT INTO funcionarios (nome, chapa, area_id) VALUES ('Funcionário 1', '100001', 1)")
+        conn.commit()
+        conn.close()
+
+        # Fila grande o bastante para a rajada de conexões (cada view só reserva o fluxo)
+        asgi = AdaptadorAsgi(app, threads=args.threads, fila=args.fluxos)
+        abertura, threads, ocupadas, rota_comum, entrega = asyncio.run(medir(asgi, cookie, args.fluxos, eventos))
+        os.chdir(RAIZ)
+
+    print(f"{args.fluxos} fluxos de eventos abertos (executor de {args.threads} threads)")
+    print(f"  abertura de todos:         {abertura * 1000:8.1f} ms")
+    print(f"  threads do processo:       {threads:8d}   vagas do executor ocupadas: {ocupadas}")
+    print(f"  rota comum (GET /login):   {rota_comum * 1000:8.1f} ms")
+    print(f"  evento em todos os fluxos: {entrega * 1000:8.1f} ms após a resposta de /agendar_ferias")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: benchmarks/importtime.py
+-----------------------------------
+Mede o tempo de importação de app.py (partida a frio de cada worker) com
+"python -X importtime", em um processo novo, e confere que as bibliotecas
+pesadas só usadas por algumas rotas (xhtml2pdf, reportlab, pandas, openpyxl)
+não são importadas junto com a aplicação.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.importtime [--limite-ms 300] [--repeticoes 5] [--detalhes 15]
+
+Falha (código de saída 1) se a menor medição passar do limite ou se algum
+módulo pesado for importado.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIMITE_MS = 300.0
+MODULOS_PESADOS = ("xhtml2pdf", "reportlab", "pyhanko", "pandas", "numpy", "openpyxl")
+
+
+def medir():
+    """
+    Importa app em um processo novo e retorna [(modulo, nivel, cumulativo_us)].
+    """
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    ).stderr
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha:
+            continue
+        _, cumulativo, nome = linha[len("import time:"):].split("|")
+        # A indentação do nome indica quem importou (2 espaços por nível)
+        nivel = (len(nome) - len(nome.lstrip()) - 1) // 2
+        modulos.append((nome.strip(), nivel, int(cumulativo)))
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limite-ms", type=float, default=LIMITE_MS)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--detalhes", type=int, default=15)
+    args = parser.parse_args()
+
+    medicoes = [medir() for _ in range(args.repeticoes)]
+    totais = [next(us for nome, nivel, us in m if nome == "app" and nivel == 0) / 1000 for m in medicoes]
+    melhor = medicoes[totais.index(min(totais))]
+
+    # Importações feitas diretamente por app.py (nível 1)
+    print(f"maiores importações de app.py (cumulativo, melhor de {args.repeticoes}):")
+    # (o importtime lista os filhos antes do pai: a subárvore de app são as
+    # linhas entre a linha de nível 0 anterior e a de app)
+    fim = next(i for i, (nome, nivel, _) in enumerate(melhor) if nome == "app" and nivel == 0)
+    inicio = max((i for i in range(fim) if melhor[i][1] == 0), default=-1) + 1
+    diretas = [(nome, us) for nome, nivel, us in melhor[inicio:fim] if nivel == 1]
+    for nome, us in sorted(diretas, key=lambda m: m[1], reverse=True)[:args.detalhes]:
+        print(f"  {us / 1000:8.1f} ms  {nome}")
+
+    pesados = sorted({nome for nome, _, _ in melhor if nome.split(".")[0] in MODULOS_PESADOS})
+    print(f"import app: melhor {min(totais):.1f} ms   pior {max(totais):.1f} ms   limite: {args.limite_ms:.0f} ms")
+    if pesados:
+        print("módulos pesados importados na partida: " + ", ".join(pesados))
+    if min(totais) > args.limite_ms or pesados:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
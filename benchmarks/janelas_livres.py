@@ -0,0 +1,106 @@
+"""
+Benchmark: benchmarks/janelas_livres.py
+---------------------------------------
+Mede a sugestão de datas livres (modules/janelas_livres.py, rota
+/janelas_livres) em um banco temporário com muitos agendamentos e a compara
+com a alternativa de tentar as datas uma a uma (agendamentos.buscar_conflito
+a partir de hoje, como o funcionário faz em /agendar_ferias até não receber
+409). Confere que as duas formas sugerem as mesmas datas.
+
+  - primeira consulta da área: monta o vetor de ocupação;
+  - consultas seguintes: vetor em cache (mesma versão dos dados).
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.janelas_livres [--agendamentos 20000] [--areas 50] [--consultas 500]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.conflitos import popular
+from modules import agendamentos, janelas_livres
+from modules.diretorio_funcionarios import Funcionario
+from modules.employee_db import create_user_db
+
+QUANTIDADE = 5
+
+
+def tentativas(cursor, funcionario, dias):
+    """
+    Primeiras datas livres procuradas dia a dia com buscar_conflito.
+    """
+    hoje = date.today()
+    livres = []
+    for s in range(janelas_livres.HORIZONTE - dias):
+        inicio = hoje + timedelta(days=s)
+        if agendamentos.buscar_conflito(cursor, funcionario.area_id, inicio.isoformat(),
+                                        (inicio + timedelta(days=dias)).isoformat(), funcionario.id) is None:
+            livres.append(inicio.isoformat())
+            if len(livres) == QUANTIDADE:
+                break
+    return livres
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agendamentos", type=int, default=20000)
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--consultas", type=int, default=500)
+    args = parser.parse_args()
+
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_janelas_livres.db")
+        create_user_db(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        popular(conn, args.agendamentos, args.areas)
+        # Desloca os agendamentos (2020-2029) para começarem hoje
+        deslocamento = (date.today() - date(2020, 1, 1)).days
+        conn.execute("""
+            UPDATE ferias_agendadas
+            SET data_ferias = date(data_ferias, '+' || ? || ' days'),
+                data_retorno = date(data_retorno, '+' || ? || ' days')
+        """, (deslocamento, deslocamento))
+        conn.commit()
+        cursor = conn.cursor()
+
+        consultas = []
+        for _ in range(args.consultas):
+            funcionario_id = random.randint(1, args.agendamentos)
+            area_id = cursor.execute("SELECT area_id FROM funcionarios WHERE id = ?",
+                                     (funcionario_id,)).fetchone()[0]
+            consultas.append((Funcionario(funcionario_id, "", area_id, ""), random.choice((10, 15, 20, 30))))
+
+        t0 = time.perf_counter()
+        for area_id in range(1, args.areas + 1):
+            janelas_livres.buscar(cursor, db_path, Funcionario(0, "", area_id, ""), 10, QUANTIDADE)
+        primeira = (time.perf_counter() - t0) / args.areas
+
+        t0 = time.perf_counter()
+        sugeridas = [janelas_livres.buscar(cursor, db_path, f, dias, QUANTIDADE) for f, dias in consultas]
+        em_cache = (time.perf_counter() - t0) / args.consultas
+
+        t0 = time.perf_counter()
+        esperadas = [tentativas(cursor, f, dias) for f, dias in consultas]
+        dia_a_dia = (time.perf_counter() - t0) / args.consultas
+        cursor.close()
+        conn.close()
+
+    assert sugeridas == esperadas, "as datas sugeridas diferem da busca dia a dia"
+    print(f"{args.agendamentos} agendamentos, {args.areas} áreas, {args.consultas} consultas "
+          f"({QUANTIDADE} datas cada, horizonte de {janelas_livres.HORIZONTE} dias; "
+          f"{sum(1 for s in sugeridas if s)} com alguma data livre)")
+    print(f"  vetores (1ª consulta da área): {primeira * 1000:7.3f} ms")
+    print(f"  vetores (em cache):            {em_cache * 1000:7.3f} ms")
+    print(f"  tentativas dia a dia:          {dia_a_dia * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: benchmarks/login.py
+------------------------------
+Simula uma rajada de logins contra a aplicação servida por um servidor HTTP
+com threads (werkzeug), enquanto uma rota sem hash de senha (GET /login) é
+consultada continuamente, e informa:
+
+  - logins por segundo (bem-sucedidos) e rejeições 503 (executor saturado);
+  - latência p50/p99 dos logins e da rota não relacionada.
+
+Os parâmetros do executor de hashes (modules/senhas.py) podem ser variados
+para comparação, ex.: --workers 64 --fila 0 aproxima o comportamento
+anterior (hash na própria thread da requisição).
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.login [--clientes 32] [--segundos 10] [--workers 2] [--fila 16]
+
+A aplicação roda em um diretório temporário (app.db e bancos próprios).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[max(int(len(valores) * p) - 1, 0)]
+
+
+def requisitar(url, dados=None):
+    """
+    Faz a requisição e retorna (status, segundos).
+    """
+    corpo = json.dumps(dados).encode() if dados is not None else None
+    req = urllib.request.Request(url, data=corpo, headers={"Content-Type": "application/json"})
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=32)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--fila", type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ["SENHA_WORKERS"] = str(args.workers)
+    os.environ["SENHA_FILA"] = str(args.fila)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        sys.path.insert(0, RAIZ)
+        from werkzeug.serving import WSGIRequestHandler, make_server
+        from app import app
+
+        class SemLog(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        app.logger.disabled = True
+        app.test_client().post("/register", json={"usuario": "bench", "senha": "senha-bench"})
+
+        servidor = make_server("127.0.0.1", 0, app, threaded=True, request_handler=SemLog)
+        servidor.daemon_threads = True
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{servidor.server_port}"
+
+        fim = time.perf_counter() + args.segundos
+        logins, rejeitados, erros, outras = [], [0], [0], []
+        lock = threading.Lock()
+
+        def cliente_login():
+            while time.perf_counter() < fim:
+                status, duracao = requisitar(f"{base}/login", {"usuario": "bench", "senha": "senha-bench"})
+                with lock:
+                    if status == 200:
+                        logins.append(duracao)
+                    elif status == 503:
+                        rejeitados[0] += 1
+                    else:
+                        erros[0] += 1
+                if status == 503:
+                    time.sleep(0.05)
+
+        def cliente_outra_rota():
+            while time.perf_counter() < fim:
+                status, duracao = requisitar(f"{base}/login")
+                outras.append(duracao)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=cliente_login) for _ in range(args.clientes)]
+        threads.append(threading.Thread(target=cliente_outra_rota))
+        inicio = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        total = time.perf_counter() - inicio
+        servidor.shutdown()
+        os.chdir(RAIZ)
+
+    print(f"{args.clientes} clientes, {args.segundos:.0f} s, executor: {args.workers} workers, fila {args.fila}")
+    print(f"logins: {len(logins) / total:.1f}/s ({len(logins)} ok, {rejeitados[0]} rejeitados com 503, "
+          f"{erros[0]} erros)   p50: {percentil(logins, 0.5) * 1000:.0f} ms   "
+          f"p99: {percentil(logins, 0.99) * 1000:.0f} ms")
+    print(f"rota não relacionada (GET /login): {len(outras)} requisições   "
+          f"p50: {percentil(outras, 0.5) * 1000:.1f} ms   p99: {percentil(outras, 0.99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: benchmarks/metricas.py
+---------------------------------
+Mede o custo das métricas (modules/metricas.py, rota /metrics):
+
+  - requisição: GET /verificar_agendamento com e sem os hooks de métricas
+    (before_request/after_request/teardown_request);
+  - banco: comandos SQLite pelo CursorMedido do pool e pelo cursor comum,
+    na mesma conexão;
+  - coleta: GET /metrics somando os arquivos de vários processos
+    (METRICAS_DIR), como em uma implantação com vários workers.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.metricas [--requisicoes 2000] [--comandos 20000] [--processos 16]
+
+A aplicação roda em um diretório temporário (app.db e bancos próprios).
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOOKS = ("before_request_funcs", "after_request_funcs", "teardown_request_funcs")
+
+
+def por_requisicao(cliente, url, requisicoes):
+    """
+    Tempo médio (s) de 'requisicoes' GETs a 'url'.
+    """
+    cliente.get(url)  # aquecimento
+    t0 = time.perf_counter()
+    for _ in range(requisicoes):
+        cliente.get(url)
+    return (time.perf_counter() - t0) / requisicoes
+
+
+def por_comando(conn, factory, comandos):
+    """
+    Tempo médio (s) de execute + fetchone com cursores de 'factory'.
+    """
+    cursor = conn.cursor(factory)
+    t0 = time.perf_counter()
+    for i in range(comandos):
+        cursor.execute("SELECT nome FROM funcionarios WHERE chapa = ?", (str(100000 + i % 100),))
+        cursor.fetchone()
+    return (time.perf_counter() - t0) / comandos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--comandos", type=int, default=20000)
+    parser.add_argument("--processos", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        diretorio = os.path.join(tmp, "metricas")
+        os.mkdir(diretorio)
+        os.environ["METRICAS_DIR"] = diretorio
+        os.environ["METRICAS_INTERVALO"] = "3600"
+        os.chdir(tmp)
+        sys.path.insert(0, RAIZ)
+        from app import create_app
+        from modules import metricas
+        from modules.connection_pool import ConnectionPool, CursorMedido
+
+        app = create_app()
+        app.logger.disabled = True
+        cliente = app.test_client()
+        cliente.post("/register", json={"usuario": "bench", "senha": "senha-bench"})
+        cliente.post("/login", json={"usuario": "bench", "senha": "senha-bench"})
+        banco = os.path.join(tmp, "gestor_bench_funcionarios.db")
+        conn = sqlite3.connect(banco)
+        conn.execute("INSERT INTO areas (id, nome) VALUES (1, 'Área 1')")
+        conn.executemany("INSERT INTO funcionarios (nome, chapa, area_id) VALUES (?, ?, 1)",
+                         [(f"Funcionário {i}", str(100000 + i)) for i in range(100)])
+        conn.commit()
+        conn.close()
+        url = "/verificar_agendamento?chapa=100001"
+
+        # Alterna as medições para não favorecer a segunda (cache aquecido)
+        hooks = {nome: getattr(app, nome)[None] for nome in HOOKS}
+        com_hooks = sem_hooks = float("inf")
+        for _ in range(3):
+            com_hooks = min(com_hooks, por_requisicao(cliente, url, args.requisicoes))
+            for nome, funcs in hooks.items():
+                getattr(app, nome)[None] = [f for f in funcs if getattr(f, "__module__", "") != metricas.__name__]
+            sem_hooks = min(sem_hooks, por_requisicao(cliente, url, args.requisicoes))
+            for nome, funcs in hooks.items():
+                getattr(app, nome)[None] = funcs
+
+        conn = ConnectionPool.open_connection(banco)
+        comum = por_comando(conn, sqlite3.Cursor, args.comandos)
+        medido = por_comando(conn, CursorMedido, args.comandos)
+        conn.close()
+
+        # Simula os arquivos dos outros workers com os valores deste processo
+        metricas.gravar()
+        proprio = metricas._arquivo
+        for i in range(args.processos - 1):
+            shutil.copy(proprio, os.path.join(diretorio, f"metricas-{i}-0.json"))
+        cliente.get("/metrics")
+        t0 = time.perf_counter()
+        resposta = cliente.get("/metrics")
+        coleta = time.perf_counter() - t0
+        assert resposta.status_code == 200
+        series = sum(1 for linha in resposta.data.splitlines() if not linha.startswith(b"#"))
+        metricas.DIRETORIO = None  # o diretório temporário é apagado: sem gravação ao sair
+        os.chdir(RAIZ)
+
+    print(f"requisição GET {url} (melhor média de 3 x {args.requisicoes})")
+    print(f"  sem métricas:  {sem_hooks * 1e6:8.1f} µs")
+    print(f"  com métricas:  {com_hooks * 1e6:8.1f} µs   (+{(com_hooks - sem_hooks) * 1e6:.1f} µs)")
+    print(f"comando SQLite (execute + fetchone, {args.comandos} vezes)")
+    print(f"  cursor comum:  {comum * 1e6:8.2f} µs")
+    print(f"  CursorMedido:  {medido * 1e6:8.2f} µs   (+{(medido - comum) * 1e6:.2f} µs)")
+    print(f"GET /metrics com {args.processos} processos: {coleta * 1000:.1f} ms, {series} linhas, "
+          f"{len(resposta.data) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: benchmarks/ocupacao.py
+---------------------------------
+Mede a ocupação diária por área (modules/ocupacao.py, rota /ocupacao) de um
+ano inteiro em um banco temporário com muitos agendamentos e a compara com
+uma consulta SQL por dia (ausentes por área naquele dia). Confere que as
+duas formas dão os mesmos números e informa o tamanho do JSON da resposta.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.ocupacao [--agendamentos 100000] [--areas 50] [--dias 365]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.conflitos import popular
+from modules import ocupacao
+from modules.employee_db import create_user_db
+
+
+def por_dia(cursor, inicio, dias):
+    """
+    {area_id: [ausentes por dia]} com uma consulta por dia.
+    """
+    cursor.execute("SELECT id FROM areas")
+    resultado = {row[0]: [0] * dias for row in cursor.fetchall()}
+    for d in range(dias):
+        dia = (inicio + timedelta(days=d)).isoformat()
+        cursor.execute("""
+            SELECT area_id, COUNT(*) FROM ferias_agendadas
+            WHERE data_ferias <= ? AND data_retorno > ?
+            GROUP BY area_id
+        """, (dia, dia))
+        for area_id, total in cursor.fetchall():
+            resultado[area_id][d] = total
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agendamentos", type=int, default=100000)
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--dias", type=int, default=365)
+    args = parser.parse_args()
+
+    random.seed(1)
+    inicio = date(2024, 1, 1)
+    fim = inicio + timedelta(days=args.dias - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_ocupacao.db")
+        create_user_db(db_path)
+        conn = sqlite3.connect(db_path)
+        popular(conn, args.agendamentos, args.areas)
+        cursor = conn.cursor()
+
+        ocupacao.calcular(cursor, inicio, fim)  # aquecimento (importação do NumPy)
+        t0 = time.perf_counter()
+        resultado = ocupacao.calcular(cursor, inicio, fim)
+        vetorizado = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        esperado = por_dia(cursor, inicio, args.dias)
+        consultas = time.perf_counter() - t0
+        cursor.close()
+        conn.close()
+
+    assert {a["areaId"]: a["ausentes"] for a in resultado["areas"]} == esperado, \
+        "a ocupação vetorizada difere das consultas por dia"
+    tamanho = len(json.dumps(resultado, separators=(",", ":")).encode())
+    print(f"{args.agendamentos} agendamentos, {args.areas} áreas, {args.dias} dias")
+    print(f"  vetorizado (ocupacao.calcular): {vetorizado * 1000:8.1f} ms")
+    print(f"  uma consulta por dia:           {consultas * 1000:8.1f} ms")
+    print(f"  JSON da resposta: {tamanho / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: benchmarks/relatorio_conflitos.py
+--------------------------------------------
+Mede o relatório de conflitos (modules/conflitos.py, rota /conflitos) em um
+banco temporário com muitos agendamentos e o compara com a alternativa de
+comparar os períodos dois a dois em SQL (autojunção de ferias_agendadas por
+área). Confere que as duas formas encontram os mesmos pares.
+
+Uso (a partir da raiz do projeto):
+
+    python -m benchmarks.relatorio_conflitos [--agendamentos 20000] [--areas 50]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.conflitos import popular
+from modules import conflitos
+from modules.employee_db import create_user_db
+
+
+def pares_sql(cursor):
+    """
+    Pares de agendamentos sobrepostos da mesma área, por autojunção.
+    """
+    cursor.execute("""
+        SELECT a.id, b.id
+        FROM ferias_agendadas a
+        JOIN ferias_agendadas b
+          ON b.area_id = a.area_id AND b.id <> a.id
+         AND (b.data_ferias, b.id) >= (a.data_ferias, a.id)
+         AND b.data_ferias <= a.data_retorno
+         AND b.funcionario_id <> a.funcionario_id
+    """)
+    return {frozenset(row) for row in cursor.fetchall()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agendamentos", type=int, default=20000)
+    parser.add_argument("--areas", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench_relatorio_conflitos.db")
+        create_user_db(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        popular(conn, args.agendamentos, args.areas)
+        cursor = conn.cursor()
+
+        t0 = time.perf_counter()
+        relatorio = conflitos.relatorio(cursor)
+        varredura = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        esperado = pares_sql(cursor)
+        autojuncao = time.perf_counter() - t0
+        cursor.close()
+        conn.close()
+
+    encontrados = {
+        frozenset((g["periodos"][i]["id"], g["periodos"][j]["id"]))
+        for g in relatorio["grupos"] for i, j in g["pares"]
+    }
+    assert encontrados == esperado, "a varredura e a autojunção encontraram pares diferentes"
+
+    print(f"{args.agendamentos} agendamentos, {args.areas} áreas: "
+          f"{relatorio['total_pares']} pares em {relatorio['total_grupos']} grupos")
+    print(f"  varredura (conflitos.relatorio): {varredura * 1000:8.1f} ms")
+    print(f"  autojunção SQL (só os pares):    {autojuncao * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
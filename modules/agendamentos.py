@@ -0,0 +1,144 @@
+"""
+Módulo: agendamentos.py
+-----------------------
+Centraliza as escritas em ferias_agendadas e a detecção de conflitos de período.
+
+Cada agendamento guarda, além da data de início e dos dias, a data de retorno
+(data_retorno = data_ferias + dias_ferias) e a área do funcionário (area_id,
+desnormalizada de funcionarios). Com isso a verificação de sobreposição usa
+apenas comparações diretas sobre colunas indexadas:
+
+  idx_ferias_area_periodo (area_id, data_ferias, data_retorno)
+  idx_ferias_area_dias    (area_id, dias_ferias)
+
+O segundo índice fornece, em O(log n), a maior duração de férias da área, que
+limita inferiormente o intervalo de data_ferias a percorrer: um agendamento que
+começa antes de (início - maior duração) não pode alcançar o novo período.
+
+As funções recebem um cursor e não fazem commit: quem chama controla a transação.
+Todas mantêm a tabela resumo_ferias_mensal atualizada (modules/resumo_ferias.py).
+"""
+
+from datetime import date, datetime, timedelta
+from modules import resumo_ferias
+
+
+def validar_periodo(data_ferias, dias_ferias):
+    """
+    Valida o período informado (ex.: em um pedido de aprovação) e retorna
+    (data_ferias, dias_ferias, data_retorno). A data deve estar exatamente no
+    formato YYYY-MM-DD, pois data_ferias é comparada como texto com datas ISO
+    (conflitos, relatório, índices); os dias devem ser um inteiro positivo.
+    Lança ValueError se o período for inválido.
+    """
+    if not isinstance(data_ferias, str) or isinstance(dias_ferias, bool):
+        raise ValueError("Período inválido.")
+    try:
+        inicio = date.fromisoformat(data_ferias)
+        dias = int(dias_ferias)
+        retorno = (inicio + timedelta(days=dias)).isoformat()
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("Período inválido.")
+    # fromisoformat também aceita outras formas ISO (ex.: 20240105)
+    if inicio.isoformat() != data_ferias or dias <= 0 or str(dias) != str(dias_ferias).strip():
+        raise ValueError("Período inválido.")
+    return data_ferias, dias, retorno
+
+
+def calcular_retorno(data_ferias, dias_ferias):
+    """
+    Retorna a data de retorno (ISO) de férias iniciadas em 'data_ferias' por 'dias_ferias' dias.
+    """
+    inicio = datetime.strptime(data_ferias, "%Y-%m-%d").date()
+    return (inicio + timedelta(days=int(dias_ferias))).isoformat()
+
+
+def buscar_conflito(cursor, area_id, data_inicio, data_fim, ignorar_funcionario_id=None):
+    """
+    Retorna o primeiro agendamento da área que se sobrepõe ao período
+    [data_inicio, data_fim] (datas ISO, extremos inclusivos), ou None.
+    'ignorar_funcionario_id' exclui o próprio funcionário (usado ao alterar).
+    """
+    cursor.execute("""
+        SELECT f.nome, fa.data_ferias, fa.dias_ferias, fa.data_retorno
+        FROM ferias_agendadas fa
+        JOIN funcionarios f ON fa.funcionario_id = f.id
+        WHERE fa.area_id = :area_id
+          AND fa.data_ferias <= :fim
+          AND fa.data_ferias >= date(:inicio, '-' || (
+                SELECT MAX(dias_ferias) FROM ferias_agendadas WHERE area_id = :area_id
+              ) || ' days')
+          AND fa.data_retorno >= :inicio
+          AND fa.funcionario_id IS NOT :ignorar
+        LIMIT 1
+    """, {
+        "area_id": area_id,
+        "inicio": data_inicio,
+        "fim": data_fim,
+        "ignorar": ignorar_funcionario_id,
+    })
+    return cursor.fetchone()
+
+
+def inserir(cursor, funcionario_id, area_id, data_ferias, dias_ferias):
+    """
+    Insere um agendamento com data de retorno e área calculadas.
+    """
+    cursor.execute("""
+        INSERT INTO ferias_agendadas (funcionario_id, data_ferias, dias_ferias, data_retorno, area_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, (funcionario_id, data_ferias, dias_ferias, calcular_retorno(data_ferias, dias_ferias), area_id))
+    resumo_ferias.atualizar_celulas(cursor, {(resumo_ferias.mes_de(data_ferias), area_id)})
+
+
+def inserir_varios(cursor, novos):
+    """
+    Insere vários agendamentos de uma vez. 'novos' é uma lista de tuplas
+    (funcionario_id, area_id, data_ferias, dias_ferias); cada célula do resumo
+    afetada é recalculada uma única vez.
+    """
+    cursor.executemany("""
+        INSERT INTO ferias_agendadas (funcionario_id, data_ferias, dias_ferias, data_retorno, area_id)
+        VALUES (?, ?, ?, ?, ?)
+    """, [
+        (funcionario_id, data_ferias, dias_ferias, calcular_retorno(data_ferias, dias_ferias), area_id)
+        for funcionario_id, area_id, data_ferias, dias_ferias in novos
+    ])
+    resumo_ferias.atualizar_celulas(
+        cursor, {(resumo_ferias.mes_de(data_ferias), area_id) for _, area_id, data_ferias, _ in novos}
+    )
+
+
+def alterar(cursor, funcionario_id, area_id, data_ferias, dias_ferias):
+    """
+    Altera o(s) agendamento(s) do funcionário para o novo período.
+    """
+    celulas = resumo_ferias.celulas_do_funcionario(cursor, funcionario_id)
+    celulas.add((resumo_ferias.mes_de(data_ferias), area_id))
+    cursor.execute("""
+        UPDATE ferias_agendadas
+        SET data_ferias = ?, dias_ferias = ?, data_retorno = ?, area_id = ?
+        WHERE funcionario_id = ?
+    """, (data_ferias, dias_ferias, calcular_retorno(data_ferias, dias_ferias), area_id, funcionario_id))
+    resumo_ferias.atualizar_celulas(cursor, celulas)
+
+
+def cancelar(cursor, funcionario_id):
+    """
+    Remove o(s) agendamento(s) do funcionário.
+    """
+    celulas = resumo_ferias.celulas_do_funcionario(cursor, funcionario_id)
+    cursor.execute("DELETE FROM ferias_agendadas WHERE funcionario_id = ?", (funcionario_id,))
+    resumo_ferias.atualizar_celulas(cursor, celulas)
+
+
+def sincronizar_areas(cursor):
+    """
+    Copia funcionarios.area_id para ferias_agendadas.area_id nos agendamentos
+    cujo funcionário mudou de área (ex.: após importar uma planilha).
+    """
+    cursor.execute("""
+        UPDATE ferias_agendadas
+        SET area_id = (SELECT f.area_id FROM funcionarios f WHERE f.id = ferias_agendadas.funcionario_id)
+        WHERE area_id IS NOT (SELECT f.area_id FROM funcionarios f WHERE f.id = ferias_agendadas.funcionario_id)
+    """)
@@ -0,0 +1,287 @@
+"""
+Módulo: asgi.py
+---------------
+Adaptador que serve a aplicação Flask (WSGI) por um servidor ASGI
+(ex.: uvicorn), usado pelo ponto de entrada asgi.py da raiz do projeto.
+
+Com o servidor de desenvolvimento (app.run) cada conexão ocupa uma thread do
+início ao fim, inclusive enquanto o navegador mantém a conexão aberta sem
+pedir nada ou envia o corpo da requisição devagar. Aqui:
+
+  - conexões ociosas e a leitura do corpo ficam no laço de eventos do
+    servidor ASGI, sem thread;
+  - o corpo é limitado por rota (limite_corpo, ex.: app.limite_corpo):
+    Content-Length acima do limite é recusado com 413 antes da leitura, e a
+    leitura é interrompida com 413 assim que o total recebido o ultrapassa;
+  - com o corpo já recebido (em memória, ou em disco acima de 1 MB), a view
+    Flask roda em um ThreadPoolExecutor limitado (ASGI_THREADS, padrão 8),
+    onde ficam as consultas SQLite e os hashes de senha;
+  - no máximo ASGI_FILA (padrão 64) requisições aguardam uma thread; acima
+    disso a resposta é 503 com Retry-After, sem enfileirar mais;
+  - o corpo da resposta é produzido na thread e enviado pelo laço de
+    eventos, sem prender a thread enquanto o cliente lê;
+  - o trabalho pesado de CPU (PDF, importação) vai para o pool de processos
+    (modules/processos.py);
+  - fluxos de eventos (rota /eventos, modules/eventos.py): a view roda no
+    executor só para autenticar e reservar o fluxo (environ
+    'eventos.assincrono'), que devolve em environ['eventos.fluxo']; os
+    eventos são enviados pelo laço de eventos até o cliente desconectar,
+    sem ocupar thread nem vaga do executor.
+
+Apenas requisições HTTP são atendidas (WebSocket não é suportado).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from modules import processos
+
+# Corpo da requisição mantido em memória até este tamanho; acima, vai para disco
+CORPO_EM_MEMORIA = 1024 * 1024
+
+
+class AdaptadorAsgi:
+    """
+    Aplicação ASGI que executa 'wsgi_app' em um executor limitado.
+    """
+
+    def __init__(self, wsgi_app, threads=None, fila=None, limite_corpo=None):
+        self.wsgi_app = wsgi_app
+        # limite_corpo(path) -> maior corpo aceito em bytes (None: sem limite);
+        # padrão: MAX_CONTENT_LENGTH da aplicação Flask
+        if limite_corpo is None:
+            def limite_corpo(path):
+                return getattr(wsgi_app, "config", {}).get("MAX_CONTENT_LENGTH")
+        self.limite_corpo = limite_corpo
+        self.threads = threads or int(os.environ.get("ASGI_THREADS", "8"))
+        self.fila = fila if fila is not None else int(os.environ.get("ASGI_FILA", "64"))
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="asgi")
+        # Requisições em execução ou aguardando uma thread (alterado só no laço de eventos)
+        self.ocupadas = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif mensagem["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=True)
+                processos.encerrar()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        limite = self.limite_corpo(scope["path"])
+        if limite is not None:
+            declarado = next((v for n, v in scope.get("headers", []) if n.lower() == b"content-length"), b"")
+            if declarado.strip().isdigit() and int(declarado) > limite:
+                await self._responder_muito_grande(send)
+                return
+        corpo = tempfile.SpooledTemporaryFile(max_size=CORPO_EM_MEMORIA)
+        try:
+            recebido = 0
+            while True:
+                mensagem = await receive()
+                if mensagem["type"] == "http.disconnect":
+                    return
+                dados = mensagem.get("body", b"")
+                recebido += len(dados)
+                if limite is not None and recebido > limite:
+                    # Para de ler: o restante do corpo não chega ao disco
+                    await self._responder_muito_grande(send)
+                    return
+                corpo.write(dados)
+                if not mensagem.get("more_body"):
+                    break
+            corpo.seek(0)
+
+            if self.ocupadas >= self.threads + self.fila:
+                await self._responder_ocupado(send)
+                return
+            environ = self._environ(scope, corpo)
+            self.ocupadas += 1
+            try:
+                fluxo = await self._executar(environ, send)
+            except BaseException:
+                # Erro ou cliente desconectado antes de o fluxo começar: libera a vaga dele
+                if environ.get("eventos.fluxo") is not None:
+                    environ["eventos.fluxo"].fechar()
+                raise
+            finally:
+                self.ocupadas -= 1
+        finally:
+            corpo.close()
+        if fluxo is not None:
+            await self._transmitir(fluxo, receive, send)
+
+    @staticmethod
+    async def _transmitir(fluxo, receive, send):
+        """
+        Envia os eventos do fluxo (modules/eventos.py) até o cliente desconectar.
+        """
+        async def enviar_eventos():
+            async for dados in fluxo:
+                await send({"type": "http.response.body", "body": dados, "more_body": True})
+
+        async def aguardar_desconexao():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        tarefas = [asyncio.ensure_future(enviar_eventos()), asyncio.ensure_future(aguardar_desconexao())]
+        try:
+            await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            await asyncio.gather(*tarefas, return_exceptions=True)
+            fluxo.fechar()
+
+    @staticmethod
+    async def _responder_erro(send, status, mensagem, cabecalhos=()):
+        conteudo = json.dumps({"success": False, "message": mensagem}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(conteudo)).encode()),
+                *cabecalhos,
+            ],
+        })
+        await send({"type": "http.response.body", "body": conteudo})
+
+    async def _responder_ocupado(self, send):
+        await self._responder_erro(send, 503, "Servidor ocupado. Tente novamente.", [(b"retry-after", b"1")])
+
+    async def _responder_muito_grande(self, send):
+        # Connection: close: o restante do corpo não será lido
+        await self._responder_erro(send, 413, "Arquivo ou requisição muito grande.", [(b"connection", b"close")])
+
+    @staticmethod
+    def _environ(scope, corpo):
+        """
+        Monta o environ WSGI da requisição ASGI (PEP 3333: textos em latin-1).
+        """
+        script_name = scope.get("root_path", "")
+        path = scope["path"]
+        if script_name and path.startswith(script_name):
+            path = path[len(script_name):]
+        servidor = scope.get("server") or ("localhost", 80)
+        cliente = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": script_name.encode("utf-8").decode("latin-1"),
+            "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": servidor[0],
+            "SERVER_PORT": str(servidor[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": cliente[0],
+            "REMOTE_PORT": str(cliente[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": corpo,
+            # O corpo inteiro já foi recebido: pode ser lido até o fim sem Content-Length
+            "wsgi.input_terminated": True,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+            # A rota /eventos entrega o fluxo ao laço de eventos (ver _transmitir)
+            "eventos.assincrono": True,
+        }
+        for nome, valor in scope.get("headers", []):
+            nome = nome.decode("latin-1").upper().replace("-", "_")
+            valor = valor.decode("latin-1")
+            if nome not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                nome = f"HTTP_{nome}"
+            environ[nome] = f"{environ[nome]},{valor}" if nome in environ else valor
+        return environ
+
+    async def _executar(self, environ, send):
+        """
+        Roda a aplicação WSGI no executor e envia a resposta conforme os
+        pedaços do corpo são produzidos. Retorna o fluxo de eventos que a
+        view deixou em environ['eventos.fluxo'] (a resposta fica aberta), se houver.
+        """
+        laco = asyncio.get_running_loop()
+        saida = asyncio.Queue()
+        futuro = laco.run_in_executor(self._executor, self._executar_wsgi, environ, laco, saida)
+        iniciada = False
+        try:
+            while True:
+                item = await saida.get()
+                if item is None:
+                    break
+                tipo, valor = item
+                if tipo == "inicio":
+                    status, cabecalhos = valor
+                    # Fluxo de eventos: o corpo continua depois da view (sem Content-Length)
+                    fluxo = environ.get("eventos.fluxo")
+                    await send({
+                        "type": "http.response.start",
+                        "status": int(status.split(" ", 1)[0]),
+                        "headers": [(n.lower().encode("latin-1"), v.encode("latin-1")) for n, v in cabecalhos
+                                    if fluxo is None or n.lower() != "content-length"],
+                    })
+                    iniciada = True
+                else:
+                    await send({"type": "http.response.body", "body": valor, "more_body": True})
+            if iniciada and environ.get("eventos.fluxo") is None:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            # A vaga só é liberada quando a thread termina
+            erro = await futuro
+        if erro is not None:
+            # O servidor ASGI registra o erro (e responde 500 se a resposta não começou)
+            raise erro
+        return environ.get("eventos.fluxo")
+
+    def _executar_wsgi(self, environ, laco, saida):
+        """
+        Executado na thread do executor: chama a aplicação e entrega o início
+        da resposta e os pedaços do corpo à fila do laço de eventos.
+        Retorna a exceção ocorrida, se houver.
+        """
+        resposta = {}
+
+        def enviar(item):
+            laco.call_soon_threadsafe(saida.put_nowait, item)
+
+        def start_response(status, cabecalhos, exc_info=None):
+            if exc_info and resposta.get("enviada"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            resposta["inicio"] = (status, cabecalhos)
+            return lambda dados: enviar_corpo(dados)
+
+        def enviar_corpo(dados):
+            if not resposta.get("enviada"):
+                enviar(("inicio", resposta["inicio"]))
+                resposta["enviada"] = True
+            if dados:
+                enviar(("corpo", bytes(dados)))
+
+        try:
+            iteravel = self.wsgi_app(environ, start_response)
+            try:
+                for dados in iteravel:
+                    enviar_corpo(dados)
+                enviar_corpo(b"")
+            finally:
+                if hasattr(iteravel, "close"):
+                    iteravel.close()
+        except Exception as e:
+            return e
+        finally:
+            enviar(None)
+        return None
@@ -5,11 +5,14 @@ Gerencia a autenticação de usuários:
 - login (valida credenciais)
 - register (cadastro)
 - change_password (troca de senha)
-Utiliza o werkzeug.security para lidar com hash de senhas.
+Utiliza o werkzeug.security para lidar com hash de senhas, sempre pelo
+executor limitado de modules/senhas.py (que pode levantar SenhasOcupadas;
+as rotas respondem 503).
 """
 
-from werkzeug.security import generate_password_hash, check_password_hash
 from modules.database_connection import DatabaseConnection
+from modules import senhas
+from modules.senhas import SenhasOcupadas
 
 class AuthManager:
     @staticmethod
@@ -17,15 +20,25 @@ class AuthManager:
         """
         Verifica se 'usuario' existe e se a 'senha' corresponde ao hash armazenado.
         Retorna True se login for bem-sucedido, False caso contrário.
+        Se o hash foi gerado com parâmetros antigos, é refeito com os atuais.
         """
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT usuario, senha FROM usuarios WHERE usuario = ?", (usuario,))
             row = cursor.fetchone()
-            if row and check_password_hash(row["senha"], senha):
-                return True
-            return False
+            if not row:
+                return False
+            confere, novo_hash = senhas.verificar(row["senha"], senha)
+            if confere and novo_hash:
+                cursor.execute(
+                    "UPDATE usuarios SET senha = ? WHERE usuario = ? AND senha = ?",
+                    (novo_hash, usuario, row["senha"]),
+                )
+                conn.commit()
+            return confere
+        except SenhasOcupadas:
+            raise
         except Exception as e:
             print(f"Erro em login_user: {e}")
             return False
@@ -47,10 +60,12 @@ class AuthManager:
             if cursor.fetchone():
                 return False, "Usuário já existe."
             # Criptografa a senha e insere
-            senha_hash = generate_password_hash(senha)
+            senha_hash = senhas.gerar_hash(senha)
             cursor.execute("INSERT INTO usuarios (usuario, senha) VALUES (?, ?)", (usuario, senha_hash))
             conn.commit()
             return True, "Usuário registrado com sucesso!"
+        except SenhasOcupadas:
+            raise
         except Exception as e:
             print(f"Erro em register_user: {e}")
             return False, "Erro ao registrar usuário."
@@ -67,12 +82,14 @@ class AuthManager:
         conn = DatabaseConnection.get_connection()
         cursor = conn.cursor()
         try:
-            senha_hash = generate_password_hash(nova_senha)
+            senha_hash = senhas.gerar_hash(nova_senha)
             cursor.execute("UPDATE usuarios SET senha = ? WHERE usuario = ?", (senha_hash, usuario))
             if cursor.rowcount == 0:
                 return False, "Usuário não encontrado."
             conn.commit()
             return True, "Senha atualizada com sucesso!"
+        except SenhasOcupadas:
+            raise
         except Exception as e:
             print(f"Erro em change_password: {e}")
             return False, "Erro ao atualizar senha."
@@ -0,0 +1,110 @@
+"""
+Módulo: busca_funcionarios.py
+-----------------------------
+Busca de funcionários por parte do nome ou da chapa (autocomplete de
+/buscar_funcionarios), sobre o índice FTS5 'funcionarios_busca':
+
+  - tabela FTS5 de conteúdo externo (content='funcionarios'), com o
+    tokenizador trigram: qualquer trecho de 3 ou mais caracteres do nome ou
+    da chapa é encontrado pelo índice, sem varrer a tabela como LIKE '%x%';
+  - mantida por triggers em funcionarios (INSERT/UPDATE/DELETE), que rodam
+    na mesma transação da alteração, inclusive na importação de planilha;
+    ao final da importação, otimizar() funde os segmentos do índice;
+  - termos com menos de 3 caracteres só são buscados como prefixo da chapa
+    (índice idx_funcionarios_chapa);
+  - a ordenação por relevância (bm25) é feita sobre os primeiros CANDIDATOS
+    resultados do índice, e não sobre todos: um trecho comum ("SIL") pode
+    coincidir com boa parte da tabela, e ordenar tudo custaria dezenas de ms.
+
+O índice e os triggers são criados e populados pela migração 10
+(modules/migrations.py). No banco consolidado (modules/consolidado.py) o
+índice é de todos os tenants e tem a coluna 'tenant' (token_tenant): as
+buscas feitas em uma conexão com tenant_id são restritas a ele.
+"""
+
+LIMITE_PADRAO = 10
+LIMITE_MAXIMO = 50
+# Resultados do índice considerados na ordenação por relevância
+CANDIDATOS = 500
+
+
+def token_tenant(tenant_id):
+    """
+    Texto gravado na coluna 'tenant' do índice consolidado: 3 caracteres da
+    área de uso privado do Unicode (12 bits do tenant_id cada), ou seja, um
+    único trigrama, exclusivo do tenant e que nenhum nome ou chapa contém.
+    """
+    return "".join(chr(0xE000 + ((tenant_id >> deslocamento) & 0xFFF)) for deslocamento in (24, 12, 0))
+
+
+def token_tenant_sql(expressao):
+    """
+    Expressão SQL equivalente a token_tenant(expressao) (usada nos triggers).
+    """
+    return ", ".join(
+        f"57344 + (({expressao} >> {deslocamento}) & 4095)" for deslocamento in (24, 12, 0)
+    ).join(("char(", ")"))
+
+
+def otimizar(cursor):
+    """
+    Funde os segmentos do índice (após importações grandes). Não faz commit.
+    """
+    if getattr(cursor.connection, "tenant_id", None) is not None:
+        # Banco consolidado: o índice é de todos os tenants; fusão limitada
+        cursor.execute("INSERT INTO funcionarios_busca (funcionarios_busca, rank) VALUES ('merge', 500)")
+        return
+    cursor.execute("INSERT INTO funcionarios_busca (funcionarios_busca) VALUES ('optimize')")
+
+
+def _consulta_fts(termo):
+    """
+    Converte o texto digitado em uma consulta FTS5: cada palavra com 3 ou mais
+    caracteres vira uma frase entre aspas (todas devem ocorrer). Retorna None
+    se nenhuma palavra puder usar o índice trigram.
+    """
+    palavras = [p.replace('"', '""') for p in termo.split() if len(p) >= 3]
+    if not palavras:
+        return None
+    return " ".join(f'"{p}"' for p in palavras)
+
+
+def buscar(cursor, termo, limite=LIMITE_PADRAO):
+    """
+    Retorna até 'limite' funcionários cujo nome ou chapa contém 'termo',
+    ordenados por relevância (bm25), como linhas (chapa, nome, area_id, area).
+    """
+    termo = (termo or "").strip()
+    if not termo:
+        return []
+    consulta = _consulta_fts(termo)
+    if consulta is None:
+        # Termo curto: apenas prefixo da chapa
+        cursor.execute("""
+            SELECT f.chapa, f.nome, f.area_id, a.nome AS area
+            FROM funcionarios f
+            LEFT JOIN areas a ON f.area_id = a.id
+            WHERE f.chapa >= ? AND f.chapa < ? || char(1114111)
+            ORDER BY f.chapa
+            LIMIT ?
+        """, (termo, termo, limite))
+        return cursor.fetchall()
+
+    tenant_id = getattr(cursor.connection, "tenant_id", None)
+    if tenant_id is not None:
+        consulta = f'tenant : "{token_tenant(tenant_id)}" AND {{nome chapa}} : ({consulta})'
+
+    # Nomes/chapas que começam pelo termo vêm primeiro; depois, por bm25
+    cursor.execute("""
+        SELECT f.chapa, f.nome, f.area_id, a.nome AS area
+        FROM (
+            SELECT rowid, bm25(funcionarios_busca) AS relevancia FROM funcionarios_busca
+            WHERE funcionarios_busca MATCH :consulta
+            LIMIT :candidatos
+        ) b
+        JOIN funcionarios f ON f.id = b.rowid
+        LEFT JOIN areas a ON f.area_id = a.id
+        ORDER BY (f.nome LIKE :termo || '%' OR f.chapa LIKE :termo || '%') DESC, b.relevancia, f.nome
+        LIMIT :limite
+    """, {"consulta": consulta, "candidatos": CANDIDATOS, "termo": termo, "limite": limite})
+    return cursor.fetchall()
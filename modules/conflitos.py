@@ -0,0 +1,134 @@
+"""
+Módulo: conflitos.py
+--------------------
+Relatório das sobreposições de férias já existentes em cada área (rota
+/conflitos do dashboard). A verificação de agendar_ferias só impede novos
+conflitos; aprovações de pedidos (e agendamentos antigos) podem criá-los.
+
+Os períodos são fechados, [data_ferias, data_retorno], como em
+agendamentos.buscar_conflito. Os pedidos de aprovação pendentes entram como
+períodos hipotéticos (tipo 'pedido'), para mostrar o que sua aprovação causaria;
+pedidos com data ou número de dias inválidos são ignorados.
+
+Em vez de comparar os períodos dois a dois em SQL, uma única consulta traz os
+períodos ordenados por (área, início) e uma varredura (sweep-line) percorre
+cada área mantendo em um heap os períodos ainda ativos (ordenados pelo fim):
+cada período novo descarta os que já terminaram e se sobrepõe a todos os que
+restam. Custo O(n log n + pares encontrados).
+
+Os conflitos são agrupados: um grupo é uma sequência de períodos da mesma
+área encadeados por sobreposição, com os pares que se sobrepõem e o maior
+número de períodos simultâneos. Períodos do mesmo funcionário não formam par.
+"""
+
+import heapq
+
+
+def consultar(cursor, area_id=None, incluir_pedidos=True):
+    """
+    Retorna os períodos (agendamentos e, opcionalmente, pedidos pendentes)
+    ordenados por área e início. 'area_id' restringe a uma área.
+    """
+    filtro_agendamentos = "WHERE fa.area_id = :area_id" if area_id is not None else ""
+    consulta = f"""
+        SELECT 'agendamento' AS tipo, fa.id, fa.funcionario_id, f.chapa, f.nome,
+               fa.area_id, a.nome AS area, fa.data_ferias AS inicio,
+               fa.data_retorno AS fim, fa.dias_ferias AS dias
+        FROM ferias_agendadas fa
+        JOIN funcionarios f ON fa.funcionario_id = f.id
+        JOIN areas a ON fa.area_id = a.id
+        {filtro_agendamentos}
+    """
+    if incluir_pedidos:
+        consulta += f"""
+        UNION ALL
+        SELECT 'pedido', pa.id, f.id, pa.chapa, f.nome,
+               f.area_id, a.nome, pa.dataFerias,
+               date(pa.dataFerias, '+' || pa.diasFerias || ' days'), pa.diasFerias
+        FROM pedidos_aprovacao pa
+        JOIN funcionarios f ON pa.chapa = f.chapa
+        JOIN areas a ON f.area_id = a.id
+        WHERE pa.status = 'PENDENTE'
+          -- Pedidos são gravados sem validação: sem período calculável, ficam de fora
+          AND date(pa.dataFerias) IS NOT NULL
+          AND date(pa.dataFerias, '+' || pa.diasFerias || ' days') IS NOT NULL
+          {"AND f.area_id = :area_id" if area_id is not None else ""}
+        """
+    # Posições de area_id e inicio (válidas com ou sem o UNION ALL)
+    consulta += " ORDER BY 6, 8"
+    cursor.execute(consulta, {"area_id": area_id})
+    return cursor.fetchall()
+
+
+def varrer(periodos):
+    """
+    Varredura sobre os períodos de uma área, já ordenados por início.
+    Cada período precisa de 'inicio', 'fim' (datas ISO) e 'funcionario_id'.
+    Retorna a lista de grupos com ao menos um par:
+    {"periodos": [...], "pares": [(i, j), ...], "maximo": n}, com i e j índices em "periodos".
+    """
+    grupos = []
+    grupo, pares, ativos = [], [], []  # ativos: heap de (fim, índice no grupo)
+    maximo = 0
+    fim_grupo = None
+
+    for periodo in periodos:
+        if grupo and periodo["inicio"] > fim_grupo:
+            # Nenhum período do grupo alcança este: o grupo está completo
+            if pares:
+                grupos.append({"periodos": grupo, "pares": pares, "maximo": maximo})
+            grupo, pares, ativos = [], [], []
+            maximo = 0
+        while ativos and ativos[0][0] < periodo["inicio"]:
+            heapq.heappop(ativos)
+        indice = len(grupo)
+        for _, j in ativos:
+            if grupo[j]["funcionario_id"] != periodo["funcionario_id"]:
+                pares.append((j, indice))
+        grupo.append(periodo)
+        heapq.heappush(ativos, (periodo["fim"], indice))
+        maximo = max(maximo, len(ativos))
+        fim_grupo = periodo["fim"] if indice == 0 else max(fim_grupo, periodo["fim"])
+
+    if pares:
+        grupos.append({"periodos": grupo, "pares": pares, "maximo": maximo})
+    return grupos
+
+
+def relatorio(cursor, area_id=None, incluir_pedidos=True):
+    """
+    Monta o relatório de conflitos: para cada grupo, a área, o intervalo
+    coberto, os períodos, os pares sobrepostos e o máximo simultâneo.
+    """
+    linhas = consultar(cursor, area_id, incluir_pedidos)
+    grupos = []
+    inicio_area = 0
+    # As linhas vêm ordenadas por área: varre cada trecho de uma mesma área
+    for i in range(1, len(linhas) + 1):
+        if i < len(linhas) and linhas[i]["area_id"] == linhas[inicio_area]["area_id"]:
+            continue
+        for grupo in varrer(linhas[inicio_area:i]):
+            periodos = grupo["periodos"]
+            grupos.append({
+                "areaId": periodos[0]["area_id"],
+                "area": periodos[0]["area"],
+                "inicio": periodos[0]["inicio"],
+                "fim": max(p["fim"] for p in periodos),
+                "maximoSimultaneo": grupo["maximo"],
+                "periodos": [{
+                    "tipo": p["tipo"],
+                    "id": p["id"],
+                    "chapa": p["chapa"],
+                    "nome": p["nome"],
+                    "dataFerias": p["inicio"],
+                    "dataRetorno": p["fim"],
+                    "diasFerias": p["dias"],
+                } for p in periodos],
+                "pares": grupo["pares"],
+            })
+        inicio_area = i
+    return {
+        "grupos": grupos,
+        "total_grupos": len(grupos),
+        "total_pares": sum(len(g["pares"]) for g in grupos),
+    }
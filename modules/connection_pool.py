@@ -0,0 +1,223 @@
+"""
+Módulo: connection_pool.py
+--------------------------
+Pool de conexões SQLite compartilhado por toda a aplicação.
+
+Cada arquivo de banco (app.db e os gestor_*_funcionarios.db de cada gestor)
+possui sua própria fila de conexões ociosas. Durante uma requisição, a primeira
+chamada a get_request_connection(path) empresta uma conexão do pool e a guarda
+em flask.g; as chamadas seguintes na mesma requisição reutilizam essa conexão.
+No teardown do contexto da aplicação (release_request_connections) as conexões
+são devolvidas ao pool.
+
+  - Os PRAGMAs são aplicados apenas uma vez, quando a conexão física é aberta.
+  - O número de bancos com conexões ociosas é limitado (LRU); os bancos menos
+    usados recentemente têm suas conexões fechadas, evitando esgotar os
+    descritores de arquivo quando há centenas de gestores.
+  - conn.close() chamado pelas rotas enquanto a conexão está emprestada não fecha
+    a conexão física: ela só volta ao pool no fim da requisição.
+  - No modo consolidado (modules/consolidado.py) todos os gestores usam o mesmo
+    arquivo: as conexões ociosas são compartilhadas, mas cada gestor usado na
+    requisição recebe a sua (parâmetro 'chave' de get_request_connection).
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import perf_counter
+from flask import g, has_app_context
+
+from modules import metricas
+
+# PRAGMAs aplicados uma única vez por conexão física
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+)
+
+
+class CursorMedido(sqlite3.Cursor):
+    """
+    Cursor que soma o tempo de execute*/fetch* à requisição em andamento
+    (métricas de banco, modules/metricas.py).
+    """
+
+    def _medir(self, metodo, comandos, *args):
+        inicio = perf_counter()
+        try:
+            return metodo(self, *args)
+        finally:
+            metricas.tempo_db(perf_counter() - inicio, comandos)
+
+    def execute(self, sql, parameters=()):
+        return self._medir(sqlite3.Cursor.execute, 1, sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self._medir(sqlite3.Cursor.executemany, 1, sql, parameters)
+
+    def executescript(self, script):
+        return self._medir(sqlite3.Cursor.executescript, 1, script)
+
+    def fetchone(self):
+        return self._medir(sqlite3.Cursor.fetchone, 0)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        return self._medir(sqlite3.Cursor.fetchmany, 0, size)
+
+    def fetchall(self):
+        return self._medir(sqlite3.Cursor.fetchall, 0)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexão SQLite que ignora close() enquanto estiver emprestada a uma requisição.
+    tenant_id é usado apenas no modo consolidado (modules/consolidado.py).
+
+    Os cursores (inclusive os de conn.execute) são CursorMedido; o tempo do
+    commit também entra nas métricas de banco.
+    """
+    emprestada = False
+    tenant_id = None
+
+    def close(self):
+        if self.emprestada:
+            return
+        super().close()
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    # sqlite3.Connection.execute* não passam por cursor(): usa o CursorMedido
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, parameters):
+        return self.cursor().executemany(sql, parameters)
+
+    def executescript(self, script):
+        return self.cursor().executescript(script)
+
+    def commit(self):
+        inicio = perf_counter()
+        try:
+            super().commit()
+        finally:
+            metricas.tempo_db(perf_counter() - inicio, 0)
+
+
+class ConnectionPool:
+    """
+    Pool thread-safe de conexões, indexado pelo caminho do arquivo de banco.
+    """
+
+    def __init__(self, max_tenants=32, max_idle_per_tenant=4):
+        self.max_tenants = max_tenants
+        self.max_idle_per_tenant = max_idle_per_tenant
+        self._lock = threading.Lock()
+        self._idle = OrderedDict()  # caminho -> lista de conexões ociosas
+
+    @staticmethod
+    def open_connection(path):
+        """
+        Abre uma nova conexão física e aplica os PRAGMAs.
+        """
+        conn = sqlite3.connect(path, factory=PooledConnection, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self, path):
+        """
+        Retorna uma conexão ociosa para 'path' ou abre uma nova.
+        """
+        conn = None
+        with self._lock:
+            idle = self._idle.get(path)
+            if idle:
+                conn = idle.pop()
+                self._idle.move_to_end(path)
+        if conn is None:
+            conn = self.open_connection(path)
+        conn.emprestada = True
+        return conn
+
+    def release(self, path, conn):
+        """
+        Devolve a conexão ao pool. Transações não confirmadas são desfeitas,
+        como aconteceria ao fechar a conexão.
+        """
+        conn.emprestada = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        to_close = []
+        with self._lock:
+            idle = self._idle.setdefault(path, [])
+            self._idle.move_to_end(path)
+            if len(idle) < self.max_idle_per_tenant:
+                idle.append(conn)
+            else:
+                to_close.append(conn)
+            # Despeja os bancos menos usados recentemente
+            while len(self._idle) > self.max_tenants:
+                _, evicted = self._idle.popitem(last=False)
+                to_close.extend(evicted)
+        for c in to_close:
+            c.close()
+
+    def close_all(self):
+        """
+        Fecha todas as conexões ociosas (ex.: ao encerrar o processo).
+        """
+        with self._lock:
+            idle = [c for conns in self._idle.values() for c in conns]
+            self._idle.clear()
+        for c in idle:
+            c.close()
+
+
+pool = ConnectionPool(
+    max_tenants=int(os.environ.get("DB_POOL_MAX_TENANTS", "32")),
+    max_idle_per_tenant=int(os.environ.get("DB_POOL_MAX_IDLE", "4")),
+)
+
+
+def get_request_connection(path, chave=None):
+    """
+    Retorna a conexão da requisição atual para o banco 'path', emprestando-a
+    do pool na primeira chamada. 'chave' (padrão: path) distingue conexões ao
+    mesmo arquivo dentro da requisição. Fora de um contexto Flask (scripts,
+    init_db), retorna uma conexão avulsa que deve ser fechada pelo chamador.
+    """
+    if not has_app_context():
+        return ConnectionPool.open_connection(path)
+    conexoes = g.setdefault("_db_conexoes", {})
+    chave = chave or path
+    emprestada = conexoes.get(chave)
+    if emprestada is None:
+        emprestada = (path, pool.acquire(path))
+        conexoes[chave] = emprestada
+    return emprestada[1]
+
+
+def release_request_connections(exc=None):
+    """
+    Devolve ao pool as conexões emprestadas durante a requisição.
+    Registrado com app.teardown_appcontext.
+    """
+    conexoes = g.pop("_db_conexoes", None)
+    if not conexoes:
+        return
+    for path, conn in conexoes.values():
+        pool.release(path, conn)
@@ -0,0 +1,460 @@
+"""
+Módulo: consolidado.py
+----------------------
+Modo de armazenamento consolidado (opcional, ARMAZENAMENTO=consolidado): em
+vez de um arquivo gestor_<usuario>_funcionarios.db por gestor, todos os
+gestores (tenants) ficam em um único banco (BANCO_CONSOLIDADO, padrão
+consolidado.db). Um tenant é identificado pela chave que já existe na sessão
+(session['employee_db'], o nome do arquivo que ele teria), associada a um
+tenant_id na tabela 'tenants'.
+
+  - As tabelas reais têm o prefixo t_ e a coluna tenant_id, que é a primeira
+    coluna de todos os índices (as consultas de um tenant nunca percorrem
+    linhas de outro).
+  - Cada conexão ganha, ao ser aberta, views temporárias com os nomes das
+    tabelas do banco por arquivo (areas, funcionarios, ferias_agendadas,
+    pedidos_aprovacao, resumo_ferias_mensal, versao_dados), filtradas por
+    tenant_id = tenant_atual(), e triggers INSTEAD OF que gravam nas tabelas
+    reais. tenant_atual() é uma função SQL da conexão que devolve o tenant
+    selecionado por conectar(). Assim as rotas e os módulos executam as
+    mesmas consultas nos dois modos (employee_db.get_user_connection escolhe).
+  - versao_dados tem uma linha por tenant, mantida por triggers nas tabelas
+    reais; o índice de busca (funcionarios_busca) é uma tabela FTS5 sem
+    conteúdo com a coluna 'tenant' (ver busca_funcionarios.token_tenant).
+  - Os ids são únicos no banco inteiro (não por tenant).
+
+O esquema tem sua própria lista de migrações (MIGRACOES, aplicada pelo motor
+de modules/migrations.py): mudanças no esquema por arquivo devem ganhar aqui
+a migração equivalente.
+
+Os bancos por arquivo existentes são copiados para o consolidado pela linha
+de comando (a cópia de um gestor substitui os dados que ele já tiver lá):
+
+    python -m modules.consolidado [banco.db ...]
+
+Sem argumentos, copia todos os gestor_*_funcionarios.db e o
+setores_funcionarios.db do diretório atual.
+"""
+
+import glob
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from modules import busca_funcionarios, migrations
+from modules.connection_pool import get_request_connection
+
+ATIVO = os.environ.get("ARMAZENAMENTO", "arquivos") == "consolidado"
+CAMINHO = os.environ.get("BANCO_CONSOLIDADO", "consolidado.db")
+
+# Tabelas com id próprio: tabela -> colunas (sem id e tenant_id)
+COLUNAS = {
+    "areas": ("nome",),
+    "funcionarios": ("nome", "chapa", "area_id"),
+    "ferias_agendadas": ("funcionario_id", "data_ferias", "dias_ferias", "data_retorno", "area_id"),
+    "pedidos_aprovacao": ("chapa", "dataFerias", "diasFerias", "status", "data_pedido"),
+}
+# Valores padrão das colunas (views não aplicam o DEFAULT da tabela real)
+PADROES = {
+    ("pedidos_aprovacao", "status"): "'PENDENTE'",
+    ("pedidos_aprovacao", "data_pedido"): "CURRENT_TIMESTAMP",
+}
+
+_migrado = False
+_lock = threading.Lock()
+_tenants = {}  # chave -> tenant_id
+
+
+def _v1_esquema_inicial(cursor):
+    """
+    Tabelas reais (t_*), índices por tenant, versão dos dados e índice de busca.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tenants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chave TEXT NOT NULL UNIQUE
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS t_areas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tenant_id INTEGER NOT NULL REFERENCES tenants(id),
+        nome TEXT NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS t_funcionarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tenant_id INTEGER NOT NULL REFERENCES tenants(id),
+        nome TEXT NOT NULL,
+        chapa TEXT NOT NULL,
+        area_id INTEGER REFERENCES t_areas(id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS t_ferias_agendadas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tenant_id INTEGER NOT NULL REFERENCES tenants(id),
+        funcionario_id INTEGER REFERENCES t_funcionarios(id),
+        data_ferias DATE,
+        dias_ferias INTEGER,
+        data_retorno DATE,
+        area_id INTEGER
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS t_pedidos_aprovacao (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tenant_id INTEGER NOT NULL REFERENCES tenants(id),
+        chapa TEXT NOT NULL,
+        dataFerias DATE NOT NULL,
+        diasFerias INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'PENDENTE',
+        data_pedido TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS t_resumo_ferias_mensal (
+        tenant_id INTEGER NOT NULL REFERENCES tenants(id),
+        mes TEXT NOT NULL,
+        area_id INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        detalhes TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (tenant_id, mes, area_id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS t_versao_dados (
+        tenant_id INTEGER PRIMARY KEY REFERENCES tenants(id),
+        versao INTEGER NOT NULL DEFAULT 1,
+        versao_funcionarios INTEGER NOT NULL DEFAULT 1,
+        atualizado_em TEXT NOT NULL DEFAULT (datetime('now'))
+    )
+    ''')
+
+    # Os mesmos índices do banco por arquivo, precedidos por tenant_id
+    for indice in (
+        "CREATE INDEX IF NOT EXISTS idx_t_areas_nome ON t_areas (tenant_id, nome)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_t_funcionarios_chapa ON t_funcionarios (tenant_id, chapa)",
+        "CREATE INDEX IF NOT EXISTS idx_t_ferias_area_periodo"
+        " ON t_ferias_agendadas (tenant_id, area_id, data_ferias, data_retorno)",
+        "CREATE INDEX IF NOT EXISTS idx_t_ferias_area_dias ON t_ferias_agendadas (tenant_id, area_id, dias_ferias)",
+        "CREATE INDEX IF NOT EXISTS idx_t_ferias_funcionario ON t_ferias_agendadas (tenant_id, funcionario_id)",
+        "CREATE INDEX IF NOT EXISTS idx_t_ferias_retorno ON t_ferias_agendadas (tenant_id, data_retorno)",
+        "CREATE INDEX IF NOT EXISTS idx_t_ferias_data ON t_ferias_agendadas (tenant_id, data_ferias)",
+        "CREATE INDEX IF NOT EXISTS idx_t_pedidos_status ON t_pedidos_aprovacao (tenant_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_t_pedidos_chapa ON t_pedidos_aprovacao (tenant_id, chapa, status)",
+    ):
+        cursor.execute(indice)
+
+    # Versão dos dados: uma linha por tenant (ver modules/versao_dados.py)
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_tenants_insert AFTER INSERT ON tenants
+    BEGIN
+        INSERT INTO t_versao_dados (tenant_id) VALUES (new.id);
+    END
+    ''')
+    for tabela in ("areas", "funcionarios", "ferias_agendadas", "pedidos_aprovacao"):
+        funcionarios = ", versao_funcionarios = versao_funcionarios + 1" if tabela in ("areas", "funcionarios") else ""
+        for operacao, linha in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_versao_{tabela}_{operacao.lower()}
+            AFTER {operacao} ON t_{tabela}
+            BEGIN
+                UPDATE t_versao_dados SET versao = versao + 1{funcionarios}, atualizado_em = datetime('now')
+                WHERE tenant_id = {linha}.tenant_id;
+            END
+            ''')
+
+    # Índice de busca (ver modules/busca_funcionarios.py)
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS funcionarios_busca USING fts5(
+        nome, chapa, tenant,
+        content='',
+        tokenize='trigram'
+    )
+    ''')
+    novo = busca_funcionarios.token_tenant_sql("new.tenant_id")
+    antigo = busca_funcionarios.token_tenant_sql("old.tenant_id")
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_funcionarios_insert AFTER INSERT ON t_funcionarios
+    BEGIN
+        INSERT INTO funcionarios_busca (rowid, nome, chapa, tenant) VALUES (new.id, new.nome, new.chapa, {novo});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_funcionarios_delete AFTER DELETE ON t_funcionarios
+    BEGIN
+        INSERT INTO funcionarios_busca (funcionarios_busca, rowid, nome, chapa, tenant)
+        VALUES ('delete', old.id, old.nome, old.chapa, {antigo});
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_funcionarios_update
+    AFTER UPDATE OF nome, chapa ON t_funcionarios
+    BEGIN
+        INSERT INTO funcionarios_busca (funcionarios_busca, rowid, nome, chapa, tenant)
+        VALUES ('delete', old.id, old.nome, old.chapa, {antigo});
+        INSERT INTO funcionarios_busca (rowid, nome, chapa, tenant) VALUES (new.id, new.nome, new.chapa, {novo});
+    END
+    ''')
+
+
+def _v2_indice_funcionarios_area(cursor):
+    """
+    Equivalente da migração 11 dos bancos por arquivo.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_t_funcionarios_area ON t_funcionarios (tenant_id, area_id)")
+
+
+def _v3_versao_resumo(cursor):
+    """
+    Equivalente da migração 12 dos bancos por arquivo.
+    """
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(t_resumo_ferias_mensal)")}
+    if "versao" not in colunas:
+        cursor.execute("ALTER TABLE t_resumo_ferias_mensal ADD COLUMN versao INTEGER NOT NULL DEFAULT 0")
+    versao_atual = "(SELECT versao FROM t_versao_dados v WHERE v.tenant_id = {}.tenant_id)"
+    cursor.execute(f"UPDATE t_resumo_ferias_mensal SET versao = {versao_atual.format('t_resumo_ferias_mensal')}")
+    for operacao in ("INSERT", "UPDATE OF total, detalhes"):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_versao_{operacao.split()[0].lower()}
+        AFTER {operacao} ON t_resumo_ferias_mensal
+        BEGIN
+            UPDATE t_resumo_ferias_mensal SET versao = {versao_atual.format('new')}
+            WHERE tenant_id = new.tenant_id AND mes = new.mes AND area_id = new.area_id;
+        END
+        ''')
+
+
+# (versão, descrição, função) — nunca altere uma migração já publicada; acrescente outra.
+MIGRACOES = [
+    (1, "esquema consolidado", _v1_esquema_inicial),
+    (2, "índice de funcionários por área", _v2_indice_funcionarios_area),
+    (3, "versão das células do resumo mensal", _v3_versao_resumo),
+]
+
+
+def _criar_views(conn):
+    """
+    Cria, na conexão, a função tenant_atual() e as views temporárias (com
+    triggers INSTEAD OF) que expõem as tabelas do tenant selecionado.
+    """
+    conn.create_function("tenant_atual", 0, lambda: conn.tenant_id)
+    for tabela, colunas in COLUNAS.items():
+        lista = ", ".join(colunas)
+        valores = ", ".join(
+            f"coalesce(new.{c}, {PADROES[(tabela, c)]})" if (tabela, c) in PADROES else f"new.{c}"
+            for c in colunas
+        )
+        conn.execute(f'''
+        CREATE TEMP VIEW IF NOT EXISTS {tabela} AS
+        SELECT id, {lista} FROM main.t_{tabela} WHERE tenant_id = tenant_atual()
+        ''')
+        conn.execute(f'''
+        CREATE TEMP TRIGGER IF NOT EXISTS trg_{tabela}_insert INSTEAD OF INSERT ON {tabela}
+        BEGIN
+            INSERT INTO t_{tabela} (id, tenant_id, {lista}) VALUES (new.id, tenant_atual(), {valores});
+        END
+        ''')
+        conn.execute(f'''
+        CREATE TEMP TRIGGER IF NOT EXISTS trg_{tabela}_update INSTEAD OF UPDATE ON {tabela}
+        BEGIN
+            UPDATE t_{tabela} SET {", ".join(f"{c} = new.{c}" for c in colunas)} WHERE id = old.id;
+        END
+        ''')
+        conn.execute(f'''
+        CREATE TEMP TRIGGER IF NOT EXISTS trg_{tabela}_delete INSTEAD OF DELETE ON {tabela}
+        BEGIN
+            DELETE FROM t_{tabela} WHERE id = old.id;
+        END
+        ''')
+
+    conn.execute('''
+    CREATE TEMP VIEW IF NOT EXISTS resumo_ferias_mensal AS
+    SELECT mes, area_id, total, detalhes, versao FROM main.t_resumo_ferias_mensal WHERE tenant_id = tenant_atual()
+    ''')
+    # OR REPLACE: resumo_ferias grava as células com INSERT OR REPLACE
+    conn.execute('''
+    CREATE TEMP TRIGGER IF NOT EXISTS trg_resumo_ferias_mensal_insert INSTEAD OF INSERT ON resumo_ferias_mensal
+    BEGIN
+        INSERT OR REPLACE INTO t_resumo_ferias_mensal (tenant_id, mes, area_id, total, detalhes)
+        VALUES (tenant_atual(), new.mes, new.area_id, new.total, coalesce(new.detalhes, ''));
+    END
+    ''')
+    conn.execute('''
+    CREATE TEMP TRIGGER IF NOT EXISTS trg_resumo_ferias_mensal_update INSTEAD OF UPDATE ON resumo_ferias_mensal
+    BEGIN
+        UPDATE t_resumo_ferias_mensal
+        SET mes = new.mes, area_id = new.area_id, total = new.total, detalhes = new.detalhes
+        WHERE tenant_id = tenant_atual() AND mes = old.mes AND area_id = old.area_id;
+    END
+    ''')
+    conn.execute('''
+    CREATE TEMP TRIGGER IF NOT EXISTS trg_resumo_ferias_mensal_delete INSTEAD OF DELETE ON resumo_ferias_mensal
+    BEGIN
+        DELETE FROM t_resumo_ferias_mensal
+        WHERE tenant_id = tenant_atual() AND mes = old.mes AND area_id = old.area_id;
+    END
+    ''')
+
+    conn.execute('''
+    CREATE TEMP VIEW IF NOT EXISTS versao_dados AS
+    SELECT 1 AS id, versao, versao_funcionarios, atualizado_em
+    FROM main.t_versao_dados WHERE tenant_id = tenant_atual()
+    ''')
+
+
+def chave_tenant(db_path):
+    """
+    Chave do tenant de um caminho de banco por arquivo (o nome do arquivo).
+    """
+    return os.path.basename(db_path)
+
+
+def garantir():
+    """
+    Cria ou migra o banco consolidado na primeira vez que é usado neste processo.
+    """
+    global _migrado
+    if _migrado:
+        return
+    with _lock:
+        if _migrado:
+            return
+        conn = sqlite3.connect(CAMINHO)
+        try:
+            migrations.migrar(conn, MIGRACOES)
+        finally:
+            conn.close()
+        _migrado = True
+
+
+def _registrar(cursor, chave):
+    """
+    Retorna o tenant_id da chave, cadastrando o tenant se necessário (sem commit).
+    """
+    cursor.execute("INSERT OR IGNORE INTO tenants (chave) VALUES (?)", (chave,))
+    cursor.execute("SELECT id FROM tenants WHERE chave = ?", (chave,))
+    return cursor.fetchone()[0]
+
+
+def conectar(db_path):
+    """
+    Retorna a conexão da requisição com o banco consolidado, com as views
+    restritas ao tenant de 'db_path' (cadastrado no primeiro uso).
+    """
+    garantir()
+    chave = chave_tenant(db_path)
+    conn = get_request_connection(CAMINHO, chave)
+    if conn.tenant_id is None:
+        _criar_views(conn)
+    tenant_id = _tenants.get(chave)
+    if tenant_id is None:
+        cursor = conn.cursor()
+        row = cursor.execute("SELECT id FROM tenants WHERE chave = ?", (chave,)).fetchone()
+        if row is None:
+            tenant_id = _registrar(cursor, chave)
+            conn.commit()
+        else:
+            tenant_id = row[0]
+        cursor.close()
+        _tenants[chave] = tenant_id
+    conn.tenant_id = tenant_id
+    return conn
+
+
+def _proximo_id(cursor, tabela):
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (tabela,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def copiar(conn, arquivo):
+    """
+    Copia o banco por arquivo 'arquivo' (migrado antes, se necessário) para o
+    tenant de mesma chave no banco consolidado da conexão 'conn', substituindo
+    os dados que ele já tiver. Os ids são deslocados para depois dos já
+    existentes, em uma única transação. Retorna o número de linhas copiadas.
+    """
+    migrations.migrar_arquivo(arquivo)
+    conn.execute("ATTACH DATABASE ? AS origem", (arquivo,))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.cursor()
+            tenant_id = _registrar(cursor, chave_tenant(arquivo))
+            for tabela in ("t_pedidos_aprovacao", "t_ferias_agendadas", "t_funcionarios", "t_areas"):
+                cursor.execute(f"DELETE FROM {tabela} WHERE tenant_id = ?", (tenant_id,))
+            # Células antigas zeradas, não removidas (ver resumo_ferias.ler_desde)
+            cursor.execute(
+                "UPDATE t_resumo_ferias_mensal SET total = 0, detalhes = '' WHERE tenant_id = ?", (tenant_id,)
+            )
+
+            base = {tabela: _proximo_id(cursor, f"t_{tabela}") for tabela in COLUNAS}
+            parametros = {"tenant": tenant_id, **base}
+            copias = (
+                "INSERT INTO t_areas (id, tenant_id, nome) SELECT id + :areas, :tenant, nome FROM origem.areas",
+                """INSERT INTO t_funcionarios (id, tenant_id, nome, chapa, area_id)
+                   SELECT id + :funcionarios, :tenant, nome, chapa, area_id + :areas FROM origem.funcionarios""",
+                """INSERT INTO t_ferias_agendadas
+                       (id, tenant_id, funcionario_id, data_ferias, dias_ferias, data_retorno, area_id)
+                   SELECT id + :ferias_agendadas, :tenant, funcionario_id + :funcionarios, data_ferias,
+                          dias_ferias, data_retorno, area_id + :areas
+                   FROM origem.ferias_agendadas""",
+                """INSERT INTO t_pedidos_aprovacao
+                       (id, tenant_id, chapa, dataFerias, diasFerias, status, data_pedido)
+                   SELECT id + :pedidos_aprovacao, :tenant, chapa, dataFerias, diasFerias, status, data_pedido
+                   FROM origem.pedidos_aprovacao""",
+                """INSERT OR REPLACE INTO t_resumo_ferias_mensal (tenant_id, mes, area_id, total, detalhes)
+                   SELECT :tenant, mes, area_id + :areas, total, detalhes FROM origem.resumo_ferias_mensal""",
+            )
+            linhas = 0
+            for sql in copias:
+                cursor.execute(sql, parametros)
+                linhas += cursor.rowcount
+
+            # A versão nova é maior que qualquer versão já vista do banco por
+            # arquivo: ETags e caches derivados dele não coincidem por acaso
+            cursor.execute('''
+            UPDATE t_versao_dados
+            SET versao = versao + (SELECT versao FROM origem.versao_dados WHERE id = 1),
+                versao_funcionarios = versao_funcionarios
+                                      + (SELECT versao_funcionarios FROM origem.versao_dados WHERE id = 1),
+                atualizado_em = datetime('now')
+            WHERE tenant_id = ?
+            ''', (tenant_id,))
+            # Células do resumo com a versão nova: o dashboard de quem já via o tenant as recebe todas
+            cursor.execute('''
+            UPDATE t_resumo_ferias_mensal
+            SET versao = (SELECT versao FROM t_versao_dados WHERE tenant_id = :tenant)
+            WHERE tenant_id = :tenant
+            ''', {"tenant": tenant_id})
+            cursor.close()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    finally:
+        conn.execute("DETACH DATABASE origem")
+    return linhas
+
+
+if __name__ == "__main__":
+    bancos = sys.argv[1:] or sorted(glob.glob("gestor_*_funcionarios.db")) + ["setores_funcionarios.db"]
+    garantir()
+    conn = sqlite3.connect(CAMINHO)
+    try:
+        for banco in bancos:
+            if not os.path.exists(banco):
+                print(f"Banco de dados '{banco}' não encontrado.")
+                continue
+            inicio = time.perf_counter()
+            linhas = copiar(conn, banco)
+            print(f"'{banco}' copiado para '{CAMINHO}': {linhas} linhas em {time.perf_counter() - inicio:.2f} s.")
+        conn.execute("INSERT INTO funcionarios_busca (funcionarios_busca) VALUES ('optimize')")
+        conn.commit()
+    finally:
+        conn.close()
@@ -4,14 +4,21 @@ Módulo: dashboard_manager.py
 Centraliza a lógica do Dashboard, consultando o banco setores_funcionarios.db
 para:
   - Obter os agendamentos de férias agrupados por mês e por área,
-    retornando também detalhes dos funcionários (nome e dias de férias) para tooltips.
+    retornando também detalhes dos funcionários (nome e dias de férias) para tooltips
+    (lidos da tabela materializada resumo_ferias_mensal).
+  - Obter só as células alteradas desde uma versão dos dados (atualização
+    parcial do gráfico) e os totais da página, sem montar os datasets.
   - Buscar os pedidos de aprovação pendentes.
   - Aprovar um pedido: insere o registro em ferias_agendadas e atualiza o status do pedido.
   - Rejeitar um pedido: atualiza o status para "REJEITADO".
+  - Aprovar ou rejeitar vários pedidos de uma vez, em uma única transação.
   - Excluir todos os agendamentos.
 """
 
+import json
+
 from modules.employee_db import EmployeeDB
+from modules import resumo_ferias, agendamentos
 from datetime import datetime, timedelta
 
 class DashboardManager:
@@ -20,24 +27,19 @@ class DashboardManager:
         conn = EmployeeDB.get_connection()
         cursor = conn.cursor()
 
-        # Consulta: agrupa os agendamentos por mês e por área, incluindo área_id
-        cursor.execute("""
-            SELECT strftime('%Y-%m', fa.data_ferias) AS mes, a.nome AS area, a.id as area_id, COUNT(*) AS count
-            FROM ferias_agendadas fa
-            JOIN funcionarios f ON fa.funcionario_id = f.id
-            JOIN areas a ON f.area_id = a.id
-            GROUP BY mes, a.nome
-        """)
-        rows = cursor.fetchall()
-
-        # Extrai os meses únicos (ordenados) e informações das áreas
-        meses = sorted({row["mes"] for row in rows})
-        area_info = {}
-        for row in rows:
-            area_name = row["area"]
-            if area_name not in area_info:
-                area_info[area_name] = row["area_id"]
-        areas = sorted(list(area_info.keys()))
+        # Lê a tabela materializada resumo_ferias_mensal (uma linha por mês/área),
+        # mantida pelas rotas que alteram ferias_agendadas.
+        # (área, mês) -> lista de "nome (dias dias)"; a contagem é o total das células
+        detalhes = {}
+        contagens = {}
+        for row in resumo_ferias.ler(cursor):
+            chave = (row["area"], row["mes"])
+            contagens[chave] = contagens.get(chave, 0) + row["total"]
+            detalhes.setdefault(chave, []).append(row["detalhes"])
+
+        # Extrai os meses e as áreas únicos (ordenados)
+        meses = sorted({mes for _, mes in detalhes})
+        areas = sorted({area for area, _ in detalhes})
 
         # Definir cores para cada área (ciclo de cores se necessário)
         colors = [
@@ -49,29 +51,14 @@ class DashboardManager:
         ]
 
         # Monta os datasets para o gráfico: para cada área, para cada mês,
-        # obtenha a contagem e detalhes (lista de "nome (dias dias)")
+        # a contagem e os detalhes (lista de "nome (dias dias)")
         datasets = []
         for i, area in enumerate(areas):
             data_for_area = []
             customData = []  # Armazenará detalhes para cada mês
-            area_id = area_info[area]
             for mes in meses:
-                # Valor agregado: contagem para esse mês e área
-                count_val = next((row["count"] for row in rows if row["mes"] == mes and row["area"] == area), 0)
-                data_for_area.append(count_val)
-                # Obter detalhes para cada agendamento (nome e dias)
-                cursor.execute("""
-                    SELECT f.nome, fa.dias_ferias
-                    FROM ferias_agendadas fa
-                    JOIN funcionarios f ON fa.funcionario_id = f.id
-                    WHERE strftime('%Y-%m', fa.data_ferias) = ? AND f.area_id = ?
-                """, (mes, area_id))
-                details = cursor.fetchall()
-                if details:
-                    detail_list = [f"{d['nome']} ({d['dias_ferias']} dias)" for d in details]
-                    customData.append("\n".join(detail_list))
-                else:
-                    customData.append("")
+                data_for_area.append(contagens.get((area, mes), 0))
+                customData.append("\n".join(detalhes.get((area, mes), [])))
             datasets.append({
                 "label": area,
                 "data": data_for_area,
@@ -82,32 +69,10 @@ class DashboardManager:
             })
 
         # Total de agendamentos
-        cursor.execute("SELECT COUNT(*) AS total FROM ferias_agendadas")
-        total_agendamentos = cursor.fetchone()["total"]
-
-        # Consulta para pedidos de aprovação pendentes (assumindo que a tabela pedidos_aprovacao existe)
-        try:
-            cursor.execute("""
-                SELECT pa.id, f.nome, pa.dataFerias, pa.diasFerias, pa.status, pa.data_pedido
-                FROM pedidos_aprovacao pa
-                JOIN funcionarios f ON pa.chapa = f.chapa
-                WHERE pa.status = 'PENDENTE'
-            """)
-            pedidos_rows = cursor.fetchall()
-            pedidos_aprovacao = []
-            for row in pedidos_rows:
-                pedidos_aprovacao.append((
-                    row["id"],
-                    row["nome"],
-                    row["dataFerias"],
-                    row["diasFerias"],
-                    row["status"],
-                    row["data_pedido"]
-                ))
-        except Exception as e:
-            print("Erro ao buscar pedidos de aprovação:", e)
-            pedidos_aprovacao = []
+        total_agendamentos = sum(contagens.values())
 
+        # Pedidos de aprovação pendentes
+        pedidos_aprovacao = DashboardManager._pedidos_pendentes(cursor)
         cursor.close()
         conn.close()
 
@@ -118,76 +83,194 @@ class DashboardManager:
             "pedidos_aprovacao": pedidos_aprovacao
         }
 
+    @staticmethod
+    def get_dashboard_delta(versao):
+        """
+        Células do resumo alteradas depois da versão dos dados 'versao'
+        (resumo_ferias.ler_desde), com o total de agendamentos e os pedidos
+        pendentes, para o dashboard atualizar o que já tem. Células zeradas
+        (total 0) devem ser removidas; com versao 0, vêm todas as células.
+        """
+        conn = EmployeeDB.get_connection()
+        cursor = conn.cursor()
+        celulas = [{
+            "mes": row["mes"],
+            "areaId": row["area_id"],
+            "area": row["area"],
+            "total": row["total"],
+            "detalhes": row["detalhes"],
+        } for row in resumo_ferias.ler_desde(cursor, versao)]
+        total_agendamentos = resumo_ferias.total(cursor)
+        pedidos_aprovacao = DashboardManager._pedidos_pendentes(cursor)
+        cursor.close()
+        conn.close()
+        return {
+            "celulas": celulas,
+            "total_agendamentos": total_agendamentos,
+            "pedidos_aprovacao": pedidos_aprovacao
+        }
+
+    @staticmethod
+    def get_resumo_pagina():
+        """
+        Total de agendamentos e pedidos pendentes exibidos na página do
+        dashboard (o gráfico é carregado depois, por /dashboard_data).
+        """
+        conn = EmployeeDB.get_connection()
+        cursor = conn.cursor()
+        total_agendamentos = resumo_ferias.total(cursor)
+        pedidos_aprovacao = DashboardManager._pedidos_pendentes(cursor)
+        cursor.close()
+        conn.close()
+        return {
+            "total_agendamentos": total_agendamentos,
+            "pedidos_aprovacao": pedidos_aprovacao
+        }
+
+    @staticmethod
+    def _pedidos_pendentes(cursor):
+        """
+        Pedidos de aprovação pendentes: (id, nome, dataFerias, diasFerias, status, data_pedido).
+        """
+        try:
+            cursor.execute("""
+                SELECT pa.id, f.nome, pa.dataFerias, pa.diasFerias, pa.status, pa.data_pedido
+                FROM pedidos_aprovacao pa
+                JOIN funcionarios f ON pa.chapa = f.chapa
+                WHERE pa.status = 'PENDENTE'
+            """)
+            return [(
+                row["id"],
+                row["nome"],
+                row["dataFerias"],
+                row["diasFerias"],
+                row["status"],
+                row["data_pedido"]
+            ) for row in cursor.fetchall()]
+        except Exception as e:
+            print("Erro ao buscar pedidos de aprovação:", e)
+            return []
+
     @staticmethod
     def aprovar_pedido(pedido_id):
         """
-        Aprova um pedido de férias:
-          1) Busca o registro na tabela pedidos_aprovacao (obtem chapa, dataFerias e diasFerias).
-          2) Busca o funcionário pela chapa e insere o registro em ferias_agendadas.
-          3) Atualiza o status do pedido para 'APROVADO'.
+        Aprova um pedido de férias (processar_pedidos com um único id): só
+        pedidos PENDENTE, de funcionário sem férias agendadas e com período
+        válido. Retorna o resultado (APROVADO, NAO_ENCONTRADO, JA_PROCESSADO,
+        FUNCIONARIO_NAO_ENCONTRADO, DADOS_INVALIDOS ou JA_AGENDADO), ou None
+        em caso de erro.
+        """
+        resultados = DashboardManager.processar_pedidos([pedido_id], "aprovar")
+        return resultados[pedido_id] if resultados is not None else None
+
+    @staticmethod
+    def rejeitar_pedido(pedido_id):
+        """
+        Rejeita um pedido, atualizando o status para 'REJEITADO'.
         """
         try:
             conn = EmployeeDB.get_connection()
             cursor = conn.cursor()
-
-            # 1) Obter dados do pedido
-            cursor.execute("""
-                SELECT chapa, dataFerias, diasFerias
-                FROM pedidos_aprovacao
-                WHERE id = ?
-            """, (pedido_id,))
-            pedido = cursor.fetchone()
-            if not pedido:
-                cursor.close()
-                conn.close()
-                return False
-
-            chapa = pedido["chapa"]
-            dataFerias = pedido["dataFerias"]
-            diasFerias = pedido["diasFerias"]
-
-            # 2) Buscar o funcionário pelo número de chapa
-            cursor.execute("SELECT id FROM funcionarios WHERE chapa = ?", (chapa,))
-            func = cursor.fetchone()
-            if not func:
-                cursor.close()
-                conn.close()
-                return False
-
-            funcionario_id = func["id"]
-
-            # Inserir registro em ferias_agendadas
-            cursor.execute("""
-                INSERT INTO ferias_agendadas (funcionario_id, data_ferias, dias_ferias)
-                VALUES (?, ?, ?)
-            """, (funcionario_id, dataFerias, diasFerias))
-
-            # 3) Atualizar o status do pedido para 'APROVADO'
-            cursor.execute("UPDATE pedidos_aprovacao SET status = 'APROVADO' WHERE id = ?", (pedido_id,))
+            cursor.execute("UPDATE pedidos_aprovacao SET status = 'REJEITADO' WHERE id = ?", (pedido_id,))
             conn.commit()
             cursor.close()
             conn.close()
             return True
         except Exception as e:
-            print("Erro ao aprovar pedido:", e)
+            print("Erro ao rejeitar pedido:", e)
             return False
 
     @staticmethod
-    def rejeitar_pedido(pedido_id):
+    def _periodo_valido(data_ferias, dias_ferias):
         """
-        Rejeita um pedido, atualizando o status para 'REJEITADO'.
+        True se o período do pedido é válido (agendamentos.validar_periodo).
+        """
+        try:
+            agendamentos.validar_periodo(data_ferias, dias_ferias)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def processar_pedidos(pedido_ids, acao):
         """
+        Aprova (acao='aprovar') ou rejeita (acao='rejeitar') vários pedidos em
+        uma única transação:
+          1) Busca os pedidos e resolve os funcionários das chapas com uma
+             única consulta (pedidos_aprovacao LEFT JOIN funcionarios).
+          2) Na aprovação, insere os agendamentos com executemany
+             (agendamentos.inserir_varios).
+          3) Atualiza o status dos pedidos processados com executemany.
+        Só pedidos PENDENTE são processados. Retorna {pedido_id: resultado},
+        com resultado em APROVADO, REJEITADO, NAO_ENCONTRADO, JA_PROCESSADO,
+        FUNCIONARIO_NAO_ENCONTRADO, DADOS_INVALIDOS (data ou dias inválidos) ou
+        JA_AGENDADO (o funcionário já tem férias agendadas, ou outro pedido
+        dele foi aprovado antes no mesmo lote). Nesses dois últimos casos o
+        pedido continua PENDENTE e os demais são gravados. Em caso de erro
+        nada é gravado e retorna None.
+        """
+        conn = None
         try:
             conn = EmployeeDB.get_connection()
             cursor = conn.cursor()
-            cursor.execute("UPDATE pedidos_aprovacao SET status = 'REJEITADO' WHERE id = ?", (pedido_id,))
+            # IMMEDIATE: outra requisição não altera os pedidos entre a leitura e a escrita
+            conn.execute("BEGIN IMMEDIATE")
+
+            # 1) Pedidos e funcionários em uma única consulta
+            cursor.execute("""
+                SELECT pa.id, pa.status, pa.dataFerias, pa.diasFerias,
+                       f.id AS funcionario_id, f.area_id,
+                       EXISTS (SELECT 1 FROM ferias_agendadas fa WHERE fa.funcionario_id = f.id) AS agendado
+                FROM pedidos_aprovacao pa
+                LEFT JOIN funcionarios f ON f.chapa = pa.chapa
+                WHERE pa.id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(pedido_ids),))
+            pedidos = {row["id"]: row for row in cursor.fetchall()}
+
+            resultados = {}
+            novos = []
+            aprovados = set()  # funcionários aprovados neste lote
+            for pedido_id in pedido_ids:
+                pedido = pedidos.get(pedido_id)
+                if pedido is None:
+                    resultados[pedido_id] = "NAO_ENCONTRADO"
+                elif pedido["status"] != "PENDENTE":
+                    resultados[pedido_id] = "JA_PROCESSADO"
+                elif acao == "rejeitar":
+                    resultados[pedido_id] = "REJEITADO"
+                elif pedido["funcionario_id"] is None:
+                    resultados[pedido_id] = "FUNCIONARIO_NAO_ENCONTRADO"
+                elif not DashboardManager._periodo_valido(pedido["dataFerias"], pedido["diasFerias"]):
+                    # Pedido antigo, gravado antes de /solicitar_aprovacao validar: fica fora do lote
+                    resultados[pedido_id] = "DADOS_INVALIDOS"
+                elif pedido["agendado"] or pedido["funcionario_id"] in aprovados:
+                    # Um agendamento por funcionário: o pedido continua PENDENTE
+                    resultados[pedido_id] = "JA_AGENDADO"
+                else:
+                    aprovados.add(pedido["funcionario_id"])
+                    resultados[pedido_id] = "APROVADO"
+                    novos.append((pedido["funcionario_id"], pedido["area_id"],
+                                  pedido["dataFerias"], pedido["diasFerias"]))
+
+            # 2) Agendamentos dos aprovados (aprovação: conflitos são aceitos)
+            if novos:
+                agendamentos.inserir_varios(cursor, novos)
+
+            # 3) Status dos pedidos processados
+            cursor.executemany(
+                "UPDATE pedidos_aprovacao SET status = ? WHERE id = ?",
+                [(status, pedido_id) for pedido_id, status in resultados.items()
+                 if status in ("APROVADO", "REJEITADO")],
+            )
             conn.commit()
             cursor.close()
             conn.close()
-            return True
+            return resultados
         except Exception as e:
-            print("Erro ao rejeitar pedido:", e)
-            return False
+            print("Erro ao processar pedidos:", e)
+            if conn is not None:
+                conn.rollback()
+            return None
 
     @staticmethod
     def excluir_agendamentos():
@@ -195,6 +278,7 @@ class DashboardManager:
             conn = EmployeeDB.get_connection()
             cursor = conn.cursor()
             cursor.execute("DELETE FROM ferias_agendadas")
+            resumo_ferias.limpar(cursor)
             conn.commit()
             cursor.close()
             conn.close()
@@ -2,10 +2,10 @@
 Módulo: database_connection.py
 ------------------------------
 Gerencia a conexão com o banco de dados SQLite.
-Cria a tabela de usuários se não existir (init_db).
+Cria as tabelas de usuários e de tarefas em segundo plano se não existirem (init_db).
 """
 
-import sqlite3
+from modules.connection_pool import get_request_connection
 
 class DatabaseConnection:
     DB_NAME = "app.db"  # Nome do arquivo do banco de dados
@@ -15,14 +15,13 @@ class DatabaseConnection:
         """
         Retorna uma conexão ativa com o banco de dados SQLite.
         row_factory = sqlite3.Row para acessar colunas por nome.
+        Dentro de uma requisição, a conexão vem do pool e é reutilizada.
         """
-        conn = sqlite3.connect(DatabaseConnection.DB_NAME)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return get_request_connection(DatabaseConnection.DB_NAME)
 
 def init_db():
     """
-    Cria a tabela 'usuarios' se ela não existir.
+    Cria as tabelas 'usuarios' e 'jobs' se elas não existirem.
     Pode ser estendido para criar outras tabelas.
     """
     conn = DatabaseConnection.get_connection()
@@ -35,6 +34,23 @@ def init_db():
             criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Tarefas em segundo plano (modules/jobs.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            usuario TEXT NOT NULL,
+            parametros TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'PENDENTE',
+            progresso REAL NOT NULL DEFAULT 0,
+            mensagem TEXT,
+            resultado TEXT,
+            processo TEXT,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
     conn.commit()
     cursor.close()
     conn.close()
@@ -0,0 +1,130 @@
+"""
+Módulo: diretorio_funcionarios.py
+---------------------------------
+Diretório em memória dos funcionários de cada banco (tenant):
+
+    chapa -> Funcionario(id, nome, area_id, area)
+
+usado pelas rotas que resolvem uma chapa a cada requisição (buscar,
+verificar, agendar, cancelar, alterar, aprovar pedido), que passam a fazer
+uma consulta a um dict em vez de uma consulta ao banco.
+
+  - O diretório de um banco é carregado na primeira vez que é usado, com uma
+    única consulta.
+  - Os diretórios ficam em um LRU por banco (DIRETORIO_MAX_TENANTS, padrão 16).
+  - Funcionários e áreas só mudam pela importação de planilha, que chama
+    recarregar() após o commit: o diretório novo é montado por inteiro e só
+    então substitui o anterior (os leitores veem o antigo ou o novo, nunca um
+    parcial).
+  - Com vários processos, uma importação feita em outro processo é detectada
+    pela coluna versao_funcionarios de versao_dados (incrementada pelos
+    triggers de funcionarios e areas), conferida no máximo a cada
+    DIRETORIO_TTL segundos (padrão 5). Uma chapa ausente é sempre conferida
+    no banco antes de ser dada como inexistente.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from modules.employee_db import caminho_banco, get_user_connection
+
+Funcionario = namedtuple("Funcionario", "id nome area_id area")
+
+MAX_TENANTS = int(os.environ.get("DIRETORIO_MAX_TENANTS", "16"))
+TTL = float(os.environ.get("DIRETORIO_TTL", "5"))
+
+
+class _Diretorio:
+    __slots__ = ("funcionarios", "versao", "verificado_em")
+
+    def __init__(self, funcionarios, versao):
+        self.funcionarios = funcionarios
+        self.versao = versao
+        self.verificado_em = time.monotonic()
+
+
+_diretorios = OrderedDict()
+_lock = threading.Lock()
+
+
+def _versao(cursor):
+    cursor.execute("SELECT versao_funcionarios FROM versao_dados WHERE id = 1")
+    return cursor.fetchone()[0]
+
+
+def _carregar(conn):
+    """
+    Monta o diretório completo do banco da conexão.
+    """
+    cursor = conn.cursor()
+    # A versão é lida antes: uma importação concorrente só pode torná-la mais antiga
+    versao = _versao(cursor)
+    cursor.execute("""
+        SELECT f.chapa, f.id, f.nome, f.area_id, a.nome
+        FROM funcionarios f
+        LEFT JOIN areas a ON f.area_id = a.id
+    """)
+    funcionarios = {row[0]: Funcionario(row[1], row[2], row[3], row[4]) for row in cursor.fetchall()}
+    cursor.close()
+    return _Diretorio(funcionarios, versao)
+
+
+def _guardar(db_path, diretorio):
+    with _lock:
+        _diretorios[db_path] = diretorio
+        _diretorios.move_to_end(db_path)
+        while len(_diretorios) > MAX_TENANTS:
+            _diretorios.popitem(last=False)
+
+
+def buscar(chapa, db_path=None):
+    """
+    Retorna o Funcionario da chapa no banco do usuário (ou em 'db_path'), ou None.
+    """
+    db_path = caminho_banco(db_path)
+    with _lock:
+        diretorio = _diretorios.get(db_path)
+        if diretorio is not None:
+            _diretorios.move_to_end(db_path)
+
+    if diretorio is not None and time.monotonic() - diretorio.verificado_em <= TTL:
+        funcionario = diretorio.funcionarios.get(chapa)
+        if funcionario is not None:
+            return funcionario
+
+    conn = get_user_connection(db_path)
+    try:
+        if diretorio is not None:
+            cursor = conn.cursor()
+            versao = _versao(cursor)
+            cursor.close()
+            if versao == diretorio.versao:
+                diretorio.verificado_em = time.monotonic()
+                # Ausente no diretório atualizado: a chapa não existe
+                return diretorio.funcionarios.get(chapa)
+        diretorio = _carregar(conn)
+    finally:
+        conn.close()
+    _guardar(db_path, diretorio)
+    return diretorio.funcionarios.get(chapa)
+
+
+def recarregar(db_path, conn):
+    """
+    Recarrega o diretório de 'db_path' usando a conexão informada (chamada
+    após o commit de uma importação) e o substitui de uma vez.
+    """
+    _guardar(caminho_banco(db_path), _carregar(conn))
+
+
+def invalidar(db_path=None):
+    """
+    Descarta o diretório de 'db_path' (ou todos, se None).
+    """
+    with _lock:
+        if db_path is None:
+            _diretorios.clear()
+        else:
+            _diretorios.pop(db_path, None)
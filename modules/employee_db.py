@@ -1,62 +1,50 @@
 # modules/employee_db.py
-import sqlite3
 from flask import session
+from modules.connection_pool import get_request_connection
+from modules import consolidado, migrations
 
-def get_user_connection():
+def caminho_banco(db_path=None):
     """
-    Retorna uma conexão com o banco de dados específico do usuário,
-    cujo caminho está armazenado em session['employee_db'].
+    Retorna db_path ou, se não informado, o banco do usuário da sessão.
     """
-    db_path = session.get('employee_db')
+    db_path = db_path or session.get('employee_db')
     if not db_path:
         raise RuntimeError("Banco de dados do usuário não definido na sessão.")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_path
+
+def get_user_connection(db_path=None):
+    """
+    Retorna a conexão da requisição com o banco de dados específico do usuário,
+    cujo caminho está armazenado em session['employee_db'] (ou é informado em
+    db_path, para uso fora de requisições, ex.: tarefas em segundo plano).
+    A conexão vem do pool (modules/connection_pool.py) e é compartilhada
+    por todas as consultas da mesma requisição. Na primeira conexão do processo
+    a um banco, as migrações pendentes são aplicadas (modules/migrations.py).
+    No modo consolidado, db_path identifica o tenant no banco único
+    (modules/consolidado.py), com as mesmas tabelas visíveis.
+    """
+    db_path = caminho_banco(db_path)
+    if consolidado.ATIVO:
+        return consolidado.conectar(db_path)
+    migrations.garantir(db_path)
+    return get_request_connection(db_path)
+
+def garantir_banco(db_path):
+    """
+    Prepara o banco do usuário no login: cria/migra o arquivo ou, no modo
+    consolidado, cadastra o tenant.
+    """
+    if consolidado.ATIVO:
+        consolidado.conectar(db_path)
+    else:
+        migrations.garantir(db_path)
 
 def create_user_db(db_path):
     """
     Cria (ou atualiza) as tabelas necessárias no banco de dados indicado por db_path.
+    O esquema é definido em modules/migrations.py.
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS areas (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL
-    )
-    ''')
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS funcionarios (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        nome TEXT NOT NULL,
-        chapa TEXT NOT NULL,
-        area_id INTEGER,
-        FOREIGN KEY (area_id) REFERENCES areas(id)
-    )
-    ''')
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS ferias_agendadas (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        funcionario_id INTEGER,
-        data_ferias DATE,
-        dias_ferias INTEGER,
-        FOREIGN KEY (funcionario_id) REFERENCES funcionarios(id)
-    )
-    ''')
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS pedidos_aprovacao (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        chapa TEXT NOT NULL,
-        dataFerias DATE NOT NULL,
-        diasFerias INTEGER NOT NULL,
-        status TEXT NOT NULL DEFAULT 'PENDENTE',
-        data_pedido TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    conn.commit()
-    conn.close()
-    print(f"Banco de dados '{db_path}' criado ou atualizado.")
+    migrations.migrar_arquivo(db_path)
 
 class EmployeeDB:
     """
@@ -64,5 +52,5 @@ class EmployeeDB:
     Ela utiliza a função get_user_connection definida acima.
     """
     @staticmethod
-    def get_connection():
-        return get_user_connection()
+    def get_connection(db_path=None):
+        return get_user_connection(db_path)
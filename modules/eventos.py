@@ -0,0 +1,210 @@
+"""
+Módulo: eventos.py
+------------------
+Eventos do dashboard enviados ao navegador por Server-Sent Events (rota
+/eventos), por tenant (session['employee_db']):
+
+  - 'pedido': pedido de aprovação novo, aprovado ou rejeitado;
+  - 'agendamento': férias agendadas, alteradas, canceladas ou excluídas;
+  - 'recarregar': o navegador perdeu eventos e deve buscar tudo de novo.
+
+As rotas publicam (publicar()) depois do commit. Cada evento recebe um id
+crescente por tenant ("<época do processo>-<número>") e fica em um histórico
+curto (EVENTOS_HISTORICO, padrão 256): o navegador que reconecta com
+Last-Event-ID recebe o que perdeu; se o id já saiu do histórico ou é de
+outro processo (ex.: após reiniciar), recebe 'recarregar'.
+
+  - Cada fluxo envia um comentário a cada EVENTOS_HEARTBEAT segundos
+    (padrão 15), para manter a conexão aberta em proxies.
+  - Servida pelo adaptador ASGI (modules/asgi.py), a view só autentica e
+    reserva o fluxo; os eventos são enviados pelo laço de eventos, sem
+    ocupar uma thread do executor. No máximo EVENTOS_MAX_FLUXOS (padrão 200)
+    fluxos desses por processo.
+  - No servidor WSGI cada fluxo ocupa uma thread: no máximo
+    EVENTOS_MAX_FLUXOS_WSGI (padrão 4), e cada um é encerrado depois de
+    EVENTOS_DURACAO_WSGI segundos (padrão 300); o navegador reconecta sozinho.
+  - Acima do limite, a rota responde 503 com Retry-After; o dashboard passa a
+    consultar /dashboard_data?since= periodicamente e tenta /eventos de novo.
+
+Os eventos são do processo: com vários processos, um fluxo só recebe as
+alterações atendidas pelo processo em que está.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+HISTORICO = int(os.environ.get("EVENTOS_HISTORICO", "256"))
+HEARTBEAT = float(os.environ.get("EVENTOS_HEARTBEAT", "15"))
+MAX_FLUXOS = int(os.environ.get("EVENTOS_MAX_FLUXOS", "200"))
+MAX_FLUXOS_WSGI = int(os.environ.get("EVENTOS_MAX_FLUXOS_WSGI", "4"))
+DURACAO_WSGI = float(os.environ.get("EVENTOS_DURACAO_WSGI", "300"))
+
+# Intervalo de reconexão sugerido ao navegador (ms)
+RECONEXAO_MS = 3000
+
+# Distingue os ids deste processo dos de um processo anterior
+EPOCA = format(int(time.time() * 1000), "x")
+
+_lock = threading.Lock()
+_canais = {}  # tenant -> _Canal
+_abertos = {True: 0, False: 0}  # assíncrono? -> fluxos abertos
+
+
+class _Canal:
+    """
+    Histórico e assinantes dos eventos de um tenant.
+    """
+    __slots__ = ("ultimo", "historico", "assinantes")
+
+    def __init__(self):
+        self.ultimo = 0
+        self.historico = deque(maxlen=HISTORICO)  # (número, texto SSE)
+        self.assinantes = set()
+
+
+def _canal(tenant):
+    canal = _canais.get(tenant)
+    if canal is None:
+        canal = _canais[tenant] = _Canal()
+    return canal
+
+
+def _formatar(numero, tipo, dados):
+    return f"id: {EPOCA}-{numero}\nevent: {tipo}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n"
+
+
+def publicar(tenant, tipo, dados):
+    """
+    Publica o evento 'tipo' com 'dados' (serializáveis em JSON) para os
+    fluxos abertos do tenant. Deve ser chamada depois do commit.
+    """
+    with _lock:
+        canal = _canal(tenant)
+        canal.ultimo += 1
+        texto = _formatar(canal.ultimo, tipo, dados)
+        canal.historico.append((canal.ultimo, texto))
+        assinantes = list(canal.assinantes)
+    for entregar in assinantes:
+        entregar(texto)
+
+
+def abrir(tenant, ultimo_id=None, assincrono=False):
+    """
+    Reserva um fluxo de eventos do tenant, retomando depois de 'ultimo_id'
+    (cabeçalho Last-Event-ID), se informado. Retorna None se o limite de
+    fluxos (assíncronos ou WSGI) foi atingido.
+    """
+    limite = MAX_FLUXOS if assincrono else MAX_FLUXOS_WSGI
+    with _lock:
+        if _abertos[assincrono] >= limite:
+            return None
+        _abertos[assincrono] += 1
+    return Fluxo(tenant, ultimo_id, assincrono)
+
+
+def abertos():
+    """
+    Retorna (fluxos assíncronos, fluxos WSGI) abertos no processo.
+    """
+    with _lock:
+        return _abertos[True], _abertos[False]
+
+
+class Fluxo:
+    """
+    Um fluxo SSE reservado por abrir(). Iterado pelo servidor WSGI (for) ou
+    pelo adaptador ASGI (async for); fechar() libera a vaga.
+    """
+
+    def __init__(self, tenant, ultimo_id, assincrono):
+        self.tenant = tenant
+        self.ultimo_id = ultimo_id
+        self.assincrono = assincrono
+        self._entregar = None
+        self._fechado = False
+
+    def _assinar(self, entregar):
+        """
+        Registra 'entregar' e retorna o início do fluxo: os eventos perdidos
+        desde ultimo_id (ou 'recarregar') e o id atual. O histórico é lido
+        sob o mesmo lock da publicação: nenhum evento falta ou se repete.
+        """
+        with _lock:
+            canal = _canal(self.tenant)
+            canal.assinantes.add(entregar)
+            self._entregar = entregar
+            inicio = [f"retry: {RECONEXAO_MS}\n\n"]
+            if self.ultimo_id:
+                epoca, _, numero = self.ultimo_id.partition("-")
+                numero = int(numero) if numero.isdigit() else -1
+                primeiro = canal.historico[0][0] if canal.historico else canal.ultimo + 1
+                if epoca != EPOCA or not primeiro - 1 <= numero <= canal.ultimo:
+                    inicio.append(_formatar(canal.ultimo, "recarregar", {}))
+                else:
+                    inicio.extend(texto for n, texto in canal.historico if n > numero)
+            if len(inicio) == 1:
+                # Sem dados, a linha 'id' só atualiza o Last-Event-ID do navegador
+                inicio.append(f"id: {EPOCA}-{canal.ultimo}\n\n")
+        return "".join(inicio)
+
+    def fechar(self):
+        """
+        Cancela a assinatura e libera a vaga do fluxo (pode ser chamada mais de uma vez).
+        """
+        with _lock:
+            if self._fechado:
+                return
+            self._fechado = True
+            _abertos[self.assincrono] -= 1
+            canal = _canais.get(self.tenant)
+            if canal is not None:
+                canal.assinantes.discard(self._entregar)
+
+    # WSGI: o servidor chama close() ao terminar a resposta ou se o cliente desconecta
+    close = fechar
+
+    def __iter__(self):
+        fila = queue.SimpleQueue()
+        try:
+            yield self._assinar(fila.put).encode("utf-8")
+            fim = time.monotonic() + DURACAO_WSGI
+            while True:
+                restante = fim - time.monotonic()
+                if restante <= 0:
+                    return
+                try:
+                    texto = fila.get(timeout=min(HEARTBEAT, restante))
+                except queue.Empty:
+                    yield b": heartbeat\n\n"
+                    continue
+                yield texto.encode("utf-8")
+        finally:
+            self.fechar()
+
+    async def __aiter__(self):
+        laco = asyncio.get_running_loop()
+        fila = asyncio.Queue()
+
+        def entregar(texto):
+            # Chamada pela thread que publicou
+            try:
+                laco.call_soon_threadsafe(fila.put_nowait, texto)
+            except RuntimeError:
+                pass  # laço já encerrado
+
+        try:
+            yield self._assinar(entregar).encode("utf-8")
+            while True:
+                try:
+                    texto = await asyncio.wait_for(fila.get(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": heartbeat\n\n"
+                    continue
+                yield texto.encode("utf-8")
+        finally:
+            self.fechar()
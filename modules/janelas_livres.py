@@ -0,0 +1,121 @@
+"""
+Módulo: janelas_livres.py
+-------------------------
+Sugestão de datas de início de férias sem conflito (rota /janelas_livres),
+para que o funcionário não precise tentar datas em /agendar_ferias até
+escapar do 409.
+
+Para cada área é montado um vetor de ocupação diária do horizonte de
+planejamento (HORIZONTE dias a partir de hoje): um vetor de diferenças
+recebe +1 no início e -1 no dia seguinte ao retorno de cada agendamento e a
+soma acumulada dá quantas pessoas da área estão de férias em cada dia.
+Um início 's' de 'dias' dias é livre quando todos os dias de [s, s + dias]
+estão desocupados (períodos fechados, como em agendamentos.buscar_conflito),
+o que é verificado para todos os inícios de uma vez com outra soma acumulada
+(dias ocupados em cada janela).
+
+  - JANELAS_HORIZONTE_DIAS (padrão 365): tamanho do horizonte; só são
+    sugeridos períodos que terminam dentro dele.
+  - Os vetores ficam em um LRU por (banco, área) (JANELAS_MAX_AREAS, padrão
+    256), válidos enquanto a versão dos dados do banco (versao_dados) e o dia
+    não mudarem.
+  - Os agendamentos do próprio funcionário são descontados na consulta (como
+    ao alterar), sem invalidar o vetor da área.
+  - Pedidos de aprovação pendentes não ocupam dias (como na verificação de
+    /agendar_ferias).
+
+NumPy é importado junto com este módulo, que as rotas importam sob demanda.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+
+from modules import versao_dados
+
+HORIZONTE = int(os.environ.get("JANELAS_HORIZONTE_DIAS", "365"))
+MAX_AREAS = int(os.environ.get("JANELAS_MAX_AREAS", "256"))
+
+# (banco, área) -> (versão dos dados, primeiro dia, vetor de ocupação)
+_ocupacoes = OrderedDict()
+_lock = threading.Lock()
+
+
+def _diferencas(periodos, hoje):
+    """
+    Vetor de ocupação diária (HORIZONTE posições a partir de 'hoje') dos
+    períodos [(data_ferias, data_retorno), ...] em datas ISO.
+    """
+    diferencas = np.zeros(HORIZONTE + 1, dtype=np.int32)
+    if periodos:
+        datas = np.array(periodos, dtype="datetime64[D]") - np.datetime64(hoje, "D")
+        inicios = np.clip(datas[:, 0].astype(np.int64), 0, HORIZONTE)
+        fins = np.clip(datas[:, 1].astype(np.int64) + 1, 0, HORIZONTE)
+        np.add.at(diferencas, inicios, 1)
+        np.add.at(diferencas, fins, -1)
+    return np.cumsum(diferencas[:HORIZONTE])
+
+
+def _ocupacao_area(cursor, db_path, area_id, hoje):
+    """
+    Vetor de ocupação da área (do cache, se a versão dos dados não mudou).
+    """
+    versao, _ = versao_dados.ler(cursor)
+    chave = (db_path, area_id)
+    with _lock:
+        item = _ocupacoes.get(chave)
+        if item is not None:
+            _ocupacoes.move_to_end(chave)
+    if item is not None and item[0] == versao and item[1] == hoje:
+        return item[2]
+
+    cursor.execute("""
+        SELECT data_ferias, data_retorno FROM ferias_agendadas
+        WHERE area_id = ? AND data_ferias < ? AND data_retorno >= ?
+    """, (area_id, (hoje + timedelta(days=HORIZONTE)).isoformat(), hoje.isoformat()))
+    ocupacao = _diferencas([tuple(row) for row in cursor.fetchall()], hoje)
+    ocupacao.flags.writeable = False
+
+    with _lock:
+        _ocupacoes[chave] = (versao, hoje, ocupacao)
+        _ocupacoes.move_to_end(chave)
+        while len(_ocupacoes) > MAX_AREAS:
+            _ocupacoes.popitem(last=False)
+    return ocupacao
+
+
+def buscar(cursor, db_path, funcionario, dias, quantidade, a_partir=None):
+    """
+    Retorna as 'quantidade' primeiras datas de início (ISO), a partir de
+    'a_partir' (date; padrão: hoje), em que o funcionário pode tirar 'dias'
+    dias de férias sem conflito com outro funcionário da sua área.
+    Lança ValueError se o período pedido não cabe no horizonte (lista vazia
+    significaria "nenhuma janela livre").
+    """
+    hoje = date.today()
+    deslocamento = max((a_partir - hoje).days, 0) if a_partir else 0
+    # ocupados[i] = dias ocupados antes do dia i; a janela [s, s + dias] tem dias + 1 dias
+    tamanho = dias + 1
+    if tamanho > HORIZONTE - deslocamento:
+        raise ValueError(f"O período deve terminar em até {HORIZONTE} dias a partir de hoje.")
+
+    if funcionario.area_id is None:
+        ocupacao = np.zeros(HORIZONTE, dtype=np.int32)
+    else:
+        ocupacao = _ocupacao_area(cursor, db_path, funcionario.area_id, hoje)
+        cursor.execute("""
+            SELECT data_ferias, data_retorno FROM ferias_agendadas
+            WHERE funcionario_id = ? AND area_id = ?
+        """, (funcionario.id, funcionario.area_id))
+        proprios = [tuple(row) for row in cursor.fetchall()]
+        if proprios:
+            ocupacao = ocupacao - _diferencas(proprios, hoje)
+
+    ocupados = np.concatenate(([0], np.cumsum(ocupacao > 0)))
+    livres = ocupados[tamanho:] - ocupados[:-tamanho] == 0
+    inicios = np.flatnonzero(livres[deslocamento:])[:quantidade] + deslocamento
+    return [(hoje + timedelta(days=int(s))).isoformat() for s in inicios]
+
@@ -0,0 +1,264 @@
+"""
+Módulo: jobs.py
+---------------
+Execução em segundo plano de tarefas demoradas (importação de planilhas,
+geração de PDF), para que a requisição que as dispara retorne imediatamente.
+
+  - As tarefas ficam registradas na tabela 'jobs' do app.db (criada em
+    init_db), com status, progresso, mensagem e resultado.
+  - São executadas por um ThreadPoolExecutor limitado (JOBS_WORKERS, padrão 2),
+    dentro de um contexto da aplicação Flask (sem sessão: os parâmetros da
+    tarefa devem trazer tudo o que ela precisa, ex.: o caminho do banco).
+  - Tipos de tarefa são registrados com @registrar("tipo"); a função recebe
+    (parametros, job) e retorna um dict com o resultado. Para resultados
+    binários (PDF), a função grava o arquivo em job.caminho_arquivo(extensão)
+    e o informa em resultado["arquivo"].
+  - Ao iniciar o processo (iniciar), tarefas PENDENTE são reenfileiradas e
+    tarefas EXECUTANDO cujo processo não existe mais são marcadas como FALHOU.
+  - Tarefas encerradas há mais de JOBS_RETENCAO_DIAS dias (padrão 7) são
+    removidas com o seu arquivo de resultado, ao iniciar e depois no máximo
+    uma vez por hora (limpar). Na mesma passada são apagados os arquivos de
+    resultado sem tarefa e os arquivos de entrada (ex.: planilhas enviadas)
+    que nenhuma tarefa pendente ou em execução usa, deixados por tarefas
+    interrompidas.
+
+Status possíveis: PENDENTE, EXECUTANDO, CONCLUIDO, FALHOU.
+"""
+
+import glob
+import json
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.database_connection import DatabaseConnection
+
+RESULTADOS_FOLDER = os.path.join(os.getcwd(), "jobs_resultados")
+RETENCAO_DIAS = float(os.environ.get("JOBS_RETENCAO_DIAS", "7"))
+INTERVALO_LIMPEZA = 3600
+# Arquivos de entrada mais novos que isto podem ser de uma tarefa ainda não submetida
+IDADE_MINIMA_ENTRADA = 3600
+
+# Identifica o processo dono de uma tarefa em execução
+PROCESSO = f"{socket.gethostname()}:{os.getpid()}"
+
+_tipos = {}
+_executor = None
+_app = None
+_pasta_entrada = None
+_ultima_limpeza = 0.0
+
+
+def registrar(tipo):
+    """
+    Decorador que registra a função executora de um tipo de tarefa.
+    """
+    def decorador(funcao):
+        _tipos[tipo] = funcao
+        return funcao
+    return decorador
+
+
+class Job:
+    """
+    Acesso da função executora à sua tarefa (progresso e arquivo de resultado).
+    """
+
+    def __init__(self, job_id):
+        self.id = job_id
+
+    def progresso(self, fracao=None, mensagem=None):
+        """
+        Atualiza o progresso (0 a 1) e/ou a mensagem da tarefa.
+        """
+        conn = DatabaseConnection.get_connection()
+        conn.execute("""
+            UPDATE jobs SET progresso = COALESCE(?, progresso), mensagem = COALESCE(?, mensagem),
+                            atualizado_em = datetime('now')
+            WHERE id = ?
+        """, (fracao, mensagem, self.id))
+        conn.commit()
+        conn.close()
+
+    def caminho_arquivo(self, extensao):
+        """
+        Caminho onde a tarefa deve gravar seu resultado binário.
+        """
+        os.makedirs(RESULTADOS_FOLDER, exist_ok=True)
+        return os.path.join(RESULTADOS_FOLDER, f"{self.id}.{extensao}")
+
+
+def _processo_vivo(processo):
+    """
+    Indica se o processo dono de uma tarefa (host:pid) ainda existe.
+    Processos de outra máquina são considerados vivos.
+    """
+    host, _, pid = (processo or "").rpartition(":")
+    if host != socket.gethostname():
+        return bool(host)
+    if not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remover(caminho):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Erro ao remover o arquivo '{caminho}':", e)
+
+
+def limpar():
+    """
+    Remove as tarefas encerradas há mais de RETENCAO_DIAS dias e os seus
+    resultados, os arquivos de resultado sem tarefa e os arquivos da pasta de
+    entrada (parâmetro 'arquivo' das tarefas) que nenhuma tarefa pendente ou
+    em execução usa.
+    """
+    global _ultima_limpeza
+    _ultima_limpeza = time.monotonic()
+    conn = DatabaseConnection.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        DELETE FROM jobs
+        WHERE status IN ('CONCLUIDO', 'FALHOU') AND atualizado_em < datetime('now', ?)
+    """, (f"-{RETENCAO_DIAS} days",))
+    conn.commit()
+    cursor.execute("SELECT id, status, parametros FROM jobs")
+    tarefas = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    existentes = {row["id"] for row in tarefas}
+    for caminho in glob.glob(os.path.join(RESULTADOS_FOLDER, "*")):
+        if os.path.basename(caminho).split(".", 1)[0] not in existentes:
+            _remover(caminho)
+
+    if _pasta_entrada:
+        em_uso = {
+            os.path.abspath(json.loads(row["parametros"]).get("arquivo") or "")
+            for row in tarefas if row["status"] in ("PENDENTE", "EXECUTANDO")
+        }
+        limite = time.time() - IDADE_MINIMA_ENTRADA
+        for caminho in glob.glob(os.path.join(_pasta_entrada, "*")):
+            try:
+                antigo = os.path.getmtime(caminho) < limite
+            except OSError:
+                continue
+            if antigo and os.path.abspath(caminho) not in em_uso:
+                _remover(caminho)
+
+
+def iniciar(app, max_workers=None, pasta_entrada=None):
+    """
+    Cria o executor, retoma as tarefas interrompidas por uma reinicialização
+    e faz a limpeza (limpar). 'pasta_entrada' é onde as rotas gravam os
+    arquivos que as tarefas recebem em parametros["arquivo"].
+    """
+    global _executor, _app, _pasta_entrada
+    _app = app
+    _pasta_entrada = pasta_entrada
+    if max_workers is None:
+        max_workers = int(os.environ.get("JOBS_WORKERS", "2"))
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    conn = DatabaseConnection.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, processo FROM jobs WHERE status = 'EXECUTANDO'")
+    for row in cursor.fetchall():
+        # Mesmo host:pid que o nosso só pode ser de uma execução anterior (ex.: pid 1 em contêiner)
+        if row["processo"] == PROCESSO or not _processo_vivo(row["processo"]):
+            cursor.execute("""
+                UPDATE jobs SET status = 'FALHOU', mensagem = 'Interrompido pela reinicialização do servidor.',
+                                atualizado_em = datetime('now')
+                WHERE id = ? AND status = 'EXECUTANDO'
+            """, (row["id"],))
+    conn.commit()
+    cursor.execute("SELECT id FROM jobs WHERE status = 'PENDENTE' ORDER BY criado_em")
+    pendentes = [row["id"] for row in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    limpar()
+    for job_id in pendentes:
+        _executor.submit(_executar, job_id)
+
+
+def submeter(tipo, usuario, parametros):
+    """
+    Registra uma nova tarefa e a coloca na fila. Retorna o id da tarefa.
+    """
+    if tipo not in _tipos:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+    job_id = uuid.uuid4().hex
+    conn = DatabaseConnection.get_connection()
+    conn.execute(
+        "INSERT INTO jobs (id, tipo, usuario, parametros) VALUES (?, ?, ?, ?)",
+        (job_id, tipo, usuario, json.dumps(parametros)),
+    )
+    conn.commit()
+    conn.close()
+    _executor.submit(_executar, job_id)
+    if time.monotonic() - _ultima_limpeza > INTERVALO_LIMPEZA:
+        _executor.submit(limpar)
+    return job_id
+
+
+def _executar(job_id):
+    """
+    Executa a tarefa 'job_id' no executor, registrando o resultado ou a falha.
+    """
+    with _app.app_context():
+        conn = DatabaseConnection.get_connection()
+        # Reivindica a tarefa: outro processo pode tê-la reenfileirado também
+        cursor = conn.execute("""
+            UPDATE jobs SET status = 'EXECUTANDO', processo = ?, atualizado_em = datetime('now')
+            WHERE id = ? AND status = 'PENDENTE'
+        """, (PROCESSO, job_id))
+        conn.commit()
+        if cursor.rowcount == 0:
+            return
+        row = conn.execute("SELECT tipo, parametros FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        inicio = time.perf_counter()
+        try:
+            resultado = _tipos[row["tipo"]](json.loads(row["parametros"]), Job(job_id)) or {}
+            resultado.setdefault("tempo_s", round(time.perf_counter() - inicio, 3))
+            status, mensagem = "CONCLUIDO", resultado.get("mensagem", "Concluído.")
+        except Exception as e:
+            _app.logger.exception("Erro na tarefa %s (%s)", job_id, row["tipo"])
+            resultado, status, mensagem = None, "FALHOU", str(e)
+
+        conn.execute("""
+            UPDATE jobs SET status = ?, progresso = CASE WHEN ? = 'CONCLUIDO' THEN 1 ELSE progresso END,
+                            mensagem = ?, resultado = ?, atualizado_em = datetime('now')
+            WHERE id = ?
+        """, (status, status, mensagem, json.dumps(resultado) if resultado is not None else None, job_id))
+        conn.commit()
+        conn.close()
+
+
+def obter(job_id, usuario):
+    """
+    Retorna a tarefa como dict (ou None se não existir ou for de outro usuário).
+    """
+    conn = DatabaseConnection.get_connection()
+    row = conn.execute("""
+        SELECT id, tipo, status, progresso, mensagem, resultado, criado_em, atualizado_em
+        FROM jobs WHERE id = ? AND usuario = ?
+    """, (job_id, usuario)).fetchone()
+    conn.close()
+    if not row:
+        return None
+    job = dict(row)
+    job["resultado"] = json.loads(job["resultado"]) if job["resultado"] else None
+    return job
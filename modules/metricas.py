@@ -0,0 +1,315 @@
+"""
+Módulo: metricas.py
+-------------------
+Métricas da aplicação no formato de texto do Prometheus (rota /metrics):
+
+  - ferias_http_requests_total{endpoint, method, status}: requisições atendidas;
+  - ferias_http_request_duration_seconds{endpoint, method}: latência (histograma);
+  - ferias_http_response_size_bytes{endpoint}: tamanho do corpo da resposta
+    (histograma; respostas em fluxo, como /eventos, não entram);
+  - ferias_http_exceptions_total{endpoint}: exceções não tratadas nas views;
+  - ferias_db_duration_seconds{endpoint} e ferias_db_statements_total{endpoint}:
+    tempo gasto e comandos executados no SQLite durante a requisição, pelas
+    conexões do pool (modules/connection_pool.py);
+  - ferias_pdf_render_duration_seconds: renderização de PDF (rota e tarefas).
+
+O rótulo endpoint é o nome da view Flask, não a URL: o número de séries não
+cresce com ids e chapas. URLs sem rota contam como "nao_encontrado".
+
+As requisições são medidas pelos hooks iniciar_requisicao (before_request),
+finalizar_requisicao (after_request) e excecao_requisicao (teardown_request),
+registrados em app.py. Os valores ficam em memória, por processo.
+
+Com vários processos (ex.: uvicorn --workers, gunicorn), defina METRICAS_DIR:
+  - cada processo grava os seus valores em
+    METRICAS_DIR/metricas-<pid>-<início>.json a cada METRICAS_INTERVALO
+    segundos (padrão 5) e ao sair;
+  - /metrics soma os arquivos de todos os processos, inclusive dos já
+    encerrados, para que os contadores não voltem;
+  - limpe o diretório ao reiniciar a aplicação.
+
+Se METRICAS_TOKEN estiver definido, /metrics exige o cabeçalho
+"Authorization: Bearer <token>".
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, request
+
+DIRETORIO = os.environ.get("METRICAS_DIR") or None
+INTERVALO = float(os.environ.get("METRICAS_INTERVALO", "5"))
+TOKEN = os.environ.get("METRICAS_TOKEN") or None
+
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_TAMANHO = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+BUCKETS_PDF = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# nome -> (tipo, descrição, buckets)
+METRICAS = {
+    "ferias_http_requests_total": ("counter", "Requisições atendidas, por rota, método e status.", None),
+    "ferias_http_request_duration_seconds": ("histogram", "Latência das requisições, em segundos.",
+                                             BUCKETS_DURACAO),
+    "ferias_http_response_size_bytes": ("histogram", "Tamanho do corpo das respostas, em bytes.",
+                                        BUCKETS_TAMANHO),
+    "ferias_http_exceptions_total": ("counter", "Exceções não tratadas nas views.", None),
+    "ferias_db_duration_seconds": ("histogram", "Tempo em comandos SQLite por requisição, em segundos.",
+                                   BUCKETS_DURACAO),
+    "ferias_db_statements_total": ("counter", "Comandos SQLite executados nas requisições.", None),
+    "ferias_pdf_render_duration_seconds": ("histogram", "Renderização de PDF, em segundos.", BUCKETS_PDF),
+}
+
+_lock = threading.Lock()
+# (nome, rótulos) -> valor (contador) ou [contagem por bucket..., acima do último, soma] (histograma)
+_valores = {}
+_alterado = False
+_pid = os.getpid()
+_arquivo = None
+_gravacao = None  # thread que grava o arquivo do processo
+
+# Tempo e comandos SQLite da requisição em andamento na thread
+_local = threading.local()
+
+
+def _processo():
+    """
+    Depois de um fork (ex.: gunicorn --preload), o processo filho começa do zero.
+    Deve ser chamada com _lock.
+    """
+    global _pid, _arquivo, _gravacao, _alterado
+    if os.getpid() != _pid:
+        _pid = os.getpid()
+        _valores.clear()
+        _arquivo = _gravacao = None
+        _alterado = False
+    if DIRETORIO and _gravacao is None:
+        _arquivo = os.path.join(DIRETORIO, f"metricas-{_pid}-{int(time.time() * 1000):x}.json")
+        _gravacao = threading.Thread(target=_gravar_periodicamente, name="metricas", daemon=True)
+        _gravacao.start()
+
+
+def _incrementar(nome, rotulos, valor=1):
+    chave = (nome, rotulos)
+    _valores[chave] = _valores.get(chave, 0) + valor
+
+
+def _observar(nome, rotulos, valor):
+    buckets = METRICAS[nome][2]
+    chave = (nome, rotulos)
+    contagens = _valores.get(chave)
+    if contagens is None:
+        contagens = _valores[chave] = [0] * (len(buckets) + 2)
+    i = 0
+    while i < len(buckets) and valor > buckets[i]:
+        i += 1
+    contagens[i] += 1
+    contagens[-1] += valor
+
+
+def incrementar(nome, rotulos=(), valor=1):
+    """
+    Soma 'valor' ao contador 'nome'; rotulos é uma tupla de pares (nome, valor).
+    """
+    global _alterado
+    with _lock:
+        _processo()
+        _incrementar(nome, rotulos, valor)
+        _alterado = True
+
+
+def observar(nome, valor, rotulos=()):
+    """
+    Registra 'valor' no histograma 'nome'.
+    """
+    global _alterado
+    with _lock:
+        _processo()
+        _observar(nome, rotulos, valor)
+        _alterado = True
+
+
+@contextmanager
+def cronometro(nome, rotulos=()):
+    """
+    Registra no histograma 'nome' a duração do bloco 'with'.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(nome, time.perf_counter() - inicio, rotulos)
+
+
+def tempo_db(segundos, comandos=1):
+    """
+    Acrescenta 'segundos' de SQLite (e 'comandos' executados) à requisição em
+    andamento na thread. Chamada pelas conexões do pool; fora de requisições,
+    é ignorada.
+    """
+    try:
+        _local.segundos += segundos
+        _local.comandos += comandos
+    except AttributeError:
+        pass
+
+
+def iniciar_requisicao():
+    """
+    before_request: marca o início da requisição e zera o tempo de SQLite.
+    """
+    g.metricas_inicio = time.perf_counter()
+    _local.segundos = 0.0
+    _local.comandos = 0
+
+
+def finalizar_requisicao(response):
+    """
+    after_request: registra contagem, latência, tamanho e tempo de SQLite.
+    """
+    inicio = g.pop("metricas_inicio", None)
+    if inicio is None:
+        return response
+    duracao = time.perf_counter() - inicio
+    endpoint = request.endpoint or "nao_encontrado"
+    rotulo = (("endpoint", endpoint),)
+    tamanho = response.content_length
+    if tamanho is None and not response.is_streamed:
+        tamanho = response.calculate_content_length()
+    global _alterado
+    with _lock:
+        _processo()
+        _incrementar("ferias_http_requests_total",
+                     rotulo + (("method", request.method), ("status", str(response.status_code))))
+        _observar("ferias_http_request_duration_seconds", rotulo + (("method", request.method),), duracao)
+        if tamanho is not None:
+            _observar("ferias_http_response_size_bytes", rotulo, tamanho)
+        _observar("ferias_db_duration_seconds", rotulo, _local.segundos)
+        if _local.comandos:
+            _incrementar("ferias_db_statements_total", rotulo, _local.comandos)
+        _alterado = True
+    return response
+
+
+def excecao_requisicao(excecao):
+    """
+    teardown_request: conta as exceções não tratadas.
+    """
+    if excecao is not None:
+        incrementar("ferias_http_exceptions_total", (("endpoint", request.endpoint or "nao_encontrado"),))
+
+
+def _serializar():
+    return [[nome, [list(par) for par in rotulos], valor] for (nome, rotulos), valor in _valores.items()]
+
+
+def gravar():
+    """
+    Grava os valores do processo em METRICAS_DIR (troca atômica do arquivo).
+    """
+    global _alterado
+    with _lock:
+        if not DIRETORIO or _arquivo is None or os.getpid() != _pid:
+            return
+        conteudo = json.dumps({"pid": _pid, "valores": _serializar()})
+        _alterado = False
+        arquivo = _arquivo
+    temporario = f"{arquivo}.tmp"
+    try:
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        os.replace(temporario, arquivo)
+    except OSError as e:
+        print("Erro ao gravar métricas:", e)
+
+
+def _gravar_periodicamente():
+    while True:
+        time.sleep(INTERVALO)
+        if _alterado:
+            gravar()
+
+
+atexit.register(gravar)
+
+
+def _somar(total, valores):
+    for nome, rotulos, valor in valores:
+        if nome not in METRICAS:
+            continue
+        chave = (nome, tuple(tuple(par) for par in rotulos))
+        atual = total.get(chave)
+        if atual is None:
+            total[chave] = list(valor) if isinstance(valor, list) else valor
+        elif isinstance(valor, list):
+            if len(valor) == len(atual):  # buckets iguais
+                total[chave] = [a + b for a, b in zip(atual, valor)]
+        else:
+            total[chave] = atual + valor
+
+
+def _agregar():
+    """
+    Valores do processo somados aos dos outros processos (arquivos de METRICAS_DIR).
+    """
+    with _lock:
+        _processo()
+        valores = _serializar()
+        arquivo = _arquivo
+    total = {}
+    _somar(total, valores)
+    if DIRETORIO:
+        for caminho in glob.glob(os.path.join(DIRETORIO, "metricas-*.json")):
+            if caminho == arquivo:
+                continue
+            try:
+                with open(caminho, encoding="utf-8") as f:
+                    _somar(total, json.load(f)["valores"])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Erro ao ler métricas de '{caminho}':", e)
+    return total
+
+
+def _rotulos(pares):
+    if not pares:
+        return ""
+    texto = ",".join(
+        '{}="{}"'.format(n, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for n, v in pares
+    )
+    return "{" + texto + "}"
+
+
+def _numero(valor):
+    if isinstance(valor, float) and not valor.is_integer():
+        return repr(valor)
+    return str(int(valor))
+
+
+def exportar():
+    """
+    Texto no formato de exposição do Prometheus (text/plain; version=0.0.4).
+    """
+    total = _agregar()
+    linhas = []
+    for nome, (tipo, descricao, buckets) in METRICAS.items():
+        linhas.append(f"# HELP {nome} {descricao}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for (n, rotulos), valor in sorted(total.items()):
+            if n != nome:
+                continue
+            if tipo == "counter":
+                linhas.append(f"{nome}{_rotulos(rotulos)} {_numero(valor)}")
+                continue
+            acumulado = 0
+            for limite, contagem in zip(buckets + ("+Inf",), valor[:-1]):
+                acumulado += contagem
+                le = limite if limite == "+Inf" else _numero(float(limite))
+                linhas.append(f"{nome}_bucket{_rotulos(rotulos + (('le', le),))} {acumulado}")
+            linhas.append(f"{nome}_sum{_rotulos(rotulos)} {_numero(valor[-1])}")
+            linhas.append(f"{nome}_count{_rotulos(rotulos)} {acumulado}")
+    return "\n".join(linhas) + "\n"
@@ -0,0 +1,405 @@
+"""
+Módulo: migrations.py
+---------------------
+Definição única do esquema dos bancos de funcionários (gestor_*_funcionarios.db
+e setores_funcionarios.db) e motor de migrações versionadas.
+
+A versão do esquema de cada banco fica em PRAGMA user_version. Cada migração
+de MIGRACOES é aplicada uma única vez, em ordem, dentro de sua própria
+transação (BEGIN IMMEDIATE), e a versão é gravada na mesma transação.
+
+As migrações contêm o próprio SQL, congelado no esquema da sua versão: não
+chamam os módulos da aplicação, que acompanham o esquema atual e mudariam o
+resultado de migrações já publicadas.
+
+Os bancos são migrados:
+  - de forma preguiçosa, na primeira conexão do processo (garantir(), chamada
+    por employee_db.get_user_connection e no login);
+  - em lote, pela linha de comando:
+
+        python -m modules.migrations [banco.db ...]
+
+    Sem argumentos, migra todos os gestor_*_funcionarios.db e o
+    setores_funcionarios.db do diretório atual.
+"""
+
+import glob
+import sqlite3
+import sys
+import threading
+
+
+def _sincronizar_areas(cursor):
+    """
+    Copia funcionarios.area_id para ferias_agendadas.area_id (migrações 2 e 4).
+    """
+    cursor.execute('''
+    UPDATE ferias_agendadas
+    SET area_id = (SELECT f.area_id FROM funcionarios f WHERE f.id = ferias_agendadas.funcionario_id)
+    WHERE area_id IS NOT (SELECT f.area_id FROM funcionarios f WHERE f.id = ferias_agendadas.funcionario_id)
+    ''')
+
+
+def _v1_esquema_inicial(cursor):
+    """
+    Tabelas originais: areas, funcionarios, ferias_agendadas e pedidos_aprovacao.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS areas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS funcionarios (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome TEXT NOT NULL,
+        chapa TEXT NOT NULL,
+        area_id INTEGER,
+        FOREIGN KEY (area_id) REFERENCES areas(id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ferias_agendadas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        funcionario_id INTEGER,
+        data_ferias DATE,
+        dias_ferias INTEGER,
+        FOREIGN KEY (funcionario_id) REFERENCES funcionarios(id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS pedidos_aprovacao (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        chapa TEXT NOT NULL,
+        dataFerias DATE NOT NULL,
+        diasFerias INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'PENDENTE',
+        data_pedido TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+
+def _v2_periodo_agendamentos(cursor):
+    """
+    data_retorno e area_id em ferias_agendadas + índices de conflito
+    (ver modules/agendamentos.py).
+    """
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(ferias_agendadas)")}
+    if "data_retorno" not in colunas:
+        cursor.execute("ALTER TABLE ferias_agendadas ADD COLUMN data_retorno DATE")
+    if "area_id" not in colunas:
+        cursor.execute("ALTER TABLE ferias_agendadas ADD COLUMN area_id INTEGER")
+    cursor.execute('''
+    UPDATE ferias_agendadas
+    SET data_retorno = date(data_ferias, '+' || dias_ferias || ' days')
+    WHERE data_retorno IS NULL
+    ''')
+    _sincronizar_areas(cursor)
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_ferias_area_periodo
+        ON ferias_agendadas (area_id, data_ferias, data_retorno)
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_ferias_area_dias
+        ON ferias_agendadas (area_id, dias_ferias)
+    ''')
+
+
+def _v3_resumo_mensal(cursor):
+    """
+    Tabela materializada do dashboard (ver modules/resumo_ferias.py); é
+    populada pela migração 4, depois de unificar as chapas duplicadas.
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resumo_ferias_mensal (
+        mes TEXT NOT NULL,
+        area_id INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        detalhes TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (mes, area_id)
+    )
+    ''')
+
+
+def _v4_indices_consultas(cursor):
+    """
+    Índices das consultas das rotas:
+      - funcionarios.chapa (UNIQUE): buscada em praticamente toda requisição;
+        chapas duplicadas são unificadas no registro mais antigo, que fica
+        com o agendamento mais recente dos duplicados (os demais são removidos);
+      - ferias_agendadas.funcionario_id: verificar/cancelar/alterar agendamento;
+      - pedidos_aprovacao.status: pedidos pendentes do dashboard;
+      - areas.nome: importação da planilha.
+    Em seguida o resumo mensal (migração 3) é calculado a partir dos
+    agendamentos que restaram.
+    """
+    cursor.execute('''
+    SELECT chapa, MIN(id) FROM funcionarios GROUP BY chapa HAVING COUNT(*) > 1
+    ''')
+    for chapa, manter_id in cursor.fetchall():
+        # O agendamento é único por funcionário: fica o mais recente dos duplicados
+        cursor.execute('''
+        SELECT fa.id, fa.data_ferias, fa.dias_ferias FROM ferias_agendadas fa
+        WHERE fa.funcionario_id IN (SELECT id FROM funcionarios WHERE chapa = ?)
+        ORDER BY fa.id DESC
+        ''', (chapa,))
+        descartados = cursor.fetchall()[1:]
+        for agendamento_id, data_ferias, dias_ferias in descartados:
+            print(f"Chapa {chapa} duplicada: agendamento {agendamento_id} "
+                  f"({data_ferias}, {dias_ferias} dias) removido ao unificar os funcionários.")
+        cursor.executemany("DELETE FROM ferias_agendadas WHERE id = ?", [(d[0],) for d in descartados])
+        cursor.execute('''
+        UPDATE ferias_agendadas SET funcionario_id = ?
+        WHERE funcionario_id IN (SELECT id FROM funcionarios WHERE chapa = ? AND id <> ?)
+        ''', (manter_id, chapa, manter_id))
+        cursor.execute("DELETE FROM funcionarios WHERE chapa = ? AND id <> ?", (chapa, manter_id))
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_funcionarios_chapa ON funcionarios (chapa)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ferias_funcionario ON ferias_agendadas (funcionario_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_status ON pedidos_aprovacao (status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_areas_nome ON areas (nome)")
+    _sincronizar_areas(cursor)
+
+    cursor.execute('''
+    SELECT fa.data_ferias, fa.area_id, f.nome, fa.dias_ferias
+    FROM ferias_agendadas fa
+    JOIN funcionarios f ON fa.funcionario_id = f.id
+    WHERE fa.area_id IS NOT NULL
+    ORDER BY fa.id
+    ''')
+    celulas = {}
+    for data_ferias, area_id, nome, dias_ferias in cursor.fetchall():
+        celulas.setdefault((str(data_ferias)[:7], area_id), []).append(f"{nome} ({dias_ferias} dias)")
+    cursor.execute("DELETE FROM resumo_ferias_mensal")
+    cursor.executemany('''
+    INSERT INTO resumo_ferias_mensal (mes, area_id, total, detalhes) VALUES (?, ?, ?, ?)
+    ''', [(mes, area_id, len(d), "\n".join(d)) for (mes, area_id), d in celulas.items()])
+
+
+def _v5_versao_dados(cursor):
+    """
+    Versão dos dados mantida por triggers (ver modules/versao_dados.py).
+    """
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS versao_dados (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        versao INTEGER NOT NULL,
+        atualizado_em TEXT NOT NULL
+    )
+    ''')
+    cursor.execute('''
+    INSERT OR IGNORE INTO versao_dados (id, versao, atualizado_em)
+    VALUES (1, 1, datetime('now'))
+    ''')
+    for tabela in ("areas", "funcionarios", "ferias_agendadas", "pedidos_aprovacao"):
+        for operacao in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_versao_{tabela}_{operacao.lower()}
+            AFTER {operacao} ON {tabela}
+            BEGIN
+                UPDATE versao_dados SET versao = versao + 1, atualizado_em = datetime('now')
+                WHERE id = 1;
+            END
+            ''')
+
+
+def _v6_indice_relatorio(cursor):
+    """
+    Índice da consulta do relatório (ver modules/report_service.py).
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ferias_retorno ON ferias_agendadas (data_retorno)")
+
+
+def _v7_indice_listagem(cursor):
+    """
+    Índice da paginação de /listar_agendamentos por (data_ferias, id).
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ferias_data ON ferias_agendadas (data_ferias)")
+
+
+def _v8_indice_pedidos_chapa(cursor):
+    """
+    Índice dos pedidos pendentes de um funcionário (/funcionario/<chapa>/contexto).
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_chapa ON pedidos_aprovacao (chapa, status)")
+
+
+def _v9_versao_funcionarios(cursor):
+    """
+    Versão própria de funcionários/áreas (ver modules/diretorio_funcionarios.py):
+    os triggers de funcionarios e areas passam a incrementá-la junto com a geral.
+    """
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(versao_dados)")}
+    if "versao_funcionarios" not in colunas:
+        cursor.execute("ALTER TABLE versao_dados ADD COLUMN versao_funcionarios INTEGER NOT NULL DEFAULT 1")
+    for tabela in ("areas", "funcionarios"):
+        for operacao in ("INSERT", "UPDATE", "DELETE"):
+            nome = f"trg_versao_{tabela}_{operacao.lower()}"
+            cursor.execute(f"DROP TRIGGER IF EXISTS {nome}")
+            cursor.execute(f'''
+            CREATE TRIGGER {nome}
+            AFTER {operacao} ON {tabela}
+            BEGIN
+                UPDATE versao_dados SET versao = versao + 1,
+                                        versao_funcionarios = versao_funcionarios + 1,
+                                        atualizado_em = datetime('now')
+                WHERE id = 1;
+            END
+            ''')
+
+
+def _v10_busca_funcionarios(cursor):
+    """
+    Índice FTS5 de nome e chapa (ver modules/busca_funcionarios.py), mantido
+    por triggers e populado a partir de funcionarios.
+    """
+    cursor.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS funcionarios_busca USING fts5(
+        nome, chapa,
+        content='funcionarios', content_rowid='id',
+        tokenize='trigram'
+    )
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_funcionarios_insert AFTER INSERT ON funcionarios
+    BEGIN
+        INSERT INTO funcionarios_busca (rowid, nome, chapa) VALUES (new.id, new.nome, new.chapa);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_funcionarios_delete AFTER DELETE ON funcionarios
+    BEGIN
+        INSERT INTO funcionarios_busca (funcionarios_busca, rowid, nome, chapa)
+        VALUES ('delete', old.id, old.nome, old.chapa);
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS trg_busca_funcionarios_update
+    AFTER UPDATE OF nome, chapa ON funcionarios
+    BEGIN
+        INSERT INTO funcionarios_busca (funcionarios_busca, rowid, nome, chapa)
+        VALUES ('delete', old.id, old.nome, old.chapa);
+        INSERT INTO funcionarios_busca (rowid, nome, chapa) VALUES (new.id, new.nome, new.chapa);
+    END
+    ''')
+    cursor.execute("INSERT INTO funcionarios_busca (funcionarios_busca) VALUES ('rebuild')")
+
+
+def _v11_indice_funcionarios_area(cursor):
+    """
+    Índice do quadro de funcionários por área (ver modules/ocupacao.py).
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_funcionarios_area ON funcionarios (area_id)")
+
+
+def _v12_versao_resumo(cursor):
+    """
+    Versão das células do resumo mensal (atualizações parciais do dashboard),
+    gravada por triggers a cada INSERT e a cada UPDATE de total/detalhes.
+    """
+    colunas = {row[1] for row in cursor.execute("PRAGMA table_info(resumo_ferias_mensal)")}
+    if "versao" not in colunas:
+        cursor.execute("ALTER TABLE resumo_ferias_mensal ADD COLUMN versao INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("UPDATE resumo_ferias_mensal SET versao = (SELECT versao FROM versao_dados WHERE id = 1)")
+    for operacao in ("INSERT", "UPDATE OF total, detalhes"):
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_resumo_versao_{operacao.split()[0].lower()}
+        AFTER {operacao} ON resumo_ferias_mensal
+        BEGIN
+            UPDATE resumo_ferias_mensal SET versao = (SELECT versao FROM versao_dados WHERE id = 1)
+            WHERE mes = new.mes AND area_id = new.area_id;
+        END
+        ''')
+
+
+# (versão, descrição, função) — nunca altere uma migração já publicada; acrescente outra.
+# O SQL fica na própria migração (ver a docstring do módulo).
+MIGRACOES = [
+    (1, "esquema inicial", _v1_esquema_inicial),
+    (2, "data de retorno e área nos agendamentos", _v2_periodo_agendamentos),
+    (3, "resumo mensal do dashboard", _v3_resumo_mensal),
+    (4, "índices das consultas das rotas", _v4_indices_consultas),
+    (5, "versão dos dados", _v5_versao_dados),
+    (6, "índice do relatório", _v6_indice_relatorio),
+    (7, "índice da listagem de agendamentos", _v7_indice_listagem),
+    (8, "índice dos pedidos por chapa", _v8_indice_pedidos_chapa),
+    (9, "versão de funcionários e áreas", _v9_versao_funcionarios),
+    (10, "busca de funcionários por nome e chapa", _v10_busca_funcionarios),
+    (11, "índice de funcionários por área", _v11_indice_funcionarios_area),
+    (12, "versão das células do resumo mensal", _v12_versao_resumo),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+_migrados = set()
+_lock = threading.Lock()
+
+
+def versao(conn):
+    """
+    Retorna a versão do esquema gravada no banco.
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(conn, migracoes=None):
+    """
+    Aplica as migrações pendentes na conexão informada ('migracoes', padrão
+    MIGRACOES; o banco consolidado tem a sua lista, em modules/consolidado.py).
+    Retorna a lista de versões aplicadas.
+    """
+    aplicadas = []
+    for numero, descricao, funcao in migracoes or MIGRACOES:
+        if versao(conn) >= numero:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Outro processo pode ter migrado enquanto aguardávamos o lock de escrita
+            if versao(conn) >= numero:
+                conn.rollback()
+                continue
+            cursor = conn.cursor()
+            funcao(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(numero)}")
+            conn.commit()
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        aplicadas.append(numero)
+    return aplicadas
+
+
+def migrar_arquivo(db_path):
+    """
+    Abre (criando, se necessário) o banco 'db_path' e aplica as migrações pendentes.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        aplicadas = migrar(conn)
+    finally:
+        conn.close()
+    if aplicadas:
+        print(f"Banco de dados '{db_path}' migrado para a versão {aplicadas[-1]}.")
+    return aplicadas
+
+
+def garantir(db_path):
+    """
+    Migra 'db_path' na primeira vez que é usado neste processo; nas chamadas
+    seguintes é apenas uma consulta a um conjunto em memória.
+    """
+    if db_path in _migrados:
+        return
+    with _lock:
+        if db_path in _migrados:
+            return
+        migrar_arquivo(db_path)
+        _migrados.add(db_path)
+
+
+if __name__ == "__main__":
+    bancos = sys.argv[1:] or sorted(glob.glob("gestor_*_funcionarios.db")) + ["setores_funcionarios.db"]
+    for banco in bancos:
+        if not migrar_arquivo(banco):
+            print(f"Banco de dados '{banco}' já está na versão {VERSAO_ATUAL}.")
@@ -0,0 +1,76 @@
+"""
+Módulo: ocupacao.py
+-------------------
+Ocupação diária por área (rota /ocupacao), para o mapa de calor do
+dashboard: em cada dia de um intervalo, quantos funcionários da área estão
+de férias e que parcela do quadro da área isso representa.
+
+Um funcionário está ausente de data_ferias até a véspera de data_retorno
+(dias_ferias dias; no dia do retorno ele já trabalha).
+
+Em vez de uma consulta por dia, uma única consulta traz os agendamentos que
+tocam o intervalo e uma matriz de diferenças (área x dia) recebe +1 no
+início e -1 no retorno de cada um (np.add.at); a soma acumulada ao longo dos
+dias dá a ocupação de todas as áreas de uma vez.
+
+NumPy é importado junto com este módulo, que as rotas importam sob demanda.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+
+def calcular(cursor, inicio, fim, area_id=None):
+    """
+    Ocupação de cada área (ou só de 'area_id') em cada dia de [inicio, fim]
+    (date). Retorna {"inicio", "fim", "dias", "areas": [{"areaId", "area",
+    "funcionarios", "ausentes": [...], "percentual": [...]}]}, com um valor
+    por dia nos vetores; percentual é inteiro (0 a 100) da parcela do quadro.
+    """
+    dias = (fim - inicio).days + 1
+    filtro = "WHERE a.id = :area_id" if area_id is not None else ""
+    cursor.execute(f"""
+        SELECT a.id, a.nome, COUNT(f.id) AS funcionarios
+        FROM areas a
+        LEFT JOIN funcionarios f ON f.area_id = a.id
+        {filtro}
+        GROUP BY a.id
+        ORDER BY a.nome
+    """, {"area_id": area_id})
+    areas = cursor.fetchall()
+    indices = {row[0]: i for i, row in enumerate(areas)}
+
+    cursor.execute(f"""
+        SELECT area_id, data_ferias, data_retorno FROM ferias_agendadas
+        WHERE data_ferias <= :fim AND data_retorno > :inicio
+          {"AND area_id = :area_id" if area_id is not None else ""}
+    """, {"inicio": inicio.isoformat(), "fim": fim.isoformat(), "area_id": area_id})
+    linhas = [row for row in cursor.fetchall() if row[0] in indices]
+
+    diferencas = np.zeros((len(areas), dias + 1), dtype=np.int32)
+    if linhas:
+        area = np.fromiter((indices[row[0]] for row in linhas), dtype=np.int64, count=len(linhas))
+        datas = np.array([(row[1], row[2]) for row in linhas], dtype="datetime64[D]") - np.datetime64(inicio, "D")
+        inicios = np.clip(datas[:, 0].astype(np.int64), 0, dias)
+        retornos = np.clip(datas[:, 1].astype(np.int64), 0, dias)
+        np.add.at(diferencas, (area, inicios), 1)
+        np.add.at(diferencas, (area, retornos), -1)
+    ausentes = np.cumsum(diferencas[:, :dias], axis=1)
+
+    quadro = np.array([row[2] for row in areas], dtype=np.float64).reshape(-1, 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentual = np.where(quadro > 0, np.rint(ausentes * 100 / quadro), 0).astype(np.int64)
+
+    return {
+        "inicio": inicio.isoformat(),
+        "fim": (inicio + timedelta(days=dias - 1)).isoformat(),
+        "dias": dias,
+        "areas": [{
+            "areaId": row[0],
+            "area": row[1],
+            "funcionarios": row[2],
+            "ausentes": ausentes[i].tolist(),
+            "percentual": percentual[i].tolist(),
+        } for i, row in enumerate(areas)],
+    }
@@ -8,60 +8,303 @@ e insere/atualiza esses dados no banco de dados setores_funcionarios.db.
   - 'Área'
   - 'Colaborador'
   - 'Chapa'
+
+A importação é feita em lote: as colunas são normalizadas com operações
+vetorizadas do pandas, as áreas novas são inseridas de uma vez e os
+funcionários novos e alterados são gravados com executemany (INSERT e
+UPDATE por chapa; não há UPSERT porque, no banco consolidado, funcionarios
+é uma view).
+
+Há dois modos:
+  - process_planilha: lê a planilha inteira com pandas e grava tudo em uma
+    única transação (planilhas pequenas);
+  - process_planilha_streaming: lê as linhas de todas as abas com openpyxl em
+    modo read_only (.xlsx/.xlsm) ou de um arquivo CSV e grava em lotes de
+    tamanho fixo, com um commit por lote, mantendo a memória limitada
+    (planilhas grandes; .xls, que o openpyxl não lê, usa process_planilha).
 """
 
+import csv
+import json
+import time
+import openpyxl
 import pandas as pd
-from modules.employee_db import EmployeeDB
+from modules.employee_db import EmployeeDB, caminho_banco
+from modules import resumo_ferias, agendamentos, diretorio_funcionarios, busca_funcionarios
+
+# Coluna da planilha -> coluna normalizada
+COLUNAS = {"Área": "area", "Colaborador": "nome", "Chapa": "chapa"}
+
+# Linhas gravadas por transação no modo streaming
+TAMANHO_LOTE = 5000
+
+# Formatos lidos de forma incremental (openpyxl não lê .xls)
+EXTENSOES_STREAMING = ("csv", "xlsx", "xlsm")
+
+
+def normalizar(df):
+    """
+    Seleciona e normaliza as colunas da planilha, retornando um DataFrame com
+    'area', 'nome' e 'chapa' (texto, sem espaços nas pontas). Linhas sem chapa
+    ou sem nome são descartadas; chapas repetidas mantêm a última ocorrência.
+    """
+    faltando = [c for c in COLUNAS if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes na planilha: {', '.join(faltando)}")
+    df = df[list(COLUNAS)].rename(columns=COLUNAS)
+
+    chapa = df["chapa"]
+    # Chapas numéricas podem chegar como float (ex.: 363653.0)
+    if pd.api.types.is_float_dtype(chapa):
+        chapa = chapa.astype("Int64")
+    elif chapa.dtype == object:
+        chapa = chapa.map(lambda v: int(v) if isinstance(v, float) and v.is_integer() else v)
+    df = df.assign(
+        chapa=chapa.astype("string").str.strip(),
+        nome=df["nome"].astype("string").str.strip(),
+        area=df["area"].astype("string").str.strip(),
+    )
+    df = df[df["chapa"].fillna("").ne("") & df["nome"].fillna("").ne("")]
+    return df.drop_duplicates("chapa", keep="last")
+
 
-def process_planilha(filepath):
+def importar_funcionarios(conn, df):
+    """
+    Grava no banco as áreas e funcionários do DataFrame normalizado 'df'.
+    Não faz commit. Retorna a contagem de funcionários inseridos, atualizados
+    e inalterados.
+    """
+    cursor = conn.cursor()
+
+    # Áreas: insere de uma vez as que ainda não existem
+    cursor.execute("SELECT nome, id FROM areas")
+    area_ids = {row[0]: row[1] for row in cursor.fetchall()}
+    # (na ordem em que aparecem na planilha)
+    novas_areas = [a for a in df["area"].dropna().unique() if a not in area_ids]
+    if novas_areas:
+        cursor.executemany("INSERT INTO areas (nome) VALUES (?)", [(a,) for a in novas_areas])
+        cursor.execute("SELECT nome, id FROM areas")
+        area_ids = {row[0]: row[1] for row in cursor.fetchall()}
+    df = df.assign(area_id=df["area"].map(area_ids).astype("Int64"))
+
+    # Compara com os funcionários atuais (apenas as chapas do lote) para separar
+    # novos/alterados/inalterados
+    cursor.execute("""
+        SELECT chapa, nome, area_id FROM funcionarios
+        WHERE chapa IN (SELECT value FROM json_each(?))
+    """, (json.dumps(df["chapa"].tolist()),))
+    atuais = pd.DataFrame(cursor.fetchall(), columns=["chapa", "nome_atual", "area_id_atual"])
+    atuais = atuais.astype({"chapa": "string", "nome_atual": "string", "area_id_atual": "Int64"})
+    df = df.merge(atuais, on="chapa", how="left", indicator=True)
+    novos = df["_merge"].eq("left_only")
+    inalterados = (
+        ~novos
+        & df["nome"].eq(df["nome_atual"]).fillna(False)
+        & (df["area_id"].eq(df["area_id_atual"]).fillna(False)
+           | (df["area_id"].isna() & df["area_id_atual"].isna()))
+    )
+
+    def linhas(parte):
+        return [
+            (nome, None if pd.isna(area_id) else int(area_id), chapa)
+            for nome, chapa, area_id in zip(parte["nome"], parte["chapa"], parte["area_id"])
+        ]
+
+    cursor.executemany(
+        "UPDATE funcionarios SET nome = ?, area_id = ? WHERE chapa = ?",
+        linhas(df[~novos & ~inalterados]),
+    )
+    cursor.executemany(
+        "INSERT INTO funcionarios (nome, area_id, chapa) VALUES (?, ?, ?)",
+        linhas(df[novos]),
+    )
+    cursor.close()
+
+    return {
+        "inseridos": int(novos.sum()),
+        "atualizados": int((~novos & ~inalterados).sum()),
+        "inalterados": int(inalterados.sum()),
+    }
+
+
+def process_planilha(filepath, db_path=None):
     """
     Lê o arquivo Excel localizado em 'filepath' e atualiza as tabelas 'areas' e 'funcionarios'
-    no banco de dados setores_funcionarios.db.
+    no banco de dados do usuário (ou em 'db_path'), em uma única transação.
 
-    Para cada linha:
-      - Verifica se a área existe; se não, insere a área.
-      - Insere ou atualiza o funcionário (nome, chapa, area_id).
-    
-    Retorna uma mensagem informando que a planilha foi processada com sucesso.
+    Retorna (mensagem, estatisticas), onde estatisticas contém o número de
+    funcionários inseridos, atualizados, inalterados, linhas ignoradas e o
+    tempo total em segundos (None se a planilha não puder ser lida).
     """
+    inicio = time.perf_counter()
     try:
         # Lê o arquivo Excel
         df = pd.read_excel(filepath)
+        linhas = len(df)
+        df = normalizar(df)
     except Exception as e:
-        return f"Erro ao ler a planilha: {e}"
+        return f"Erro ao ler a planilha: {e}", None
 
     # Conectar ao banco de dados de funcionários
-    conn = EmployeeDB.get_connection()
-    cursor = conn.cursor()
+    conn = EmployeeDB.get_connection(db_path)
+    try:
+        conn.execute("BEGIN")
+        estatisticas = importar_funcionarios(conn, df)
+        cursor = conn.cursor()
+        # Funcionários podem ter mudado de área: atualiza a área dos agendamentos
+        agendamentos.sincronizar_areas(cursor)
+        # Nomes e áreas podem ter mudado: recalcula o resumo mensal do dashboard
+        resumo_ferias.recalcular(cursor)
+        busca_funcionarios.otimizar(cursor)
+        cursor.close()
+        conn.commit()
+        # Funcionários e áreas mudaram: troca o diretório em memória pelo novo
+        diretorio_funcionarios.recarregar(db_path, conn)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
-    for index, row in df.iterrows():
-        # Extrai os valores (ajuste os nomes das colunas conforme sua planilha)
-        area = row['Área']
-        nome = row['Colaborador']
-        chapa = str(row['Chapa']).strip()
-
-        # Verifica se a área já existe
-        cursor.execute("SELECT id FROM areas WHERE nome = ?", (area,))
-        area_row = cursor.fetchone()
-        if area_row:
-            area_id = area_row["id"]
-        else:
-            cursor.execute("INSERT INTO areas (nome) VALUES (?)", (area,))
-            area_id = cursor.lastrowid
-
-        # Verifica se o funcionário já existe (pelo número de chapa)
-        cursor.execute("SELECT id FROM funcionarios WHERE chapa = ?", (chapa,))
-        func_row = cursor.fetchone()
-        if func_row:
-            # Atualiza os dados do funcionário
-            cursor.execute("UPDATE funcionarios SET nome = ?, area_id = ? WHERE chapa = ?",
-                           (nome, area_id, chapa))
-        else:
-            # Insere o novo funcionário
-            cursor.execute("INSERT INTO funcionarios (nome, chapa, area_id) VALUES (?, ?, ?)",
-                           (nome, chapa, area_id))
-    
-    conn.commit()
-    cursor.close()
-    conn.close()
-    return "Planilha processada com sucesso."
+    estatisticas["ignorados"] = linhas - len(df)
+    estatisticas["tempo_s"] = round(time.perf_counter() - inicio, 3)
+    return "Planilha processada com sucesso.", estatisticas
+
+
+def _linhas_xlsx(filepath):
+    """
+    Gera (área, colaborador, chapa) de todas as abas cujo cabeçalho (primeira
+    linha) contém as colunas esperadas, lendo o arquivo em modo read_only.
+    """
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            linhas = ws.iter_rows(values_only=True)
+            cabecalho = next(linhas, None) or ()
+            posicoes = {str(c).strip(): i for i, c in enumerate(cabecalho) if c is not None}
+            if not all(c in posicoes for c in COLUNAS):
+                continue  # aba sem os dados de funcionários
+            indices = [posicoes[c] for c in COLUNAS]
+            for linha in linhas:
+                yield tuple(linha[i] if i < len(linha) else None for i in indices)
+    finally:
+        wb.close()
+
+
+def _linhas_csv(filepath):
+    """
+    Gera (área, colaborador, chapa) de um arquivo CSV com cabeçalho.
+    O separador (vírgula ou ponto e vírgula) é detectado automaticamente.
+    """
+    with open(filepath, newline="", encoding="utf-8-sig") as f:
+        amostra = f.read(64 * 1024)
+        f.seek(0)
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        leitor = csv.reader(f, dialeto)
+        cabecalho = [c.strip() for c in next(leitor, [])]
+        faltando = [c for c in COLUNAS if c not in cabecalho]
+        if faltando:
+            raise ValueError(f"Colunas ausentes na planilha: {', '.join(faltando)}")
+        indices = [cabecalho.index(c) for c in COLUNAS]
+        for linha in leitor:
+            yield tuple(linha[i] if i < len(linha) else None for i in indices)
+
+
+def process_planilha_streaming(filepath, db_path=None, tamanho_lote=TAMANHO_LOTE, progresso=None):
+    """
+    Importa a planilha (.xlsx, .xlsm ou .csv) em 'filepath' sem carregá-la
+    inteira na memória (.xls é importada por process_planilha): as linhas são
+    lidas de forma incremental e gravadas em lotes de 'tamanho_lote', com um
+    commit por lote. Ao final, sincroniza as áreas dos agendamentos e
+    recalcula o resumo do dashboard.
+
+    'progresso', se informado, é chamado após cada lote com o número de linhas
+    já gravadas.
+
+    Retorna (mensagem, estatisticas) como process_planilha, acrescentando o
+    número de lotes gravados. Em caso de erro, estatisticas é None; os lotes
+    já gravados permanecem no banco (a mensagem informa quantas linhas), e as
+    áreas dos agendamentos e o resumo são atualizados mesmo assim.
+    """
+    extensao = filepath.lower().rsplit(".", 1)[-1]
+    if extensao not in EXTENSOES_STREAMING:
+        # openpyxl não lê .xls: importa de uma vez com pandas
+        return process_planilha(filepath, db_path)
+    inicio = time.perf_counter()
+    if extensao == "csv":
+        linhas = _linhas_csv(filepath)
+    else:
+        linhas = _linhas_xlsx(filepath)
+
+    estatisticas = {"inseridos": 0, "atualizados": 0, "inalterados": 0, "ignorados": 0, "lotes": 0}
+    conn = EmployeeDB.get_connection(db_path)
+    linhas_gravadas = 0
+
+    def gravar(lote):
+        df = normalizar(pd.DataFrame(lote, columns=list(COLUNAS), dtype=object))
+        conn.execute("BEGIN")
+        try:
+            parcial = importar_funcionarios(conn, df)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        for chave, valor in parcial.items():
+            estatisticas[chave] += valor
+        estatisticas["ignorados"] += len(lote) - len(df)
+        estatisticas["lotes"] += 1
+        nonlocal linhas_gravadas
+        linhas_gravadas += len(lote)
+        if progresso:
+            progresso(linhas_gravadas)
+
+    try:
+        lote = []
+        for linha in linhas:
+            lote.append(linha)
+            if len(lote) >= tamanho_lote:
+                gravar(lote)
+                lote = []
+        if lote:
+            gravar(lote)
+    except Exception as e:
+        mensagem = f"Erro ao importar a planilha: {e}"
+        if estatisticas["lotes"]:
+            # Os lotes já gravados alteraram funcionários: os agendamentos e o
+            # resumo do dashboard precisam refletir o que ficou no banco
+            mensagem = (f"Importação parcial: {linhas_gravadas} linhas gravadas em "
+                        f"{estatisticas['lotes']} lote(s) antes do erro. {mensagem}")
+            try:
+                _finalizar(conn, db_path)
+            except Exception as erro:
+                diretorio_funcionarios.invalidar(caminho_banco(db_path))
+                mensagem += f" Erro ao atualizar agendamentos e resumo: {erro}"
+        conn.close()
+        return mensagem, None
+
+    try:
+        _finalizar(conn, db_path)
+    finally:
+        conn.close()
+
+    estatisticas["tempo_s"] = round(time.perf_counter() - inicio, 3)
+    return "Planilha processada com sucesso.", estatisticas
+
+
+def _finalizar(conn, db_path):
+    """
+    Depois dos lotes gravados: sincroniza as áreas dos agendamentos, recalcula
+    o resumo do dashboard e recarrega o diretório de funcionários.
+    """
+    try:
+        conn.execute("BEGIN")
+        cursor = conn.cursor()
+        agendamentos.sincronizar_areas(cursor)
+        resumo_ferias.recalcular(cursor)
+        busca_funcionarios.otimizar(cursor)
+        cursor.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    diretorio_funcionarios.recarregar(db_path, conn)
@@ -0,0 +1,73 @@
+"""
+Módulo: processos.py
+--------------------
+Pool de processos para o trabalho pesado de CPU (renderização do PDF do
+relatório, importação de planilhas), para que ele não dispute o GIL com as
+threads que atendem as requisições.
+
+  - PROCESSOS_WORKERS (padrão 0) define o número de processos; com 0, o
+    trabalho roda na própria thread que o pede (comportamento do servidor de
+    desenvolvimento). O modo ASGI (asgi.py) ativa o pool por padrão.
+  - Os processos são criados com 'spawn': o processo principal tem threads e
+    conexões SQLite abertas, que um fork copiaria em estado inconsistente.
+  - A função executada e seus argumentos precisam ser serializáveis (funções
+    de módulo, não lambdas); o resultado volta para quem chamou.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+WORKERS = int(os.environ.get("PROCESSOS_WORKERS", "0"))
+
+_executor = None
+_lock = threading.Lock()
+
+
+def ativo():
+    """
+    Indica se o trabalho pesado roda no pool de processos.
+    """
+    return WORKERS > 0
+
+
+def configurar(workers):
+    """
+    Define o número de processos (0 desativa o pool). Deve ser chamada antes do primeiro uso.
+    """
+    global WORKERS
+    WORKERS = int(workers)
+
+
+def _pool():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def executar(funcao, *args):
+    """
+    Executa funcao(*args) em um processo do pool (ou na thread atual, se o
+    pool estiver desativado) e retorna o resultado.
+    """
+    if not ativo():
+        return funcao(*args)
+    return _pool().submit(funcao, *args).result()
+
+
+def encerrar():
+    """
+    Encerra os processos do pool (ex.: ao desligar o servidor).
+    """
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
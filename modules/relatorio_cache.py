@@ -0,0 +1,98 @@
+"""
+Módulo: relatorio_cache.py
+--------------------------
+Cache em disco do relatório de férias já renderizado (HTML de /relatorio e
+PDF de /gerar_pdf), para não repetir consulta, renderização e, principalmente,
+a conversão pelo xhtml2pdf a cada clique.
+
+A chave de cada entrada combina:
+  - o banco do gestor (tenant);
+  - a versão dos dados (modules/versao_dados.py), que muda a cada alteração
+    de agendamentos, funcionários, áreas ou pedidos;
+  - a data de hoje (UTC), pois "em férias" depende de date('now');
+  - o formato (html ou pdf) e os filtros do relatório.
+
+Por isso o cache não precisa ser invalidado explicitamente: uma alteração
+gera uma chave nova e as entradas antigas deixam de ser lidas, sendo removidas
+pela evicção por tamanho (as menos usadas primeiro) quando o diretório passa
+de RELATORIO_CACHE_MAX_MB (padrão 64).
+
+A chave também serve de ETag das respostas.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+
+CACHE_FOLDER = os.path.join(os.getcwd(), "relatorio_cache")
+TAMANHO_MAXIMO = int(os.environ.get("RELATORIO_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def chave(db_path, versao, hoje, formato, filtros=None):
+    """
+    Retorna a chave (hex) do relatório do banco 'db_path' na versão de dados
+    'versao', na data 'hoje', no formato e com os filtros (dict) informados.
+    """
+    filtros = "&".join(f"{k}={v}" for k, v in sorted((filtros or {}).items()))
+    texto = f"{os.path.abspath(db_path)}|{versao}|{hoje}|{formato}|{filtros}"
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _caminho(chave_relatorio, formato):
+    return os.path.join(CACHE_FOLDER, f"{chave_relatorio}.{formato}")
+
+
+def obter(chave_relatorio, formato):
+    """
+    Retorna o conteúdo (bytes) em cache, ou None.
+    """
+    caminho = _caminho(chave_relatorio, formato)
+    try:
+        with open(caminho, "rb") as f:
+            dados = f.read()
+        # Marca como usada recentemente (ordem da evicção)
+        os.utime(caminho)
+    except FileNotFoundError:
+        return None
+    return dados
+
+
+def gravar(chave_relatorio, formato, dados):
+    """
+    Grava o conteúdo no cache (de forma atômica) e remove as entradas menos
+    usadas se o tamanho total passar do limite.
+    """
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=CACHE_FOLDER, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, _caminho(chave_relatorio, formato))
+    _evictar()
+
+
+def _evictar():
+    """
+    Remove as entradas mais antigas (por último uso) até caber em TAMANHO_MAXIMO.
+    """
+    with _lock:
+        entradas = []
+        for entrada in os.scandir(CACHE_FOLDER):
+            if entrada.name.endswith(".tmp"):
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, entrada.path))
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= TAMANHO_MAXIMO:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
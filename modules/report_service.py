@@ -0,0 +1,80 @@
+"""
+Módulo: report_service.py
+-------------------------
+Consulta única dos dados do relatório de férias, usada por /relatorio,
+/gerar_pdf e pela tarefa de PDF em segundo plano:
+  - em_ferias: agendamentos em andamento (data_ferias <= hoje <= data_retorno);
+  - agendados: agendamentos futuros (data_ferias > hoje).
+
+Os dois grupos vêm de uma só consulta por faixa sobre a data de retorno já
+gravada (data_retorno >= hoje, índice idx_ferias_retorno), sem calcular
+date(...) por linha, e são separados em Python. Filtros opcionais:
+  - area_id: apenas uma área;
+  - inicio/fim: apenas agendamentos que se sobrepõem à janela [inicio, fim].
+
+Cada linha é a tupla (chapa, nome, data_ferias, dias_ferias, data_retorno),
+no formato esperado pelos templates relatorio.html e relatorio_pdf.html.
+O tempo da consulta é registrado no log da aplicação.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from flask import current_app
+
+from modules.employee_db import EmployeeDB
+
+
+class ReportService:
+    @staticmethod
+    def hoje():
+        """
+        Data de referência do relatório (UTC, como date('now') do SQLite).
+        """
+        return datetime.now(timezone.utc).date().isoformat()
+
+    @staticmethod
+    def dados_relatorio(db_path=None, area_id=None, inicio=None, fim=None, hoje=None):
+        """
+        Retorna {'em_ferias': [...], 'agendados': [...]} do banco do usuário
+        (ou de 'db_path'), ordenados pela data de início.
+        """
+        hoje = hoje or ReportService.hoje()
+        inicio_consulta = time.perf_counter()
+
+        # Só os filtros informados entram na consulta, para o planejador escolher o índice
+        condicoes = ["fa.data_retorno >= :hoje"]
+        if area_id is not None:
+            condicoes.append("fa.area_id = :area_id")
+        if inicio:
+            condicoes.append("fa.data_retorno >= :inicio")
+        if fim:
+            condicoes.append("fa.data_ferias <= :fim")
+
+        conn = EmployeeDB.get_connection(db_path)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT f.chapa, f.nome, fa.data_ferias, fa.dias_ferias, fa.data_retorno
+            FROM ferias_agendadas fa
+            JOIN funcionarios f ON fa.funcionario_id = f.id
+            WHERE {" AND ".join(condicoes)}
+            ORDER BY fa.data_ferias, fa.id
+        """, {"hoje": hoje, "area_id": area_id, "inicio": inicio, "fim": fim})
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        em_ferias = []
+        agendados = []
+        for row in rows:
+            linha = (row[0], row[1], row[2], row[3], row[4])
+            if row[2] <= hoje:
+                em_ferias.append(linha)
+            else:
+                agendados.append(linha)
+
+        current_app.logger.debug(
+            "Relatório: %d em férias, %d agendados em %.1f ms",
+            len(em_ferias), len(agendados), (time.perf_counter() - inicio_consulta) * 1000,
+        )
+        return {"em_ferias": em_ferias, "agendados": agendados}
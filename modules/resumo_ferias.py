@@ -0,0 +1,202 @@
+"""
+Módulo: resumo_ferias.py
+------------------------
+Mantém a tabela materializada 'resumo_ferias_mensal', com uma linha por
+(mês, área) contendo o total de agendamentos e o texto de detalhes usado nos
+tooltips do dashboard ("nome (dias dias)", um por linha).
+
+As rotas que alteram ferias_agendadas chamam atualizar_celulas() na mesma
+transação da alteração, recalculando apenas as células afetadas. Assim a leitura
+do dashboard custa O(áreas × meses), independentemente do histórico.
+
+Cada célula guarda em 'versao' a versão dos dados (modules/versao_dados.py)
+da transação que a alterou, gravada por triggers (migração 12): o dashboard
+pede só as células alteradas desde a versão que já tem (ler_desde()). Por
+isso uma célula que fica vazia não é removida, e sim zerada (total 0); as
+células zeradas são ignoradas por ler() e devolvidas por ler_desde().
+
+A tabela é criada pela migração 3 (modules/migrations.py), populada pela
+migração 4 e reconstruída por reconstruir() após importar uma planilha, que
+pode mudar nomes e áreas. A reconstrução também pode ser executada pela linha de comando:
+
+    python -m modules.resumo_ferias [banco.db ...]
+
+Sem argumentos, reconstrói todos os gestor_*_funcionarios.db e o
+setores_funcionarios.db do diretório atual.
+"""
+
+import glob
+import sqlite3
+import sys
+
+
+def criar_tabela(cursor):
+    """
+    Cria a tabela de resumo, se não existir.
+    """
+    # Consulta também o esquema temp: no banco consolidado é uma view (modules/consolidado.py)
+    if cursor.execute("PRAGMA table_info(resumo_ferias_mensal)").fetchall():
+        return
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS resumo_ferias_mensal (
+        mes TEXT NOT NULL,
+        area_id INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        detalhes TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (mes, area_id)
+    )
+    ''')
+
+
+def mes_de(data_ferias):
+    """
+    Retorna o mês ('YYYY-MM') de uma data ISO ('YYYY-MM-DD').
+    """
+    return str(data_ferias)[:7]
+
+
+def _intervalo_do_mes(mes):
+    """
+    Retorna (primeiro dia do mês, primeiro dia do mês seguinte) em ISO.
+    """
+    ano, m = int(mes[:4]), int(mes[5:7])
+    ano_seg, m_seg = (ano + 1, 1) if m == 12 else (ano, m + 1)
+    return f"{ano:04d}-{m:02d}-01", f"{ano_seg:04d}-{m_seg:02d}-01"
+
+
+def celulas_do_funcionario(cursor, funcionario_id):
+    """
+    Retorna o conjunto de células (mes, area_id) ocupadas pelos agendamentos
+    atuais do funcionário. Deve ser chamada antes de alterar/remover o agendamento.
+    """
+    cursor.execute(
+        "SELECT data_ferias, area_id FROM ferias_agendadas WHERE funcionario_id = ?",
+        (funcionario_id,),
+    )
+    return {(mes_de(row[0]), row[1]) for row in cursor.fetchall() if row[1] is not None}
+
+
+def atualizar_celulas(cursor, celulas):
+    """
+    Recalcula as células (mes, area_id) informadas a partir de ferias_agendadas.
+    Não faz commit: deve rodar na mesma transação da alteração de origem.
+    """
+    for mes, area_id in celulas:
+        if area_id is None:
+            continue
+        inicio, fim = _intervalo_do_mes(mes)
+        cursor.execute("""
+            SELECT f.nome, fa.dias_ferias
+            FROM ferias_agendadas fa
+            JOIN funcionarios f ON fa.funcionario_id = f.id
+            WHERE fa.area_id = ? AND fa.data_ferias >= ? AND fa.data_ferias < ?
+            ORDER BY fa.id
+        """, (area_id, inicio, fim))
+        detalhes = [f"{row[0]} ({row[1]} dias)" for row in cursor.fetchall()]
+        if detalhes:
+            cursor.execute("""
+                INSERT OR REPLACE INTO resumo_ferias_mensal (mes, area_id, total, detalhes)
+                VALUES (?, ?, ?, ?)
+            """, (mes, area_id, len(detalhes), "\n".join(detalhes)))
+        else:
+            # Zerada em vez de removida: ler_desde() informa a remoção ao dashboard
+            cursor.execute(
+                "UPDATE resumo_ferias_mensal SET total = 0, detalhes = '' WHERE mes = ? AND area_id = ?",
+                (mes, area_id),
+            )
+
+
+def limpar(cursor):
+    """
+    Zera todas as células (usado ao excluir todos os agendamentos).
+    """
+    cursor.execute("UPDATE resumo_ferias_mensal SET total = 0, detalhes = '' WHERE total > 0")
+
+
+def recalcular(cursor):
+    """
+    Recalcula toda a tabela de resumo a partir de ferias_agendadas, em uma
+    única passada. Não faz commit. Retorna o número de células.
+    """
+    criar_tabela(cursor)
+    cursor.execute("""
+        SELECT fa.data_ferias, fa.area_id, f.nome, fa.dias_ferias
+        FROM ferias_agendadas fa
+        JOIN funcionarios f ON fa.funcionario_id = f.id
+        WHERE fa.area_id IS NOT NULL
+        ORDER BY fa.id
+    """)
+    celulas = {}
+    for row in cursor.fetchall():
+        chave = (mes_de(row[0]), row[1])
+        celulas.setdefault(chave, []).append(f"{row[2]} ({row[3]} dias)")
+    limpar(cursor)
+    cursor.executemany("""
+        INSERT OR REPLACE INTO resumo_ferias_mensal (mes, area_id, total, detalhes)
+        VALUES (?, ?, ?, ?)
+    """, [(mes, area_id, len(d), "\n".join(d)) for (mes, area_id), d in celulas.items()])
+    return len(celulas)
+
+
+def reconstruir(conn):
+    """
+    Reconstrói toda a tabela de resumo e faz commit.
+    """
+    cursor = conn.cursor()
+    total = recalcular(cursor)
+    conn.commit()
+    cursor.close()
+    return total
+
+
+def ler(cursor):
+    """
+    Retorna as células do resumo com o nome da área, ordenadas por área_id.
+    """
+    cursor.execute("""
+        SELECT r.mes, a.nome AS area, r.total, r.detalhes
+        FROM resumo_ferias_mensal r
+        JOIN areas a ON r.area_id = a.id
+        WHERE r.total > 0
+        ORDER BY r.area_id
+    """)
+    return cursor.fetchall()
+
+
+def total(cursor):
+    """
+    Total de agendamentos nas células do resumo (das áreas existentes).
+    """
+    cursor.execute("""
+        SELECT COALESCE(SUM(r.total), 0)
+        FROM resumo_ferias_mensal r
+        JOIN areas a ON r.area_id = a.id
+    """)
+    return cursor.fetchone()[0]
+
+
+def ler_desde(cursor, versao):
+    """
+    Retorna as células alteradas depois da versão dos dados 'versao'
+    (mes, area_id, area, total, detalhes), incluindo as zeradas; 'area' é
+    None se a área não existe mais. Com versao 0, todas as células não vazias.
+    """
+    cursor.execute("""
+        SELECT r.mes, r.area_id, a.nome AS area, r.total, r.detalhes
+        FROM resumo_ferias_mensal r
+        LEFT JOIN areas a ON r.area_id = a.id
+        WHERE r.versao > :versao AND (r.total > 0 OR :versao > 0)
+        ORDER BY r.area_id, r.mes
+    """, {"versao": versao})
+    return cursor.fetchall()
+
+
+if __name__ == "__main__":
+    bancos = sys.argv[1:] or sorted(glob.glob("gestor_*_funcionarios.db")) + ["setores_funcionarios.db"]
+    for banco in bancos:
+        conn = sqlite3.connect(banco)
+        try:
+            total = reconstruir(conn)
+            print(f"Resumo de '{banco}' reconstruído: {total} células.")
+        finally:
+            conn.close()
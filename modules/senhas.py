@@ -0,0 +1,90 @@
+"""
+Módulo: senhas.py
+-----------------
+Geração e verificação de hashes de senha (werkzeug.security) fora das
+threads de requisição, em um executor limitado:
+
+  - SENHA_WORKERS (padrão 2) threads calculam hashes; como o hash é
+    deliberadamente lento, isso limita a CPU que uma rajada de logins pode
+    consumir, deixando as demais rotas respondendo;
+  - no máximo SENHA_FILA (padrão 16) pedidos aguardam na fila; acima disso,
+    SenhasOcupadas é levantada imediatamente (as rotas respondem 503 com
+    Retry-After) em vez de acumular requisições presas;
+  - SENHA_HASH_METODO (padrão "scrypt") define o método dos hashes novos;
+    no login, um hash gravado com parâmetros diferentes é refeito com a senha
+    informada (rehash transparente).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METODO = os.environ.get("SENHA_HASH_METODO", "scrypt")
+WORKERS = int(os.environ.get("SENHA_WORKERS", "2"))
+FILA = int(os.environ.get("SENHA_FILA", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="senha")
+# Vagas = em execução + aguardando na fila
+_vagas = threading.BoundedSemaphore(WORKERS + FILA)
+_parametros = None
+
+
+class SenhasOcupadas(Exception):
+    """
+    O executor de hashes está saturado; a requisição deve ser repetida depois.
+    """
+
+
+def _executar(funcao, *args):
+    """
+    Executa funcao(*args) no executor e aguarda o resultado, ou levanta
+    SenhasOcupadas se não houver vaga.
+    """
+    if not _vagas.acquire(blocking=False):
+        raise SenhasOcupadas("Muitas operações de senha em andamento.")
+    try:
+        return _executor.submit(funcao, *args).result()
+    finally:
+        _vagas.release()
+
+
+def parametros_configurados():
+    """
+    Prefixo dos hashes gerados com METODO (ex.: "scrypt:32768:8:1").
+    """
+    global _parametros
+    if _parametros is None:
+        _parametros = generate_password_hash("", method=METODO).split("$", 1)[0]
+    return _parametros
+
+
+def precisa_rehash(senha_hash):
+    """
+    Indica se o hash gravado usa parâmetros diferentes dos configurados.
+    """
+    return senha_hash.split("$", 1)[0] != parametros_configurados()
+
+
+def gerar_hash(senha):
+    """
+    Gera o hash da senha com o método configurado.
+    """
+    return _executar(generate_password_hash, senha, METODO)
+
+
+def _verificar(senha_hash, senha):
+    if not check_password_hash(senha_hash, senha):
+        return False, None
+    if precisa_rehash(senha_hash):
+        return True, generate_password_hash(senha, METODO)
+    return True, None
+
+
+def verificar(senha_hash, senha):
+    """
+    Verifica a senha. Retorna (confere, novo_hash): novo_hash vem preenchido
+    quando a senha confere e o hash gravado deve ser substituído.
+    """
+    return _executar(_verificar, senha_hash, senha)
@@ -0,0 +1,38 @@
+"""
+Módulo: versao_dados.py
+-----------------------
+Versão dos dados de um banco de funcionários: um contador gravado na tabela
+'versao_dados' (uma única linha), incrementado por triggers a cada INSERT,
+UPDATE ou DELETE em areas, funcionarios, ferias_agendadas e
+pedidos_aprovacao, junto com o instante da última alteração (UTC).
+A coluna versao_funcionarios muda apenas com alterações em funcionarios e
+areas (usada pelo diretório em memória, modules/diretorio_funcionarios.py).
+
+Como os triggers rodam na mesma transação da alteração, qualquer caminho de
+escrita (rotas, importação de planilha, scripts) invalida automaticamente o
+que for derivado da versão: caches de relatório, ETags etc.
+
+A tabela e os triggers são criados pela migração 5 (modules/migrations.py);
+versao_funcionarios, pela migração 9.
+"""
+
+import hashlib
+import os
+
+
+def ler(cursor):
+    """
+    Retorna (versao, atualizado_em) do banco; atualizado_em é 'YYYY-MM-DD HH:MM:SS' em UTC.
+    """
+    cursor.execute("SELECT versao, atualizado_em FROM versao_dados WHERE id = 1")
+    row = cursor.fetchone()
+    return row[0], row[1]
+
+
+def etag(db_path, versao, *partes):
+    """
+    ETag de uma resposta derivada dos dados do banco 'db_path' na versão
+    'versao'; 'partes' distinguem respostas diferentes (rota, parâmetros).
+    """
+    texto = "|".join([os.path.abspath(db_path), str(versao)] + [str(p) for p in partes])
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
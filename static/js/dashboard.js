@@ -1,90 +1,89 @@
 /*
   dashboard.js
   ------------
-  - Carrega os dados do dashboard via endpoint /dashboard_data.
+  - Carrega os dados do dashboard via endpoint /dashboard_data: as células do
+    gráfico (mês x área) ficam no localStorage com a versão dos dados, e a cada
+    visita só as células alteradas desde essa versão são pedidas (?since=).
   - Se não houver agendamentos, exibe a mensagem "Sem agendamentos de férias."
   - Caso haja agendamentos, monta um gráfico de barras com os meses (labels) e datasets (por área).
+  - Recebe os eventos de /eventos (Server-Sent Events) e, a cada pedido ou
+    agendamento alterado, atualiza gráfico, total, pedidos e conflitos sem
+    recarregar a página (o mesmo depois de aprovar, rejeitar ou excluir aqui).
+    Se /eventos recusar a conexão (ex.: 503 no limite de conexões) ou o
+    navegador não tiver EventSource, consulta /dashboard_data?since= a cada
+    15 s até conseguir se conectar.
   - Configura os tooltips para exibir o mês no formato MM/YYYY e detalhes (nome do funcionário e dias de férias).
   - Também inclui a configuração dos ticks do eixo x para exibir as datas no formato MM/YYYY.
-  - Inclui funções para copiar o link, aprovar/rejeitar pedidos e excluir agendamentos.
+  - Lista os conflitos (períodos sobrepostos por área) obtidos de /conflitos.
+  - Inclui funções para copiar o link, aprovar/rejeitar pedidos (um a um ou os
+    selecionados, em lote) e excluir agendamentos.
   - Utiliza SweetAlert2 para popups animados em caso de erro.
 */
 
 document.addEventListener('DOMContentLoaded', function() {
   console.log("dashboard.js carregado");
-  const chartContainer = document.getElementById('chartContainer');
-  const ctx = document.getElementById('feriasChart').getContext('2d');
+  carregarDashboard();
+  ouvirEventos();
+  carregarConflitos();
+
+  // Caixa que marca/desmarca todos os pedidos
+  const selecionarTodos = document.getElementById('selecionarTodosPedidos');
+  if (selecionarTodos) {
+      selecionarTodos.addEventListener('change', function() {
+          document.querySelectorAll('.selecionar-pedido').forEach(caixa => {
+              caixa.checked = selecionarTodos.checked;
+          });
+      });
+  }
 
-  // Requisição para obter os dados do dashboard
-  fetch('/dashboard_data')
+  // Função para copiar o link para marcar férias
+  const copyLinkButton = document.getElementById('copyLinkButton');
+  if (copyLinkButton) {
+      copyLinkButton.addEventListener('click', function() {
+          const feriasLink = document.getElementById('feriasLink');
+          feriasLink.select();
+          document.execCommand('copy');
+          document.getElementById('copyMessage').style.display = 'block';
+          setTimeout(() => {
+              document.getElementById('copyMessage').style.display = 'none';
+          }, 2000);
+      });
+  }
+});
+
+/* Gráfico (Chart.js) e células guardadas do dashboard */
+let graficoFerias = null;
+let estadoDashboard = null;
+
+/* Busca as células alteradas desde a versão guardada e atualiza gráfico, total e pedidos */
+function carregarDashboard() {
+  const chartContainer = document.getElementById('chartContainer');
+  const chaveDados = 'dashboard:' + chartContainer.dataset.chave;
+  if (!estadoDashboard) {
+    estadoDashboard = lerEstadoDashboard(chaveDados);
+  }
+  return fetch('/dashboard_data?since=' + (estadoDashboard ? estadoDashboard.versao : 0))
     .then(response => response.json())
     .then(data => {
         console.log("Dados do dashboard:", data);
-        if (data.total_agendamentos === 0) {
-            chartContainer.innerHTML = "<p class='text-center'>Sem agendamentos de férias.</p>";
-        } else {
-            new Chart(ctx, {
-                type: 'bar',
-                data: {
-                    labels: data.labels, // Exemplo: ["2023-06", "2023-07", ...]
-                    datasets: data.datasets  // Dados agrupados por área com propriedade customData para detalhes
-                },
-                options: {
-                    responsive: true,
-                    scales: {
-                        x: {
-                            beginAtZero: true,
-                            title: { display: true, text: 'Meses' },
-                            ticks: {
-                                // Converte o rótulo de cada tick de "YYYY-MM" para "MM/YYYY"
-                                callback: function(value, index, ticks) {
-                                    let label = this.getLabelForValue(value);
-                                    const parts = label.split("-");
-                                    if (parts.length === 2) {
-                                        return parts[1] + "/" + parts[0];
-                                    }
-                                    return label;
-                                }
-                            }
-                        },
-                        y: {
-                            beginAtZero: true,
-                            title: { display: true, text: 'Número de Funcionários' }
-                        }
-                    },
-                    plugins: {
-                        legend: { position: 'top' },
-                        title: { display: true, text: 'Agendamentos de Férias por Área e Mês' },
-                        tooltip: {
-                            callbacks: {
-                                // Converte o título do tooltip (rótulo) de "YYYY-MM" para "MM/YYYY"
-                                title: function(tooltipItems) {
-                                    let label = tooltipItems[0].label;
-                                    const parts = label.split("-");
-                                    if (parts.length === 2) {
-                                        return parts[1] + "/" + parts[0];
-                                    }
-                                    return label;
-                                },
-                                label: function(context) {
-                                    let label = context.dataset.label || '';
-                                    if (label) {
-                                        label += ': ';
-                                    }
-                                    label += context.parsed.y;
-                                    // Se houver dados customizados, exibe os detalhes
-                                    let custom = context.dataset.customData ? context.dataset.customData[context.dataIndex] : '';
-                                    if (custom) {
-                                        label += "\nDetalhes: " + custom;
-                                    }
-                                    return label;
-                                }
-                            }
-                        }
-                    }
-                }
-            });
+        if (data.completo || !estadoDashboard) {
+            estadoDashboard = { versao: 0, celulas: {} };
         }
+        // Célula com total 0 (ou de área removida) deixou de existir
+        data.celulas.forEach(celula => {
+            const chave = celula.areaId + '|' + celula.mes;
+            if (celula.total > 0 && celula.area !== null) {
+                estadoDashboard.celulas[chave] = celula;
+            } else {
+                delete estadoDashboard.celulas[chave];
+            }
+        });
+        estadoDashboard.versao = data.versao;
+        salvarEstadoDashboard(chaveDados, estadoDashboard);
+
+        document.getElementById('totalAgendamentos').textContent = data.total_agendamentos;
+        preencherPedidos(data.pedidos_aprovacao);
+        desenharGrafico(data.total_agendamentos, montarDadosGrafico(estadoDashboard.celulas));
     })
     .catch(error => {
         console.error('Erro ao carregar dados do dashboard:', error);
@@ -96,21 +95,270 @@ document.addEventListener('DOMContentLoaded', function() {
             showConfirmButton: false
         });
     });
+}
 
-  // Função para copiar o link para marcar férias
-  const copyLinkButton = document.getElementById('copyLinkButton');
-  if (copyLinkButton) {
-      copyLinkButton.addEventListener('click', function() {
-          const feriasLink = document.getElementById('feriasLink');
-          feriasLink.select();
-          document.execCommand('copy');
-          document.getElementById('copyMessage').style.display = 'block';
-          setTimeout(() => {
-              document.getElementById('copyMessage').style.display = 'none';
-          }, 2000);
+/* Atualiza o dashboard inteiro (gráfico, pedidos e conflitos) sem recarregar a página */
+function atualizarDashboard() {
+  carregarDashboard();
+  carregarConflitos();
+}
+
+/* Cria o gráfico na primeira vez; depois só troca os dados */
+function desenharGrafico(totalAgendamentos, dados) {
+  const canvas = document.getElementById('feriasChart');
+  const vazio = document.getElementById('semAgendamentos');
+  canvas.style.display = totalAgendamentos === 0 ? 'none' : '';
+  vazio.style.display = totalAgendamentos === 0 ? '' : 'none';
+  if (totalAgendamentos === 0) {
+    return;
+  }
+  if (graficoFerias) {
+    graficoFerias.data.labels = dados.labels;
+    graficoFerias.data.datasets = dados.datasets;
+    graficoFerias.update();
+    return;
+  }
+  graficoFerias = new Chart(canvas.getContext('2d'), {
+    type: 'bar',
+    data: {
+      labels: dados.labels, // Exemplo: ["2023-06", "2023-07", ...]
+      datasets: dados.datasets  // Dados agrupados por área com propriedade customData para detalhes
+    },
+    options: {
+        responsive: true,
+        scales: {
+            x: {
+                beginAtZero: true,
+                title: { display: true, text: 'Meses' },
+                ticks: {
+                    // Converte o rótulo de cada tick de "YYYY-MM" para "MM/YYYY"
+                    callback: function(value, index, ticks) {
+                        let label = this.getLabelForValue(value);
+                        const parts = label.split("-");
+                        if (parts.length === 2) {
+                            return parts[1] + "/" + parts[0];
+                        }
+                        return label;
+                    }
+                }
+            },
+            y: {
+                beginAtZero: true,
+                title: { display: true, text: 'Número de Funcionários' }
+            }
+        },
+        plugins: {
+            legend: { position: 'top' },
+            title: { display: true, text: 'Agendamentos de Férias por Área e Mês' },
+            tooltip: {
+                callbacks: {
+                    // Converte o título do tooltip (rótulo) de "YYYY-MM" para "MM/YYYY"
+                    title: function(tooltipItems) {
+                        let label = tooltipItems[0].label;
+                        const parts = label.split("-");
+                        if (parts.length === 2) {
+                            return parts[1] + "/" + parts[0];
+                        }
+                        return label;
+                    },
+                    label: function(context) {
+                        let label = context.dataset.label || '';
+                        if (label) {
+                            label += ': ';
+                        }
+                        label += context.parsed.y;
+                        // Se houver dados customizados, exibe os detalhes
+                        let custom = context.dataset.customData ? context.dataset.customData[context.dataIndex] : '';
+                        if (custom) {
+                            label += "\nDetalhes: " + custom;
+                        }
+                        return label;
+                    }
+                }
+            }
+        }
+    }
+  });
+}
+
+/* Preenche a tabela de pedidos pendentes, mantendo os selecionados */
+function preencherPedidos(pedidos) {
+  const tabela = document.getElementById('tabelaPedidos');
+  const selecionados = new Set(Array.from(document.querySelectorAll('.selecionar-pedido:checked'))
+    .map(caixa => caixa.value));
+  tabela.innerHTML = "";
+  pedidos.forEach(pedido => {
+    const linha = document.createElement('tr');
+    const selecao = document.createElement('td');
+    const caixa = document.createElement('input');
+    caixa.type = 'checkbox';
+    caixa.className = 'selecionar-pedido';
+    caixa.value = String(pedido[0]);
+    caixa.checked = selecionados.has(caixa.value);
+    selecao.appendChild(caixa);
+    linha.appendChild(selecao);
+    // Nome, data de início, dias, status e data do pedido
+    pedido.slice(1).forEach(valor => {
+      const celula = document.createElement('td');
+      celula.textContent = valor;
+      linha.appendChild(celula);
+    });
+    const acoes = document.createElement('td');
+    [['Aprovar', 'btn-success', aprovarPedido], ['Rejeitar', 'btn-danger', rejeitarPedido]]
+      .forEach(([texto, classe, funcao]) => {
+        const botao = document.createElement('button');
+        botao.className = 'btn ' + classe;
+        botao.textContent = texto;
+        botao.addEventListener('click', () => funcao(String(pedido[0])));
+        acoes.appendChild(botao);
+        acoes.appendChild(document.createTextNode(' '));
       });
+    linha.appendChild(acoes);
+    tabela.appendChild(linha);
+  });
+  document.getElementById('acoesPedidos').style.display = pedidos.length ? '' : 'none';
+  document.getElementById('selecionarTodosPedidos').checked = false;
+}
+
+/* Eventos do servidor (/eventos): pedidos e agendamentos alterados em outra tela atualizam o dashboard */
+const INTERVALO_CONSULTA_MS = 15000;
+const INTERVALO_RECONEXAO_MS = 60000;
+let consultaPeriodica = null;
+
+/* Sem eventos (navegador sem EventSource ou conexão recusada): consulta /dashboard_data?since= periodicamente */
+function consultarPeriodicamente(ativa) {
+  if (ativa && consultaPeriodica === null) {
+    consultaPeriodica = setInterval(atualizarDashboard, INTERVALO_CONSULTA_MS);
+  } else if (!ativa && consultaPeriodica !== null) {
+    clearInterval(consultaPeriodica);
+    consultaPeriodica = null;
   }
-});
+}
+
+function ouvirEventos() {
+  if (!window.EventSource) {
+    consultarPeriodicamente(true);
+    return;
+  }
+  const fonte = new EventSource('/eventos');
+  let agendada = null;
+  // Vários eventos seguidos (ex.: aprovação em lote) geram uma única atualização
+  const atualizar = () => {
+    clearTimeout(agendada);
+    agendada = setTimeout(atualizarDashboard, 300);
+  };
+  ['pedido', 'agendamento', 'recarregar'].forEach(tipo => fonte.addEventListener(tipo, atualizar));
+  fonte.onopen = () => {
+    if (consultaPeriodica !== null) {
+      consultarPeriodicamente(false);
+      atualizarDashboard();  // alterações feitas entre a última consulta e a conexão
+    }
+  };
+  fonte.onerror = () => {
+    // Recusado (ex.: 503 no limite de conexões): o navegador não tenta de novo sozinho;
+    // até a próxima tentativa, o dashboard é atualizado por consultas periódicas
+    if (fonte.readyState === EventSource.CLOSED) {
+      consultarPeriodicamente(true);
+      setTimeout(ouvirEventos, INTERVALO_RECONEXAO_MS);
+    }
+  };
+}
+
+/* Estado do gráfico guardado no navegador: {versao, celulas: {"areaId|mes": célula}} */
+function lerEstadoDashboard(chave) {
+  try {
+    return JSON.parse(localStorage.getItem(chave));
+  } catch (e) {
+    return null;
+  }
+}
+
+function salvarEstadoDashboard(chave, estado) {
+  try {
+    localStorage.setItem(chave, JSON.stringify(estado));
+  } catch (e) {
+    console.warn("Não foi possível guardar os dados do dashboard:", e);
+  }
+}
+
+/* Monta labels (meses) e datasets (um por área, com customData para os tooltips) a partir das células */
+function montarDadosGrafico(celulas) {
+  const colors = [
+    "rgba(75, 192, 192, 0.5)",
+    "rgba(255, 206, 86, 0.5)",
+    "rgba(153, 102, 255, 0.5)",
+    "rgba(54, 030, 235, 0.5)",
+    "rgba(255, 159, 64, 0.5)"
+  ];
+  // (área, mês) -> contagem e detalhes; áreas homônimas somam no mesmo dataset
+  const contagens = {};
+  const detalhes = {};
+  const meses = new Set();
+  const areas = new Set();
+  Object.values(celulas)
+    .sort((a, b) => a.areaId - b.areaId)
+    .forEach(celula => {
+      const chave = celula.area + '|' + celula.mes;
+      contagens[chave] = (contagens[chave] || 0) + celula.total;
+      (detalhes[chave] = detalhes[chave] || []).push(celula.detalhes);
+      meses.add(celula.mes);
+      areas.add(celula.area);
+    });
+  const labels = [...meses].sort();
+  const datasets = [...areas].sort().map((area, i) => ({
+    label: area,
+    data: labels.map(mes => contagens[area + '|' + mes] || 0),
+    backgroundColor: colors[i % colors.length],
+    borderColor: colors[i % colors.length],
+    borderWidth: 1,
+    customData: labels.map(mes => (detalhes[area + '|' + mes] || []).join("\n"))
+  }));
+  return { labels: labels, datasets: datasets };
+}
+
+/* Converte "YYYY-MM-DD" para "DD/MM/YYYY" */
+function dataBr(data) {
+  const partes = data.split("-");
+  return partes.length === 3 ? `${partes[2]}/${partes[1]}/${partes[0]}` : data;
+}
+
+/* Preenche a tabela de conflitos (grupos de períodos sobrepostos por área) */
+function carregarConflitos() {
+  const tabela = document.getElementById('tabelaConflitos');
+  if (!tabela) {
+    return;
+  }
+  fetch('/conflitos')
+    .then(response => response.json())
+    .then(data => {
+      tabela.innerHTML = "";
+      if (!data.grupos || data.grupos.length === 0) {
+        tabela.innerHTML = "<tr><td colspan='4' class='text-center'>Nenhum conflito.</td></tr>";
+        return;
+      }
+      data.grupos.forEach(grupo => {
+        const linha = document.createElement('tr');
+        const funcionarios = grupo.periodos.map(p =>
+          `${p.nome} (${dataBr(p.dataFerias)} a ${dataBr(p.dataRetorno)})` +
+          (p.tipo === 'pedido' ? ' – pedido pendente' : '')
+        );
+        [grupo.area, `${dataBr(grupo.inicio)} a ${dataBr(grupo.fim)}`, null, grupo.maximoSimultaneo]
+          .forEach(valor => {
+            const celula = document.createElement('td');
+            if (valor === null) {
+              celula.innerText = funcionarios.join("\n");
+            } else {
+              celula.textContent = valor;
+            }
+            linha.appendChild(celula);
+          });
+        tabela.appendChild(linha);
+      });
+    })
+    .catch(error => {
+      tabela.innerHTML = "<tr><td colspan='4' class='text-center'>Erro ao carregar conflitos.</td></tr>";
+    });
+}
 
 /* Funções para Aprovar/Rejeitar Pedidos */
 function aprovarPedido(idString) {
@@ -123,11 +371,11 @@ function aprovarPedido(idString) {
   .then(response => response.json())
   .then(data => {
     if (data.success) {
-      location.reload();
+      atualizarDashboard();
     } else {
       Swal.fire({
         title: "Erro",
-        text: "Erro ao aprovar pedido.",
+        text: data.message || "Erro ao aprovar pedido.",
         icon: "error",
         timer: 2000,
         showConfirmButton: false
@@ -155,7 +403,7 @@ function rejeitarPedido(idString) {
   .then(response => response.json())
   .then(data => {
     if (data.success) {
-      location.reload();
+      atualizarDashboard();
     } else {
       Swal.fire({
         title: "Erro",
@@ -177,6 +425,57 @@ function rejeitarPedido(idString) {
   });
 }
 
+/* Aprova ou rejeita ('acao') todos os pedidos selecionados em uma única chamada */
+function processarSelecionados(acao) {
+  const ids = Array.from(document.querySelectorAll('.selecionar-pedido:checked'))
+    .map(caixa => parseInt(caixa.value, 10));
+  if (ids.length === 0) {
+    Swal.fire({
+      title: "Atenção",
+      text: "Selecione ao menos um pedido.",
+      icon: "warning",
+      timer: 2000,
+      showConfirmButton: false
+    });
+    return;
+  }
+  fetch('/aprovar_pedidos', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ pedido_ids: ids, acao: acao })
+  })
+  .then(response => response.json())
+  .then(data => {
+    if (!data.success) {
+      Swal.fire({
+        title: "Erro",
+        text: data.message || "Erro ao processar pedidos.",
+        icon: "error",
+        timer: 2000,
+        showConfirmButton: false
+      });
+    } else if (data.ignorados > 0) {
+      // Alguns pedidos não foram processados (já processados ou funcionário não encontrado)
+      Swal.fire({
+        title: "Pedidos processados",
+        text: `Aprovados: ${data.aprovados}. Rejeitados: ${data.rejeitados}. Não processados: ${data.ignorados}.`,
+        icon: "info"
+      }).then(() => atualizarDashboard());
+    } else {
+      atualizarDashboard();
+    }
+  })
+  .catch(error => {
+    Swal.fire({
+      title: "Erro",
+      text: error.message,
+      icon: "error",
+      timer: 2000,
+      showConfirmButton: false
+    });
+  });
+}
+
 /* Função para Excluir Todos os Agendamentos */
 function excluirAgendamentos() {
   fetch('/excluir_agendamentos', {
@@ -186,7 +485,7 @@ function excluirAgendamentos() {
   .then(response => response.json())
   .then(data => {
     if (data.success) {
-      location.reload();
+      atualizarDashboard();
     } else {
       Swal.fire({
         title: "Erro",
@@ -2,10 +2,14 @@
   marcar_ferias.js
   ------------------
   - Gerencia a busca do funcionário via chapa e o agendamento de férias.
+  - Sugere funcionários por nome ou parte da chapa enquanto se digita (/buscar_funcionarios).
   - Valida datas, calcula a data de retorno e envia os dados via POST para /agendar_ferias.
   - Exibe popups animados (SweetAlert2) para confirmação, sucesso, erro e solicitações de aprovação.
-  - Ao buscar o funcionário, também consulta os agendamentos existentes e os exibe,
-    destacando os usuários do mesmo setor.
+  - Ao buscar o funcionário, uma única requisição (/funcionario/<chapa>/contexto)
+    traz seus dados, o agendamento atual, os pedidos pendentes e os agendamentos
+    do seu setor; páginas adicionais do setor são seguidas pelo cabeçalho Link.
+  - Sugere as primeiras datas de início sem conflito para a quantidade de dias
+    informada (/janelas_livres); clicar em uma sugestão preenche a data.
 */
 
 // Função para converter data de "YYYY-MM-DD" para "DD/MM/YYYY"
@@ -37,24 +41,58 @@ document.addEventListener('DOMContentLoaded', () => {
     let conflitoData = null;
     let isSubmitting = false;
 
+    // Autocomplete: sugestões por nome ou parte da chapa (aguarda uma pausa na digitação)
+    const sugestoesList = document.getElementById('sugestoesFuncionarios');
+    let sugestoesTimer = null;
+    chapaInput.addEventListener('input', () => {
+        clearTimeout(sugestoesTimer);
+        const termo = chapaInput.value.trim();
+        if (termo.length < 2) {
+            sugestoesList.innerHTML = "";
+            return;
+        }
+        sugestoesTimer = setTimeout(() => {
+            fetch(`/buscar_funcionarios?q=${encodeURIComponent(termo)}`)
+                .then(response => response.json())
+                .then(data => {
+                    sugestoesList.innerHTML = "";
+                    data.forEach(item => {
+                        const option = document.createElement('option');
+                        option.value = item.chapa;
+                        option.label = `${item.nome} (${item.area || '-'})`;
+                        sugestoesList.appendChild(option);
+                    });
+                })
+                .catch(error => {
+                    console.error("Erro ao buscar sugestões:", error);
+                });
+        }, 200);
+    });
+
     // Ao enviar o formulário para buscar o funcionário via chapa
     document.getElementById('marcarFeriasForm').addEventListener('submit', (e) => {
         e.preventDefault();
         console.log("Evento de busca de chapa acionado.");
         const chapa = chapaInput.value.trim();
         if (chapa) {
-            fetch(`/buscar_funcionario?chapa=${chapa}`)
-                .then(response => response.json())
+            // Funcionário, agendamento, pedidos e agendamentos do setor em uma só requisição
+            fetch(`/funcionario/${encodeURIComponent(chapa)}/contexto`)
+                .then(response => {
+                    if (response.status === 404) {
+                        return null;
+                    }
+                    return response.json();
+                })
                 .then(data => {
-                    console.log("Dados retornados da busca:", data);
-                    if (data.nome) {
-                        nomeDisplay.textContent = `Nome: ${data.nome}`;
-                        areaDisplay.textContent = `Área: ${data.area}`;
-                        funcionarioData = data;
-                        verificarAgendamento(chapa);
+                    console.log("Contexto retornado da busca:", data);
+                    if (data && data.funcionario) {
+                        const funcionario = data.funcionario;
+                        nomeDisplay.textContent = `Nome: ${funcionario.nome}`;
+                        areaDisplay.textContent = `Área: ${funcionario.area}`;
+                        funcionarioData = funcionario;
+                        exibirAgendamento(data.agendamento, data.pedidos);
                         document.getElementById('funcionarioInfo').style.display = 'block';
-                        // Após obter os dados do funcionário, lista os agendamentos
-                        listarAgendamentos(data.area);
+                        exibirAgendamentosSetor(data.agendamentosArea, data.proximaPagina, funcionario.area);
                     } else {
                         Swal.fire({
                             title: "Atenção",
@@ -87,38 +125,40 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
-    // Função para verificar se o funcionário já possui agendamento
-    function verificarAgendamento(chapa) {
-        console.log("Verificando agendamento para a chapa:", chapa);
-        fetch(`/verificar_agendamento?chapa=${chapa}`)
-            .then(response => response.json())
-            .then(data => {
-                console.log("Resultado da verificação:", data);
-                if (data.agendado) {
-                    nomeDisplay.textContent += ` - Férias agendadas para: ${formatDateBR(data.dataFerias)} - Retorno: ${formatDateBR(data.dataRetorno)}`;
-                    cancelarButton.style.display = 'inline-block';
-                    alterarButton.style.display = 'inline-block';
-                } else {
-                    cancelarButton.style.display = 'none';
-                    alterarButton.style.display = 'none';
-                }
-            })
-            .catch(error => {
-                console.error("Erro na verificação de agendamento:", error);
-                Swal.fire({
-                    title: "Erro",
-                    text: error.message,
-                    icon: "error",
-                    timer: 2000,
-                    showConfirmButton: false
+    // Exibe o agendamento atual do funcionário e os pedidos de aprovação pendentes
+    function exibirAgendamento(agendamento, pedidos) {
+        if (agendamento.agendado) {
+            nomeDisplay.textContent += ` - Férias agendadas para: ${formatDateBR(agendamento.dataFerias)} - Retorno: ${formatDateBR(agendamento.dataRetorno)}`;
+            cancelarButton.style.display = 'inline-block';
+            alterarButton.style.display = 'inline-block';
+        } else {
+            cancelarButton.style.display = 'none';
+            alterarButton.style.display = 'none';
+        }
+        (pedidos || []).forEach(pedido => {
+            nomeDisplay.textContent += ` - Pedido de aprovação pendente: ${formatDateBR(pedido.dataFerias)} (${pedido.diasFerias} dias)`;
+        });
+    }
+
+    // Busca todas as páginas de agendamentos de uma área
+    function buscarAgendamentos(url, acumulados = []) {
+        return fetch(url)
+            .then(response => {
+                const link = response.headers.get('Link');
+                const proxima = link && link.match(/<([^>]+)>;\s*rel="next"/);
+                return response.json().then(data => {
+                    const todos = acumulados.concat(data);
+                    return proxima ? buscarAgendamentos(proxima[1], todos) : todos;
                 });
             });
     }
 
-    // Função para listar os agendamentos existentes
-    function listarAgendamentos(meuSetor) {
-        fetch('/listar_agendamentos')
-            .then(response => response.json())
+    // Exibe os agendamentos do setor (buscando as páginas restantes, se houver)
+    function exibirAgendamentosSetor(primeiraPagina, proximaPagina, meuSetor) {
+        const paginas = proximaPagina
+            ? buscarAgendamentos(proximaPagina, primeiraPagina)
+            : Promise.resolve(primeiraPagina);
+        paginas
             .then(data => {
                 console.log("Agendamentos retornados:", data);
                 // Limpa a div de listagem
@@ -162,6 +202,49 @@ document.addEventListener('DOMContentLoaded', () => {
             });
     }
 
+    // Sugestões de datas de início sem conflito para a quantidade de dias informada
+    const janelasLivresDiv = document.getElementById('janelasLivres');
+    document.getElementById('sugerirDatasButton').addEventListener('click', () => {
+        const chapa = chapaInput.value.trim();
+        const diasFerias = parseInt(diasFeriasInput.value, 10);
+        if (!chapa || !diasFerias) {
+            Swal.fire({
+                title: "Atenção",
+                text: "Informe a chapa e a quantidade de dias.",
+                icon: "warning",
+                timer: 2000,
+                showConfirmButton: false
+            });
+            return;
+        }
+        fetch(`/janelas_livres?chapa=${encodeURIComponent(chapa)}&dias=${diasFerias}`)
+            .then(response => response.json())
+            .then(data => {
+                janelasLivresDiv.innerHTML = "";
+                if (!data.janelas) {
+                    janelasLivresDiv.textContent = data.message || "Não foi possível sugerir datas.";
+                    return;
+                }
+                if (data.janelas.length === 0) {
+                    janelasLivresDiv.textContent = "Nenhuma data livre encontrada.";
+                    return;
+                }
+                data.janelas.forEach(janela => {
+                    const botao = document.createElement('button');
+                    botao.type = 'button';
+                    botao.classList.add('btn', 'btn-sm', 'btn-outline-success', 'me-1', 'mb-1');
+                    botao.textContent = `${formatDateBR(janela.dataFerias)} a ${formatDateBR(janela.dataRetorno)}`;
+                    botao.addEventListener('click', () => {
+                        dataFeriasInput.value = janela.dataFerias;
+                    });
+                    janelasLivresDiv.appendChild(botao);
+                });
+            })
+            .catch(error => {
+                console.error("Erro ao buscar datas livres:", error);
+            });
+    });
+
     // Evento para enviar o agendamento
     document.getElementById('selecionarDataForm').addEventListener('submit', (e) => {
         e.preventDefault();
@@ -3,6 +3,8 @@
   ----------
   - Envia o formulário de perfil via fetch para /profile.
   - Em caso de sucesso, exibe um popup animado com SweetAlert2 e redireciona para o dashboard.
+  - Se uma planilha foi enviada, a importação roda em segundo plano: acompanha
+    /jobs/<id> até a conclusão antes de exibir o resultado.
   - Em caso de erro, registra o erro no console e exibe um popup com a mensagem de erro.
 */
 
@@ -40,6 +42,10 @@ document.addEventListener('DOMContentLoaded', () => {
                     profilePicMobile.src = data.profilePicUrl;
                 }
             }
+            if (data.planilhaJob) {
+                acompanharImportacao(data.planilhaJob);
+                return;
+            }
             if (data.message) {
                 Swal.fire({
                     title: "Sucesso!",
@@ -73,6 +79,51 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
+    // Consulta o status da importação até terminar e exibe o resultado
+    function acompanharImportacao(jobId) {
+        Swal.fire({
+            title: "Importando planilha...",
+            text: "Aguarde, isso pode levar alguns instantes.",
+            allowOutsideClick: false,
+            didOpen: () => Swal.showLoading()
+        });
+
+        const consultar = () => {
+            fetch(`/jobs/${jobId}`)
+            .then(response => response.json())
+            .then(job => {
+                if (job.status === 'PENDENTE' || job.status === 'EXECUTANDO') {
+                    if (job.mensagem) {
+                        Swal.update({ text: job.mensagem });
+                        Swal.showLoading();
+                    }
+                    setTimeout(consultar, 1000);
+                    return;
+                }
+                const estatisticas = (job.resultado && job.resultado.estatisticas) || null;
+                const detalhe = estatisticas
+                    ? ` (${estatisticas.inseridos} inseridos, ${estatisticas.atualizados} atualizados)`
+                    : '';
+                Swal.fire({
+                    title: job.status === 'CONCLUIDO' ? "Sucesso!" : "Erro!",
+                    text: (job.mensagem || '') + detalhe,
+                    icon: job.status === 'CONCLUIDO' ? "success" : "error",
+                    timer: 3000,
+                    showConfirmButton: false
+                }).then(() => {
+                    if (job.status === 'CONCLUIDO') {
+                        window.location.href = '/dashboard';
+                    }
+                });
+            })
+            .catch(error => {
+                console.error('Erro ao consultar importação:', error);
+                setTimeout(consultar, 3000);
+            });
+        };
+        consultar();
+    }
+
     // Atualiza a pré-visualização da imagem de perfil quando o usuário seleciona um arquivo
     profilePicUpload.addEventListener('change', () => {
         const file = profilePicUpload.files[0];
@@ -0,0 +1,67 @@
+/*
+  relatorio.js
+  ------------
+  - "Exportar PDF" agenda a geração do PDF em segundo plano (POST /gerar_pdf),
+    acompanha /jobs/<id> e abre o arquivo quando estiver pronto.
+  - Se algo falhar, segue o link original (geração síncrona via GET /gerar_pdf).
+*/
+
+document.addEventListener('DOMContentLoaded', () => {
+    const botao = document.getElementById('exportarPdf');
+    if (!botao) {
+        return;
+    }
+    const textoOriginal = botao.textContent;
+
+    const restaurar = () => {
+        botao.textContent = textoOriginal;
+        botao.classList.remove('disabled');
+    };
+
+    const gerarSincrono = () => {
+        restaurar();
+        window.location.href = botao.href;
+    };
+
+    botao.addEventListener('click', (e) => {
+        e.preventDefault();
+        if (botao.classList.contains('disabled')) {
+            return;
+        }
+        botao.textContent = 'Gerando PDF...';
+        botao.classList.add('disabled');
+
+        fetch(botao.href, { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.message);
+            }
+            const consultar = () => {
+                fetch(`/jobs/${data.jobId}`)
+                .then(response => response.json())
+                .then(job => {
+                    if (job.status === 'PENDENTE' || job.status === 'EXECUTANDO') {
+                        setTimeout(consultar, 1000);
+                    } else if (job.status === 'CONCLUIDO' && job.resultadoUrl) {
+                        restaurar();
+                        window.location.href = job.resultadoUrl;
+                    } else {
+                        console.error('Erro ao gerar PDF:', job.mensagem);
+                        restaurar();
+                        alert('Erro ao gerar PDF: ' + job.mensagem);
+                    }
+                })
+                .catch(error => {
+                    console.error('Erro ao consultar geração do PDF:', error);
+                    gerarSincrono();
+                });
+            };
+            consultar();
+        })
+        .catch(error => {
+            console.error('Erro ao agendar geração do PDF:', error);
+            gerarSincrono();
+        });
+    });
+});